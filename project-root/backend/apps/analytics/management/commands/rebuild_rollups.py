@@ -0,0 +1,24 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from apps.analytics.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Recomputes the monthly category rollups from the Income and Expense tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='user_ids',
+                            help="Only rebuild this user id (repeatable).")
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        user_ids = options['user_ids']
+        if not user_ids:
+            user_ids = list(get_user_model().objects.order_by('pk').values_list('pk', flat=True))
+
+        batch_size = options['batch_size']
+        buckets = 0
+        for start in range(0, len(user_ids), batch_size):
+            buckets += rebuild_rollups(user_ids[start:start + batch_size])
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {buckets} bucket(s) for {len(user_ids)} user(s)."))
@@ -0,0 +1,65 @@
+# Generated by Django 4.2.8 on 2026-10-18 10:14
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def build_rollups(apps, schema_editor):
+    from django.db.models import Count, Sum
+    from django.db.models.functions import ExtractMonth, ExtractYear
+
+    MonthlyCategoryTotal = apps.get_model('analytics', 'MonthlyCategoryTotal')
+    for kind, model_name in (('income', 'Income'), ('expense', 'Expense')):
+        model = apps.get_model('transactions', model_name)
+        grouped = (
+            model.objects
+            .annotate(year=ExtractYear('date'), month=ExtractMonth('date'))
+            .order_by()
+            .values('user_id', 'year', 'month', 'category_id')
+            .annotate(total=Sum('amount'), count=Count('id'))
+        )
+        MonthlyCategoryTotal.objects.bulk_create(
+            (MonthlyCategoryTotal(kind=kind, **row) for row in grouped.iterator()),
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('categories', '0003_alter_category_type'),
+        ('transactions', '0004_userbalance'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyCategoryTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField()),
+                ('month', models.PositiveSmallIntegerField()),
+                ('kind', models.CharField(choices=[('income', 'Income'), ('expense', 'Expense')], max_length=10)),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('count', models.BigIntegerField(default=0)),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='monthly_totals', to='categories.category')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_totals', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['year', 'month'],
+                'indexes': [models.Index(fields=['user', 'kind', 'year', 'month'], name='monthly_total_user_kind_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='monthlycategorytotal',
+            constraint=models.UniqueConstraint(condition=models.Q(('category__isnull', False)), fields=('user', 'year', 'month', 'category', 'kind'), name='monthly_total_unique_category'),
+        ),
+        migrations.AddConstraint(
+            model_name='monthlycategorytotal',
+            constraint=models.UniqueConstraint(condition=models.Q(('category__isnull', True)), fields=('user', 'year', 'month', 'kind'), name='monthly_total_unique_uncategorized'),
+        ),
+        migrations.RunPython(build_rollups, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,44 @@
 from django.db import models
+from django.conf import settings
+from apps.categories.models import Category
 
-# Create your models here.
+
+class MonthlyCategoryTotal(models.Model):
+    """
+    Sum and count of a user's Income or Expense rows for one month and category,
+    maintained from transaction writes by apps.analytics.signals.
+    """
+    KIND_CHOICES = [
+        ('income', 'Income'),
+        ('expense', 'Expense'),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='monthly_totals')
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    # Null for uncategorized rows; deleting a category rebuilds the user's rollups.
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, null=True, blank=True, related_name='monthly_totals')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    count = models.BigIntegerField(default=0)
+
+    class Meta:
+        ordering = ['year', 'month']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'year', 'month', 'category', 'kind'],
+                condition=models.Q(category__isnull=False),
+                name='monthly_total_unique_category',
+            ),
+            models.UniqueConstraint(
+                fields=['user', 'year', 'month', 'kind'],
+                condition=models.Q(category__isnull=True),
+                name='monthly_total_unique_uncategorized',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'kind', 'year', 'month'], name='monthly_total_user_kind_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.year}-{self.month:02d}: {self.total}"
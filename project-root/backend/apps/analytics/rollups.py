@@ -0,0 +1,77 @@
+# analytics/rollups.py
+
+from collections import defaultdict
+from decimal import Decimal
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+from apps.transactions.models import Income, Expense, RecurrenceRule
+from .models import MonthlyCategoryTotal
+
+
+def _bucket_deltas(added, removed):
+    deltas = defaultdict(lambda: [Decimal('0'), 0])
+    for sign, states in ((1, added), (-1, removed)):
+        for state in states:
+            key = (state.user_id, state.date.year, state.date.month, state.category_id)
+            deltas[key][0] += sign * state.amount
+            deltas[key][1] += sign
+    return deltas
+
+
+def apply_rollup_changes(kind, added, removed):
+    """Shifts the (user, year, month, category, kind) buckets touched by a write."""
+    for (user_id, year, month, category_id), (amount, count) in _bucket_deltas(added, removed).items():
+        if not amount and not count:
+            continue
+        bucket = MonthlyCategoryTotal.objects.filter(
+            user_id=user_id, year=year, month=month, category_id=category_id, kind=kind,
+        )
+        changes = {'total': F('total') + amount, 'count': F('count') + count}
+        if bucket.update(**changes):
+            continue
+        try:
+            with transaction.atomic():
+                MonthlyCategoryTotal.objects.create(
+                    user_id=user_id, year=year, month=month, category_id=category_id,
+                    kind=kind, total=amount, count=count,
+                )
+        except IntegrityError:
+            # A concurrent write created the bucket first.
+            bucket.update(**changes)
+
+
+def monthly_totals_from_transactions(model, queryset):
+    return (
+        queryset
+        .annotate(year=ExtractYear('date'), month=ExtractMonth('date'))
+        .order_by()
+        .values('user_id', 'year', 'month', 'category_id')
+        .annotate(total=Sum('amount'), count=Count('id'))
+    )
+
+
+def rebuild_rollups(user_ids):
+    """Recomputes every bucket of the given users from the transaction tables."""
+    with transaction.atomic():
+        MonthlyCategoryTotal.objects.filter(user_id__in=user_ids).delete()
+        rows = []
+        for model in (Income, Expense):
+            grouped = monthly_totals_from_transactions(model, model.objects.filter(user_id__in=user_ids))
+            rows += [MonthlyCategoryTotal(kind=model.kind, **row) for row in grouped]
+
+        # Recurring occurrences are not rows; fold them into the buckets built above.
+        buckets = {(row.user_id, row.year, row.month, row.category_id, row.kind): row for row in rows}
+        for rule in RecurrenceRule.objects.filter(user_id__in=user_ids):
+            for (user_id, year, month, category_id), (amount, count) in _bucket_deltas(rule.states(), []).items():
+                key = (user_id, year, month, category_id, rule.kind)
+                if key not in buckets:
+                    buckets[key] = MonthlyCategoryTotal(
+                        user_id=user_id, year=year, month=month, category_id=category_id,
+                        kind=rule.kind, total=Decimal('0'), count=0,
+                    )
+                    rows.append(buckets[key])
+                buckets[key].total += amount
+                buckets[key].count += count
+        MonthlyCategoryTotal.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
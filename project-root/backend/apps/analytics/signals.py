@@ -0,0 +1,20 @@
+# analytics/signals.py
+
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from apps.categories.models import Category
+from apps.transactions.signals import deleted_with_user, transactions_changed
+from .rollups import apply_rollup_changes, rebuild_rollups
+
+
+@receiver(transactions_changed)
+def update_rollups(sender, added, removed, **kwargs):
+    apply_rollup_changes(sender.kind, added, removed)
+
+
+@receiver(post_delete, sender=Category)
+def category_deleted(sender, instance, **kwargs):
+    if deleted_with_user(kwargs.get('origin')):
+        return
+    # Its transactions were moved to "uncategorized" by SET_NULL without signals.
+    rebuild_rollups([instance.user_id])
@@ -1,3 +1,181 @@
-from django.test import TestCase
+from datetime import date
+from decimal import Decimal
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from apps.users.models import User
+from apps.categories.models import Category
+from apps.transactions.models import Income, Expense
+from .models import MonthlyCategoryTotal
+from .rollups import rebuild_rollups
+from apps.categories.factories import CategoryFactory
+from apps.transactions.factories import RecurrenceRuleFactory, create_history
+from apps.users.factories import UserFactory
+from finance_tracker.testing import QueryBudgetMixin
 
-# Create your tests here.
+
+def rollup_snapshot(user):
+    return list(
+        MonthlyCategoryTotal.objects.filter(user=user).exclude(count=0)
+        .order_by('year', 'month', 'kind', 'category_id')
+        .values_list('year', 'month', 'category_id', 'kind', 'total', 'count')
+    )
+
+
+class MonthlyRollupTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="test@example.com", password="securePassword123")
+        self.client.force_authenticate(user=self.user)
+        self.food = Category.objects.create(user=self.user, name="Food", type="expense")
+        self.rent = Category.objects.create(user=self.user, name="Rent", type="expense")
+
+    def assertRollupsMatchTables(self):
+        incremental = rollup_snapshot(self.user)
+        rebuild_rollups([self.user.pk])
+        self.assertEqual(incremental, rollup_snapshot(self.user))
+
+    def test_rollups_follow_writes(self):
+        expense = Expense.objects.create(user=self.user, category=self.food, amount=Decimal('10.00'), date=date(2025, 1, 5))
+        Expense.objects.create(user=self.user, amount=Decimal('4.00'), date=date(2025, 1, 6))
+        Income.objects.create(user=self.user, amount=Decimal('100.00'), date=date(2025, 2, 1))
+        self.assertRollupsMatchTables()
+
+        expense.category = self.rent
+        expense.date = date(2025, 3, 1)
+        expense.save()
+        self.assertRollupsMatchTables()
+
+        expense.delete()
+        self.assertRollupsMatchTables()
+
+    def test_recurring_occurrences_are_counted(self):
+        self.client.post(reverse('expense-list'), {
+            'amount': '10.00', 'date': '2025-01-15', 'category': self.food.pk,
+            'is_recurring': True, 'recurrence_type': 'weekly', 'recurrence_count': 8,
+        })
+        self.assertEqual(sum(row[-1] for row in rollup_snapshot(self.user)), 8)
+        self.assertRollupsMatchTables()
+
+    def test_category_delete_moves_totals_to_uncategorized(self):
+        Expense.objects.create(user=self.user, category=self.food, amount=Decimal('10.00'), date=date(2025, 1, 5))
+        self.food.delete()
+        self.assertEqual(rollup_snapshot(self.user), [(2025, 1, None, 'expense', Decimal('10.00'), 1)])
+
+    def test_user_delete_cascades(self):
+        Expense.objects.create(user=self.user, category=self.food, amount=Decimal('10.00'), date=date(2025, 1, 5))
+        self.user.delete()
+        self.assertFalse(MonthlyCategoryTotal.objects.exists())
+
+    def test_endpoints_read_rollups(self):
+        Expense.objects.create(user=self.user, category=self.food, amount=Decimal('10.00'), date=date(2025, 1, 5))
+        Expense.objects.create(user=self.user, category=self.rent, amount=Decimal('500.00'), date=date(2025, 1, 1))
+        Income.objects.create(user=self.user, amount=Decimal('1000.00'), date=date(2025, 1, 1))
+
+        monthly = self.client.get(reverse('analytics-monthly'), {'year': 2025})
+        self.assertEqual(monthly.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(row['month'], row['kind'], row['total']) for row in monthly.data],
+            [(1, 'expense', Decimal('510.00')), (1, 'income', Decimal('1000.00'))],
+        )
+
+        breakdown = self.client.get(reverse('analytics-categories'), {'kind': 'expense'})
+        self.assertEqual([row['category_name'] for row in breakdown.data], ['Rent', 'Food'])
+
+        trend = self.client.get(reverse('analytics-trends'), {'end': '2025-02', 'months': 3})
+        self.assertEqual([row['net'] for row in trend.data], [Decimal('0'), Decimal('490.00'), Decimal('0')])
+
+    def test_invalid_kind(self):
+        response = self.client.get(reverse('analytics-monthly'), {'kind': 'transfer'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_trend_window_before_year_one(self):
+        response = self.client.get(reverse('analytics-trends'), {'end': '0001-06', 'months': 12})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('months', response.data)
+        response = self.client.get(reverse('analytics-trends'), {'end': '0001-06', 'months': 6})
+        self.assertEqual(len(response.data), 6)
+
+
+class TimeSeriesTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="test@example.com", password="securePassword123")
+        self.client.force_authenticate(user=self.user)
+        self.food = Category.objects.create(user=self.user, name="Food", type="expense")
+        self.rent = Category.objects.create(user=self.user, name="Rent", type="expense")
+        Expense.objects.create(user=self.user, category=self.food, amount=Decimal('10.00'), date=date(2025, 1, 6))
+        Expense.objects.create(user=self.user, category=self.food, amount=Decimal('5.00'), date=date(2025, 1, 12))
+        Expense.objects.create(user=self.user, category=self.rent, amount=Decimal('500.00'), date=date(2025, 1, 20))
+        self.url = reverse('analytics-timeseries')
+
+    def test_weekly_buckets_with_gaps_filled(self):
+        response = self.client.get(self.url, {
+            'kind': 'expense', 'bucket': 'week', 'start_date': '2025-01-01', 'end_date': '2025-01-31',
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(row['period'], row['total'], row['count']) for row in response.data],
+            [
+                ('2024-12-30', Decimal('0'), 0),
+                ('2025-01-06', Decimal('15.00'), 2),
+                ('2025-01-13', Decimal('0'), 0),
+                ('2025-01-20', Decimal('500.00'), 1),
+                ('2025-01-27', Decimal('0'), 0),
+            ],
+        )
+
+    def test_category_list_and_recurring_occurrences(self):
+        self.client.post(reverse('expense-list'), {
+            'amount': '2.00', 'date': '2025-01-15', 'category': self.food.pk,
+            'is_recurring': True, 'recurrence_type': 'monthly', 'recurrence_count': 3,
+        })
+        response = self.client.get(self.url, {
+            'kind': 'expense', 'bucket': 'month', 'category': f'{self.food.pk}',
+            'start_date': '2025-01-01', 'end_date': '2025-04-30',
+        })
+        self.assertEqual(
+            [(row['period'], row['total'], row['count']) for row in response.data],
+            [
+                ('2025-01-01', Decimal('17.00'), 3),
+                ('2025-02-01', Decimal('2.00'), 1),
+                ('2025-03-01', Decimal('2.00'), 1),
+                ('2025-04-01', Decimal('0'), 0),
+            ],
+        )
+
+    def test_ranges_at_the_ends_of_the_calendar(self):
+        response = self.client.get(self.url, {'kind': 'expense', 'bucket': 'day', 'start_date': '9999-12-30', 'end_date': '9999-12-31'})
+        self.assertEqual([row['period'] for row in response.data], ['9999-12-30', '9999-12-31'])
+        response = self.client.get(self.url, {'kind': 'expense', 'bucket': 'year', 'end_date': '0005-06-01'})
+        self.assertEqual(response.data[0]['period'], '0001-01-01')
+        self.assertEqual(len(response.data), 5)
+
+    def test_invalid_params(self):
+        for params in ({'kind': 'expense', 'bucket': 'hour'}, {'bucket': 'day'},
+                       {'kind': 'expense', 'bucket': 'day', 'start_date': '1900-01-01', 'end_date': '2025-01-01'}):
+            self.assertEqual(self.client.get(self.url, params).status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class QueryBudgetTests(QueryBudgetMixin, APITestCase):
+    """Query counts of the analytics endpoints must not depend on how many rows feed them."""
+
+    def setUp(self):
+        self.user = UserFactory()
+        self.client.force_authenticate(user=self.user)
+        create_history(self.user, CategoryFactory.create_batch(3, user=self.user), 20)
+        RecurrenceRuleFactory(user=self.user)
+
+    def grow(self):
+        create_history(self.user, CategoryFactory.create_batch(6, user=self.user), 60)
+        RecurrenceRuleFactory.create_batch(3, user=self.user)
+        RecurrenceRuleFactory(user=self.user, kind='income')
+
+    def test_endpoints(self):
+        requests = [
+            ('analytics-monthly', {'year': 2025}, 1),
+            ('analytics-categories', {'kind': 'expense'}, 1),
+            ('analytics-trends', {'end': '2025-12', 'months': 12}, 1),
+            ('analytics-timeseries', {'kind': 'expense', 'bucket': 'week', 'start_date': '2024-01-01', 'end_date': '2025-12-31'}, 2),
+        ]
+        for name, params, budget in requests:
+            with self.subTest(name=name):
+                self.assertQueryBudget(budget, reverse(name), self.grow, params)
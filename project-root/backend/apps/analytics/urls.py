@@ -0,0 +1,9 @@
+from django.urls import path
+from .views import MonthlyTotalsView, CategoryBreakdownView, IncomeExpenseTrendView, TimeSeriesView
+
+urlpatterns = [
+    path('monthly/', MonthlyTotalsView.as_view(), name='analytics-monthly'),
+    path('categories/', CategoryBreakdownView.as_view(), name='analytics-categories'),
+    path('trends/', IncomeExpenseTrendView.as_view(), name='analytics-trends'),
+    path('timeseries/', TimeSeriesView.as_view(), name='analytics-timeseries'),
+]
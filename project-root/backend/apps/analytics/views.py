@@ -1,3 +1,209 @@
-from django.shortcuts import render
+# apps/analytics/views.py
 
-# Create your views here.
+from datetime import date, timedelta
+from decimal import Decimal
+from dateutil.relativedelta import relativedelta
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek, TruncYear
+from rest_framework import permissions
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from apps.transactions.models import TRANSACTION_MODELS
+from apps.transactions.recurrence import rules_for
+from apps.transactions.utils import parse_date_param, parse_int_param
+from .models import MonthlyCategoryTotal
+
+
+def rollups_for(request):
+    """The user's rollup rows narrowed by the shared year/month/kind params."""
+    params = request.query_params
+    queryset = MonthlyCategoryTotal.objects.filter(user=request.user)
+
+    kind = params.get('kind')
+    if kind:
+        if kind not in dict(MonthlyCategoryTotal.KIND_CHOICES):
+            raise ValidationError({'kind': "kind must be 'income' or 'expense'."})
+        queryset = queryset.filter(kind=kind)
+    if params.get('year'):
+        queryset = queryset.filter(year=parse_int_param(params['year'], 'year', 1, 9999))
+    if params.get('month'):
+        queryset = queryset.filter(month=parse_int_param(params['month'], 'month', 1, 12))
+
+    return queryset
+
+
+class MonthlyTotalsView(APIView):
+    """Income and expense totals per month, optionally narrowed to a year."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        rows = (
+            rollups_for(request)
+            .values('year', 'month', 'kind')
+            .annotate(total=Sum('total'), count=Sum('count'))
+            .order_by('year', 'month', 'kind')
+        )
+        return Response([
+            {
+                "year": row['year'],
+                "month": row['month'],
+                "kind": row['kind'],
+                "total": row['total'],
+                "count": row['count'],
+            }
+            for row in rows
+        ])
+
+
+class CategoryBreakdownView(APIView):
+    """Totals per category for the selected year/month/kind."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        rows = (
+            rollups_for(request)
+            .values('category_id', 'category__name', 'kind')
+            .annotate(total=Sum('total'), count=Sum('count'))
+            .order_by('kind', '-total')
+        )
+        return Response([
+            {
+                "category": row['category_id'],
+                "category_name": row['category__name'] or "Uncategorized",
+                "kind": row['kind'],
+                "total": row['total'],
+                "count": row['count'],
+            }
+            for row in rows
+        ])
+
+
+class IncomeExpenseTrendView(APIView):
+    """
+    Income vs expense for the last `months` months (default 12) ending at
+    `end` (YYYY-MM, default current month), with empty months filled in.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        months = parse_int_param(request.query_params.get('months', 12), 'months', 1, 120)
+        end = request.query_params.get('end')
+        if end:
+            try:
+                end_year, end_month = (int(part) for part in end.split('-'))
+                last = date(end_year, end_month, 1)
+            except ValueError:
+                raise ValidationError({'end': "end must be formatted as YYYY-MM."})
+        else:
+            last = date.today().replace(day=1)
+        try:
+            first = last - relativedelta(months=months - 1)
+        except ValueError:
+            raise ValidationError({'months': "The window cannot start before year 1."})
+
+        rows = (
+            MonthlyCategoryTotal.objects
+            .filter(user=request.user, year__gte=first.year, year__lte=last.year)
+            .values('year', 'month', 'kind')
+            .annotate(total=Sum('total'))
+        )
+        totals = {(row['year'], row['month'], row['kind']): row['total'] for row in rows}
+
+        trend = []
+        for offset in range(months):
+            current = first + relativedelta(months=offset)
+            income = totals.get((current.year, current.month, 'income')) or Decimal('0')
+            expense = totals.get((current.year, current.month, 'expense')) or Decimal('0')
+            trend.append({
+                "year": current.year,
+                "month": current.month,
+                "income": income,
+                "expense": expense,
+                "net": income - expense,
+            })
+        return Response(trend)
+
+
+# bucket -> (database truncation, the same truncation in Python, step between buckets)
+BUCKETS = {
+    'day': (TruncDay, lambda day: day, relativedelta(days=1)),
+    'week': (TruncWeek, lambda day: day - timedelta(days=day.weekday()), relativedelta(weeks=1)),
+    'month': (TruncMonth, lambda day: day.replace(day=1), relativedelta(months=1)),
+    'year': (TruncYear, lambda day: day.replace(month=1, day=1), relativedelta(years=1)),
+}
+MAX_BUCKETS = 5000
+
+
+class TimeSeriesView(APIView):
+    """
+    Totals and counts of one kind per day/week/month/year bucket (weeks start
+    on Monday) between `start_date` and `end_date`, optionally narrowed to a
+    comma separated `category` list. Empty buckets are filled in.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        params = request.query_params
+        bucket = params.get('bucket', 'month')
+        if bucket not in BUCKETS:
+            raise ValidationError({'bucket': f"bucket must be one of: {', '.join(BUCKETS)}."})
+        trunc, truncate, step = BUCKETS[bucket]
+
+        kind = params.get('kind')
+        if kind not in TRANSACTION_MODELS:
+            raise ValidationError({'kind': "kind must be 'income' or 'expense'."})
+
+        end = parse_date_param(params.get('end_date'), 'end_date') or date.today()
+        start = parse_date_param(params.get('start_date'), 'start_date')
+        if start is None:
+            try:
+                start = truncate(end) - step * 11
+            except (OverflowError, ValueError):
+                start = date.min
+        if start > end:
+            raise ValidationError({'start_date': "start_date must not be after end_date."})
+
+        periods = []
+        period = truncate(start)
+        while period <= end:
+            periods.append(period)
+            if len(periods) > MAX_BUCKETS:
+                raise ValidationError({'bucket': f"The range spans more than {MAX_BUCKETS} buckets."})
+            try:
+                period += step
+            except (OverflowError, ValueError):
+                # The last bucket of year 9999.
+                break
+
+        categories = None
+        if params.get('category'):
+            categories = [parse_int_param(value, 'category', 1, 2 ** 63 - 1) for value in params['category'].split(',')]
+
+        queryset = TRANSACTION_MODELS[kind].objects.filter(user=request.user, date__gte=start, date__lte=end)
+        if categories is not None:
+            queryset = queryset.filter(category_id__in=categories)
+        rows = (
+            queryset
+            .annotate(period=trunc('date'))
+            .values('period')
+            .annotate(total=Sum('amount'), count=Count('id'))
+            .order_by()
+        )
+        totals = {row['period']: [row['total'], row['count']] for row in rows}
+
+        # Recurring occurrences are not rows; bucket them here.
+        rules = rules_for(request.user, kind)
+        if categories is not None:
+            rules = rules.filter(category_id__in=categories)
+        for rule in rules:
+            for _, day in rule.occurrences(start, end):
+                bucket_totals = totals.setdefault(truncate(day), [Decimal('0'), 0])
+                bucket_totals[0] += rule.amount
+                bucket_totals[1] += 1
+
+        series = []
+        for period in periods:
+            total, count = totals.get(period, (Decimal('0'), 0))
+            series.append({"period": period.isoformat(), "total": total, "count": count})
+        return Response(series)
@@ -5,3 +5,6 @@ class BudgetsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.budgets'
     # label = 'budgets'
+
+    def ready(self):
+        from . import signals  # noqa: F401
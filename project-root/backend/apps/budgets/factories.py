@@ -0,0 +1,31 @@
+# budgets/factories.py
+
+from datetime import date
+import factory
+from apps.categories.factories import CategoryFactory
+from apps.users.factories import UserFactory
+from .models import Budget, BudgetTemplate
+
+
+class BudgetFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Budget
+
+    user = factory.SubFactory(UserFactory)
+    category = factory.SubFactory(CategoryFactory, user=factory.SelfAttribute('..user'))
+    name = factory.Sequence(lambda n: f"Budget {n}")
+    amount = factory.Faker('pydecimal', left_digits=3, right_digits=2, positive=True)
+    start_date = date(2025, 1, 1)
+    end_date = date(2025, 12, 31)
+
+
+class BudgetTemplateFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = BudgetTemplate
+
+    user = factory.SubFactory(UserFactory)
+    category = factory.SubFactory(CategoryFactory, user=factory.SelfAttribute('..user'))
+    name = factory.Sequence(lambda n: f"Template {n}")
+    amount = factory.Faker('pydecimal', left_digits=3, right_digits=2, positive=True)
+    period = 'monthly'
+    start_date = date(2024, 1, 1)
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from apps.budgets.notifications import BudgetNotifier
+
+
+class Command(BaseCommand):
+    help = (
+        "Emails users whose active budgets went past an alert threshold since the "
+        "last run (the same job CRONJOBS schedules)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help="Users per batch.")
+        parser.add_argument('--threshold', type=int, action='append', dest='thresholds',
+                            help="Percent of the budget amount (repeatable; default BUDGET_ALERT_THRESHOLDS).")
+
+    def handle(self, *args, **options):
+        sent = BudgetNotifier(chunk_size=options['chunk_size'], thresholds=options['thresholds']).run()
+        self.stdout.write(self.style.SUCCESS(f"Sent {sent} budget alert email(s)."))
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.8 on 2026-10-18 11:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budgets', '0003_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotifierWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('watermark', models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='BudgetNotification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('threshold', models.PositiveSmallIntegerField()),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('spent', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('budget', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to='budgets.budget')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='budgetnotification',
+            constraint=models.UniqueConstraint(fields=('budget', 'threshold', 'start_date', 'end_date'), name='budget_notification_once'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.8 on 2026-10-18 11:04
+
+from decimal import Decimal
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budgets', '0004_notifications'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BudgetSpend',
+            fields=[
+                ('budget', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='spend', serialize=False, to='budgets.budget')),
+                ('spent', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
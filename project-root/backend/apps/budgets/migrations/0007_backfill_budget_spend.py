@@ -0,0 +1,22 @@
+from django.db import migrations
+
+
+def build_counters(apps, schema_editor):
+    Budget = apps.get_model('budgets', 'Budget')
+    missing = list(Budget.objects.filter(spend__isnull=True).values_list('pk', flat=True))
+    if missing:
+        # Occurrences of recurring expenses are expanded by the current models'
+        # code, which the historical ones do not carry.
+        from apps.budgets.spend import build_missing_spend
+        build_missing_spend(missing)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budgets', '0006_budget_templates'),
+    ]
+
+    operations = [
+        migrations.RunPython(build_counters, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,73 @@
 # apps/budgets/models.py
 
 from django.db import models
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
 from django.conf import settings
 from apps.categories.models import Category
+from apps.transactions.models import Expense, RecurrenceRule
+from collections import defaultdict
+from datetime import timedelta
 from decimal import Decimal
+from dateutil.relativedelta import relativedelta
+from django.utils import timezone
+
+
+class BudgetQuerySet(models.QuerySet):
+    def with_spent(self):
+        """
+        Annotates `spent`: the user's expenses in the budget's category between
+        start_date and end_date, as a correlated subquery (one query overall).
+        """
+        expenses = (
+            Expense.objects
+            .filter(
+                user=OuterRef('user'),
+                category=OuterRef('category'),
+                date__gte=OuterRef('start_date'),
+                date__lte=OuterRef('end_date'),
+            )
+            .order_by()
+            .values('category')
+            .annotate(total=Sum('amount'))
+            .values('total')
+        )
+        return self.annotate(
+            spent=Coalesce(Subquery(expenses, output_field=MONEY), Value(Decimal('0')), output_field=MONEY)
+        )
+
+    def with_counted_spend(self):
+        """
+        Annotates `counted_spent` from the BudgetSpend counter (recurring
+        occurrences included) with a join, so it can be filtered on in SQL.
+        Null for budgets without a counter (bulk_create; see rebuild_budget_spend).
+        """
+        return self.annotate(counted_spent=F('spend__spent'))
+
+
+BUDGET_PERIOD_CHOICES = [('weekly', 'Weekly'), ('monthly', 'Monthly'), ('yearly', 'Yearly')]
+
+MONEY = DecimalField(max_digits=14, decimal_places=2)
+
+
+def expense_rules_for(user_ids):
+    return RecurrenceRule.objects.filter(user_id__in=user_ids, kind=Expense.kind, category__isnull=False)
+
+
+def attach_expense_rules(budgets, rules=None):
+    """
+    Loads the recurring expenses of all given budgets in one query (see
+    Budget.recurring_spend), or hands out `rules` when already loaded.
+    """
+    by_category = defaultdict(list)
+    if budgets and rules is None:
+        rules = expense_rules_for({budget.user_id for budget in budgets})
+    for rule in rules or []:
+        by_category[rule.user_id, rule.category_id].append(rule)
+    for budget in budgets:
+        budget._expense_rules = by_category[budget.user_id, budget.category_id]
+    return budgets
+
 
 class Budget(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='budgets')
@@ -13,18 +77,192 @@ class Budget(models.Model):
     start_date = models.DateField()
     end_date = models.DateField()
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = BudgetQuerySet.as_manager()
+
+    def current_spend(self):
+        """
+        Expense rows in the window (the `spent` annotation from with_spent() when
+        present) plus occurrences of recurring expenses falling in it; the
+        counter when read with with_counted_spend().
+        """
+        if getattr(self, '_current_spend', None) is None and getattr(self, 'counted_spent', None) is not None:
+            self._current_spend = self.counted_spent
+        if getattr(self, '_current_spend', None) is None:
+            spent = getattr(self, 'spent', None)
+            if spent is None:
+                spent = Expense.objects.filter(
+                    user_id=self.user_id,
+                    category_id=self.category_id,
+                    date__gte=self.start_date,
+                    date__lte=self.end_date,
+                ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
+            self._current_spend = spent + self.recurring_spend()
+        return self._current_spend
+
+    def recurring_spend(self):
+        rules = getattr(self, '_expense_rules', None)
+        if rules is None:
+            rules = RecurrenceRule.objects.filter(user_id=self.user_id, kind=Expense.kind, category_id=self.category_id)
+        return sum((rule.total_between(self.start_date, self.end_date) for rule in rules), Decimal('0.00'))
 
     def is_exceeded(self):
-        # TEMP: Pretend we spent a random amount (e.g., 80% of budget)
-        dummy_spent = self.amount * Decimal('1.2')  # 120% spent
-        return dummy_spent > self.amount
+        return self.current_spend() > self.amount
 
     def exceeded_amount(self):
-        dummy_spent = self.amount * Decimal('1.2')
-        if dummy_spent > self.amount:
-            return dummy_spent - self.amount
+        spent = self.current_spend()
+        if spent > self.amount:
+            return spent - self.amount
         return Decimal('0.00')
 
-
     def __str__(self):
         return f"{self.name} ({self.amount})"
+
+
+class BudgetSpend(models.Model):
+    """
+    What current_spend() returns for a budget: written when the budget is
+    saved, then kept in step with expense writes by apps.budgets.signals.
+    Budgets created without signals (bulk_create) have none until
+    rebuild_budget_spend; reads compute their spend from the tables instead.
+    """
+    budget = models.OneToOneField(Budget, on_delete=models.CASCADE, primary_key=True, related_name='spend')
+    spent = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0'))
+    updated_at = models.DateTimeField(auto_now=True)
+
+
+class BudgetTemplateQuerySet(models.QuerySet):
+    def with_period_spend(self, day):
+        """
+        Annotates `period_spent`: the spend of each template's period containing
+        `day`, read from BudgetPeriodSpend (one query overall, whatever the history).
+        """
+        spend = (
+            BudgetPeriodSpend.objects
+            .filter(template=OuterRef('pk'), period_start__lte=day, period_end__gte=day)
+            .values('spent')[:1]
+        )
+        return self.annotate(
+            period_spent=Coalesce(Subquery(spend, output_field=MONEY), Value(Decimal('0')), output_field=MONEY)
+        )
+
+
+class BudgetTemplate(models.Model):
+    """
+    A budget repeating every week, month or year from start_date, the first
+    day of period 0. Periods are computed, never stored; the last one is the
+    period containing end_date, when set. Spend per period is kept in
+    BudgetPeriodSpend by apps.budgets.signals.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='budget_templates')
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='budget_templates')
+    name = models.CharField(max_length=255)
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    period = models.CharField(max_length=10, choices=BUDGET_PERIOD_CHOICES)
+    start_date = models.DateField()
+    end_date = models.DateField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = BudgetTemplateQuerySet.as_manager()
+
+    def __str__(self):
+        return f"{self.name} ({self.amount} {self.period})"
+
+    def period_start(self, index):
+        if self.period == 'weekly':
+            return self.start_date + timedelta(weeks=index)
+        if self.period == 'monthly':
+            return self.start_date + relativedelta(months=index)
+        return self.start_date + relativedelta(years=index)
+
+    def period_index(self, day):
+        if self.period == 'weekly':
+            return (day - self.start_date).days // 7
+        if self.period == 'monthly':
+            index = (day.year - self.start_date.year) * 12 + day.month - self.start_date.month
+        else:
+            index = day.year - self.start_date.year
+        return index if self.period_start(index) <= day else index - 1
+
+    def period_bounds(self, index):
+        return self.period_start(index), self.period_start(index + 1) - timedelta(days=1)
+
+    def period_for(self, day):
+        """(start, end) of the period containing `day`, or None outside the template's range."""
+        index = self.period_index(day)
+        if index < 0:
+            return None
+        start, end = self.period_bounds(index)
+        if self.end_date is not None and start > self.end_date:
+            return None
+        return start, end
+
+    def current_period(self):
+        return self.period_for(timezone.localdate())
+
+    def current_spend(self):
+        """Spend of the current period (the `period_spent` annotation from with_period_spend() when present)."""
+        spent = getattr(self, 'period_spent', None)
+        if spent is None:
+            period = self.current_period()
+            spent = Decimal('0.00')
+            if period is not None:
+                spent = self.period_spend.filter(period_start=period[0]).values_list('spent', flat=True).first() or spent
+            self.period_spent = spent
+        return spent
+
+    def is_exceeded(self):
+        return self.current_spend() > self.amount
+
+    def exceeded_amount(self):
+        spent = self.current_spend()
+        if spent > self.amount:
+            return spent - self.amount
+        return Decimal('0.00')
+
+
+class BudgetPeriodSpend(models.Model):
+    """
+    Expenses (rows and recurring occurrences) of a template's category within
+    one of its periods. Periods without any spend have no row.
+    """
+    template = models.ForeignKey(BudgetTemplate, on_delete=models.CASCADE, related_name='period_spend')
+    period_start = models.DateField()
+    period_end = models.DateField()
+    spent = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0'))
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['template', 'period_start'], name='budget_period_spend_unique'),
+        ]
+
+
+class BudgetNotification(models.Model):
+    """
+    One alert: a budget's spend went past `threshold` percent of its amount
+    within the window it had then. The unique constraint keeps the notifier
+    from alerting twice for the same crossing.
+    """
+    budget = models.ForeignKey(Budget, on_delete=models.CASCADE, related_name='notifications')
+    threshold = models.PositiveSmallIntegerField()
+    start_date = models.DateField()
+    end_date = models.DateField()
+    spent = models.DecimalField(max_digits=14, decimal_places=2)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['budget', 'threshold', 'start_date', 'end_date'], name='budget_notification_once',
+            ),
+        ]
+
+
+class NotifierWatermark(models.Model):
+    """When a periodic job last started; rows changed after it are what its next run looks at."""
+    name = models.CharField(max_length=50, unique=True)
+    watermark = models.DateTimeField()
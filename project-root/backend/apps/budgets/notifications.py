@@ -0,0 +1,167 @@
+# budgets/notifications.py
+
+from collections import defaultdict
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+from apps.transactions.models import Expense, RecurrenceRule
+from .models import Budget, BudgetNotification, NotifierWatermark, attach_expense_rules, expense_rules_for
+
+WATERMARK_NAME = 'budget-notifier'
+# Rows written by transactions still open when a run started carry an earlier
+# updated_at than its watermark; looking back this far catches them.
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+
+def _touched(queryset, watermark):
+    return Exists(queryset.filter(user=OuterRef('user'), category=OuterRef('category'), updated_at__gt=watermark))
+
+
+def changed_since(watermark, today):
+    """
+    Budgets whose spend or amount may have grown since `watermark`: the budget
+    itself, or an expense or recurring expense in its category, was written
+    after it. Also budgets whose window opened since then, which may have been
+    overspent before it did. Every budget when there is no watermark yet.
+    """
+    if watermark is None:
+        return Q()
+    return (
+        Q(updated_at__gt=watermark)
+        | Q(start_date__gt=timezone.localdate(watermark), start_date__lte=today)
+        | _touched(Expense.objects.all(), watermark)
+        | _touched(RecurrenceRule.objects.filter(kind=Expense.kind), watermark)
+    )
+
+
+def crossed_thresholds(budget, thresholds):
+    """Thresholds (percent of the amount) the budget's spend is past; 100 means is_exceeded()."""
+    spent = budget.current_spend()
+    return [threshold for threshold in thresholds if spent * 100 > budget.amount * threshold]
+
+
+class BudgetNotifier:
+    """
+    Emails users whose active budgets went past an alert threshold, one message
+    per user listing the budgets.
+
+    Users who opted in are read in id order, `chunk_size` at a time, with a
+    fixed number of queries per chunk however many budgets it holds. Only
+    budgets touched since the previous run (see changed_since) are evaluated.
+    BudgetNotification rows are the queue: new crossings are inserted (the
+    unique constraint drops repeats), then the chunk's unsent rows are claimed
+    by marking them sent with one conditional update, so overlapping runs
+    never mail the same row twice, and mailed over one backend connection. A
+    failed send releases its rows for the next run; a run killed between the
+    claim and the send drops those alerts rather than repeating them.
+    """
+
+    def __init__(self, chunk_size=1000, thresholds=None, today=None):
+        self.chunk_size = chunk_size
+        self.thresholds = sorted(thresholds or settings.BUDGET_ALERT_THRESHOLDS)
+        self.today = today or timezone.localdate()
+
+    def run(self):
+        """Processes every chunk, then moves the watermark. Returns the number of emails sent."""
+        started = timezone.now()
+        state = NotifierWatermark.objects.filter(name=WATERMARK_NAME).first()
+        watermark = state.watermark - WATERMARK_OVERLAP if state else None
+
+        users = get_user_model().objects.filter(is_active=True, notify_on_budget_exceed=True).order_by('pk')
+        sent, last_id = 0, 0
+        with get_connection() as connection:
+            while True:
+                user_ids = list(users.filter(pk__gt=last_id).values_list('pk', flat=True)[:self.chunk_size])
+                if not user_ids:
+                    break
+                self.enqueue(user_ids, watermark)
+                sent += self.send(user_ids, connection)
+                last_id = user_ids[-1]
+
+        if state is None:
+            # An overlapping first run may have written it already.
+            NotifierWatermark.objects.bulk_create([NotifierWatermark(name=WATERMARK_NAME, watermark=started)], ignore_conflicts=True)
+        else:
+            NotifierWatermark.objects.filter(pk=state.pk).update(watermark=started)
+        return sent
+
+    def enqueue(self, user_ids, watermark):
+        budgets = list(
+            Budget.objects
+            .filter(user_id__in=user_ids, start_date__lte=self.today, end_date__gte=self.today)
+            .filter(changed_since(watermark, self.today))
+            .with_spent()
+        )
+        if not budgets:
+            return
+        attach_expense_rules(budgets, expense_rules_for(user_ids))
+
+        existing = set(
+            BudgetNotification.objects
+            .filter(budget__in=budgets)
+            .values_list('budget_id', 'threshold', 'start_date', 'end_date')
+        )
+        notifications = [
+            BudgetNotification(
+                budget=budget, threshold=threshold, spent=budget.current_spend(),
+                start_date=budget.start_date, end_date=budget.end_date,
+            )
+            for budget in budgets
+            for threshold in crossed_thresholds(budget, self.thresholds)
+            if (budget.pk, threshold, budget.start_date, budget.end_date) not in existing
+        ]
+        BudgetNotification.objects.bulk_create(notifications, ignore_conflicts=True)
+
+    def send(self, user_ids, connection):
+        claim = timezone.now()
+        # Another run's update waits on the same rows and then finds them sent.
+        claimed = (
+            BudgetNotification.objects
+            .filter(budget__user_id__in=user_ids, sent_at__isnull=True)
+            .update(sent_at=claim)
+        )
+        if not claimed:
+            return 0
+        pending = list(
+            BudgetNotification.objects
+            .filter(budget__user_id__in=user_ids, sent_at=claim)
+            .select_related('budget__user', 'budget__category')
+            .order_by('budget__user_id', 'budget_id', 'threshold')
+        )
+
+        by_user = defaultdict(dict)
+        for notification in pending:
+            # The highest threshold crossed is the one worth telling.
+            by_user[notification.budget.user][notification.budget_id] = notification
+        messages = [self.message(user, list(notifications.values())) for user, notifications in by_user.items()]
+        try:
+            connection.send_messages(messages)
+        except Exception:
+            BudgetNotification.objects.filter(pk__in=[notification.pk for notification in pending]).update(sent_at=None)
+            raise
+        return len(messages)
+
+    @staticmethod
+    def message(user, notifications):
+        lines = [
+            f"- {n.budget.name} ({n.budget.category.name}): {n.spent:.2f} of {n.budget.amount:.2f} "
+            f"{user.currency} spent between {n.start_date} and {n.end_date} (over {n.threshold}%)"
+            for n in notifications
+        ]
+        body = "\n".join([
+            f"Hi {user.full_name or user.email},",
+            "",
+            "These budgets went past their alert threshold:",
+            "",
+            *lines,
+        ])
+        subject = f"Budget alert: {len(notifications)} budget(s) past their threshold"
+        return EmailMessage(subject, body, settings.DEFAULT_FROM_EMAIL, [user.email])
+
+
+def run_budget_notifier():
+    """Entry point of the CRONJOBS schedule."""
+    BudgetNotifier().run()
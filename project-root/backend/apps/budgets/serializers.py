@@ -1,16 +1,28 @@
 # apps/budgets/serializers.py
 
 from rest_framework import serializers
-from .models import Budget
+from django.db import models
+from .models import Budget, BudgetTemplate, attach_expense_rules
+
+
+class BudgetListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        budgets = list(data.all() if isinstance(data, models.Manager) else data)
+        # Budgets read without their counter: one query for the recurring expenses of all of them.
+        attach_expense_rules([budget for budget in budgets if getattr(budget, 'counted_spent', None) is None])
+        return super().to_representation(budgets)
+
 
 class BudgetSerializer(serializers.ModelSerializer):
+    spent = serializers.DecimalField(max_digits=14, decimal_places=2, source='current_spend', read_only=True)
     exceeded = serializers.SerializerMethodField()
     exceeded_amount = serializers.SerializerMethodField()
 
     class Meta:
         model = Budget
-        fields = ['id', 'user', 'category', 'name', 'amount', 'start_date', 'end_date', 'created_at', 'exceeded', 'exceeded_amount']
-        read_only_fields = ['id', 'created_at', 'user', 'exceeded', 'exceeded_amount']
+        fields = ['id', 'user', 'category', 'name', 'amount', 'start_date', 'end_date', 'created_at', 'spent', 'exceeded', 'exceeded_amount']
+        read_only_fields = ['id', 'created_at', 'user', 'spent', 'exceeded', 'exceeded_amount']
+        list_serializer_class = BudgetListSerializer
 
     def get_exceeded(self, obj):
         return obj.is_exceeded()
@@ -21,3 +33,54 @@ class BudgetSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         validated_data['user'] = self.context['request'].user
         return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        instance = super().update(instance, validated_data)
+        # The annotated spend belongs to the old category/window.
+        instance.__dict__.pop('spent', None)
+        instance.__dict__.pop('counted_spent', None)
+        instance.__dict__.pop('_current_spend', None)
+        return instance
+
+
+class BudgetTemplateSerializer(serializers.ModelSerializer):
+    current_period_start = serializers.SerializerMethodField()
+    current_period_end = serializers.SerializerMethodField()
+    spent = serializers.DecimalField(max_digits=14, decimal_places=2, source='current_spend', read_only=True)
+    exceeded = serializers.SerializerMethodField()
+    exceeded_amount = serializers.SerializerMethodField()
+
+    class Meta:
+        model = BudgetTemplate
+        fields = [
+            'id', 'user', 'category', 'name', 'amount', 'period', 'start_date', 'end_date', 'created_at',
+            'current_period_start', 'current_period_end', 'spent', 'exceeded', 'exceeded_amount',
+        ]
+        read_only_fields = ['id', 'created_at', 'user']
+
+    def validate(self, attrs):
+        start = attrs.get('start_date', getattr(self.instance, 'start_date', None))
+        end = attrs.get('end_date', getattr(self.instance, 'end_date', None))
+        if start and end and end < start:
+            raise serializers.ValidationError({'end_date': "end_date must not be before start_date."})
+        return attrs
+
+    def get_current_period_start(self, obj):
+        period = obj.current_period()
+        return period[0] if period else None
+
+    def get_current_period_end(self, obj):
+        period = obj.current_period()
+        return period[1] if period else None
+
+    def get_exceeded(self, obj):
+        return obj.is_exceeded()
+
+    def get_exceeded_amount(self, obj):
+        return obj.exceeded_amount()
+
+    def update(self, instance, validated_data):
+        instance = super().update(instance, validated_data)
+        # The annotated spend belongs to the old category/periods.
+        instance.__dict__.pop('period_spent', None)
+        return instance
@@ -0,0 +1,36 @@
+# budgets/signals.py
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from apps.transactions.models import Expense
+from apps.transactions.signals import transactions_changed
+from finance_tracker.caching import bump_generation
+from .models import Budget, BudgetTemplate
+from .spend import apply_period_changes, apply_spend_changes, store_period_spend, store_spend
+
+
+@receiver(post_save, sender=Budget)
+@receiver(post_delete, sender=Budget)
+@receiver(post_save, sender=BudgetTemplate)
+@receiver(post_delete, sender=BudgetTemplate)
+def invalidate_cached_responses(sender, instance, **kwargs):
+    bump_generation(instance.user_id)
+
+
+@receiver(post_save, sender=Budget)
+def build_spend(sender, instance, **kwargs):
+    # New, or its category or window may have changed.
+    store_spend([Budget.objects.with_spent().get(pk=instance.pk)])
+
+
+@receiver(post_save, sender=BudgetTemplate)
+def build_period_spend(sender, instance, **kwargs):
+    # New, or its category, period or range may have changed.
+    store_period_spend([instance])
+
+
+@receiver(transactions_changed)
+def update_spend(sender, added, removed, **kwargs):
+    if sender.kind == Expense.kind:
+        apply_spend_changes(added, removed)
+        apply_period_changes(added, removed)
@@ -0,0 +1,170 @@
+# budgets/spend.py
+
+from collections import defaultdict
+from decimal import Decimal
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+from apps.transactions.models import Expense
+from .models import Budget, BudgetPeriodSpend, BudgetSpend, BudgetTemplate, attach_expense_rules, expense_rules_for
+
+
+def _signed_entries(added, removed):
+    """(user, category) -> [(signed amount, date)] of the categorized states."""
+    by_key = defaultdict(list)
+    for sign, states in ((1, added), (-1, removed)):
+        for state in states:
+            if state.category_id is not None:
+                by_key[state.user_id, state.category_id].append((sign * state.amount, state.date))
+    return by_key
+
+
+def apply_spend_changes(added, removed):
+    """
+    Shifts the spend counters of the budgets whose category and window the
+    written expense states fall in. A state moved to another category or date
+    is removed from the budgets it left and added to the ones it entered.
+
+    Budgets without a counter are left alone; their spend is read from the
+    tables, which already contain these changes.
+    """
+    by_key = _signed_entries(added, removed)
+    if not by_key:
+        return
+
+    dates = [day for entries in by_key.values() for _, day in entries]
+    budgets = (
+        Budget.objects
+        .filter(
+            user_id__in={user_id for user_id, _ in by_key},
+            category_id__in={category_id for _, category_id in by_key},
+            start_date__lte=max(dates),
+            end_date__gte=min(dates),
+            spend__isnull=False,
+        )
+        .values_list('pk', 'user_id', 'category_id', 'start_date', 'end_date')
+    )
+    deltas = defaultdict(list)
+    for pk, user_id, category_id, start, end in budgets:
+        delta = sum((amount for amount, day in by_key.get((user_id, category_id), ()) if start <= day <= end), Decimal('0'))
+        if delta:
+            deltas[delta].append(pk)
+
+    # Overlapping budgets hit by the same write move by the same amount: one update each.
+    for delta, pks in deltas.items():
+        BudgetSpend.objects.filter(budget_id__in=pks).update(spent=F('spent') + delta, updated_at=timezone.now())
+
+
+def store_spend(budgets):
+    """Writes the counters of budgets loaded with with_spent(), replacing existing ones."""
+    if not budgets:
+        return []
+    attach_expense_rules(budgets)
+    now = timezone.now()
+    rows = [BudgetSpend(budget_id=budget.pk, spent=budget.current_spend(), updated_at=now) for budget in budgets]
+    with transaction.atomic():
+        BudgetSpend.objects.filter(budget_id__in=[budget.pk for budget in budgets]).delete()
+        BudgetSpend.objects.bulk_create(rows, batch_size=1000, ignore_conflicts=True)
+    return rows
+
+
+def _period_deltas(templates, by_key):
+    """(template id, period start, period end) -> spend moved by the entries of `by_key`."""
+    deltas = defaultdict(Decimal)
+    for template in templates:
+        for amount, day in by_key.get((template.user_id, template.category_id), ()):
+            period = template.period_for(day)
+            if period is not None:
+                deltas[(template.pk, *period)] += amount
+    return deltas
+
+
+def apply_period_changes(added, removed):
+    """Shifts the BudgetPeriodSpend rows of the template periods the written expense states fall in."""
+    by_key = _signed_entries(added, removed)
+    if not by_key:
+        return
+    templates = BudgetTemplate.objects.filter(
+        user_id__in={user_id for user_id, _ in by_key},
+        category_id__in={category_id for _, category_id in by_key},
+        start_date__lte=max(day for entries in by_key.values() for _, day in entries),
+    )
+    for (template_id, start, end), amount in _period_deltas(templates, by_key).items():
+        if not amount:
+            continue
+        row = BudgetPeriodSpend.objects.filter(template_id=template_id, period_start=start)
+        changes = {'spent': F('spent') + amount, 'updated_at': timezone.now()}
+        if row.update(**changes):
+            continue
+        try:
+            with transaction.atomic():
+                BudgetPeriodSpend.objects.create(template_id=template_id, period_start=start, period_end=end, spent=amount)
+        except IntegrityError:
+            # A concurrent write created the row first.
+            row.update(**changes)
+
+
+def store_period_spend(templates):
+    """Recomputes the BudgetPeriodSpend rows of the given templates from the expenses and recurring expenses."""
+    by_key = defaultdict(list)
+    if templates:
+        user_ids = {template.user_id for template in templates}
+        category_ids = {template.category_id for template in templates}
+        # Daily totals: the period of a day is worked out in Python.
+        daily = (
+            Expense.objects
+            .filter(user_id__in=user_ids, category_id__in=category_ids, date__gte=min(t.start_date for t in templates))
+            .order_by()
+            .values('user_id', 'category_id', 'date')
+            .annotate(total=Sum('amount'))
+        )
+        for row in daily:
+            by_key[row['user_id'], row['category_id']].append((row['total'], row['date']))
+        for rule in expense_rules_for(user_ids).filter(category_id__in=category_ids):
+            by_key[rule.user_id, rule.category_id] += [(state.amount, state.date) for state in rule.states()]
+
+    rows = [
+        BudgetPeriodSpend(template_id=template_id, period_start=start, period_end=end, spent=amount)
+        for (template_id, start, end), amount in _period_deltas(templates, by_key).items()
+        if amount
+    ]
+    with transaction.atomic():
+        BudgetPeriodSpend.objects.filter(template__in=[template.pk for template in templates]).delete()
+        BudgetPeriodSpend.objects.bulk_create(rows, batch_size=1000)
+    return rows
+
+
+def rebuild_budget_spend(user_ids):
+    """
+    Recomputes the spend counters of every budget, and the period totals of
+    every template, of the given users. Returns how many budgets and templates
+    were rebuilt.
+    """
+    budgets = store_spend(list(Budget.objects.filter(user_id__in=user_ids).with_spent()))
+    templates = list(BudgetTemplate.objects.filter(user_id__in=user_ids))
+    store_period_spend(templates)
+    return len(budgets) + len(templates)
+
+
+def build_missing_spend(budget_ids, batch_size=1000):
+    """Builds the counters of the given budgets (created before the counters existed, or with bulk_create)."""
+    for start in range(0, len(budget_ids), batch_size):
+        store_spend(list(Budget.objects.filter(pk__in=budget_ids[start:start + batch_size]).with_spent()))
+
+
+def load_spend(budgets):
+    """
+    Sets the spend of budgets loaded with select_related('spend') from their
+    counters. Budgets without one are computed from the tables instead (a
+    fixed number of queries whatever their count); reads never write them,
+    rebuild_budget_spend does.
+    """
+    missing = [budget.pk for budget in budgets if not hasattr(budget, 'spend')]
+    computed = {}
+    if missing:
+        loaded = list(Budget.objects.filter(pk__in=missing).with_spent())
+        attach_expense_rules(loaded)
+        computed = {budget.pk: budget.current_spend() for budget in loaded}
+    for budget in budgets:
+        budget._current_spend = computed[budget.pk] if budget.pk in computed else budget.spend.spent
+    return budgets
@@ -1,3 +1,479 @@
+from datetime import date, datetime, timedelta
+from dateutil.relativedelta import relativedelta
+from io import StringIO
+from unittest import mock
+from decimal import Decimal
+from django.core import mail
+from django.core.mail.backends import locmem
+from django.core.cache import cache
+from django.core.management import call_command
 from django.test import TestCase
+from django.utils import timezone
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from apps.users.models import User
+from apps.categories.models import Category
+from apps.transactions.models import Expense, Income
+from apps.transactions.recurrence import exclude_occurrence
+from apps.transactions.utils import create_recurring_entries
+from .models import Budget, BudgetNotification, NotifierWatermark, BudgetPeriodSpend, BudgetSpend, BudgetTemplate
+from .notifications import BudgetNotifier
+from .spend import build_missing_spend, load_spend
+from .factories import BudgetFactory, BudgetTemplateFactory
+from apps.categories.factories import CategoryFactory
+from apps.transactions.factories import ExpenseFactory, RecurrenceRuleFactory
+from apps.users.factories import UserFactory
+from finance_tracker.testing import QueryBudgetMixin
 
-# Create your tests here.
+
+class BudgetWarningTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email="test@example.com", password="securePassword123")
+        self.client.force_authenticate(user=self.user)
+        self.food = Category.objects.create(user=self.user, name="Food", type="expense")
+        self.rent = Category.objects.create(user=self.user, name="Rent", type="expense")
+        self.url = reverse('budget-warnings')
+
+    def make_budget(self, category, amount, name="Budget"):
+        return Budget.objects.create(
+            user=self.user, category=category, name=name, amount=Decimal(amount),
+            start_date=date(2025, 1, 1), end_date=date(2025, 1, 31),
+        )
+
+    def test_only_exceeded_budgets_are_reported(self):
+        self.make_budget(self.food, '100.00', name="Groceries")
+        self.make_budget(self.rent, '1000.00', name="Rent")
+        Expense.objects.create(user=self.user, category=self.food, amount=Decimal('80.00'), date=date(2025, 1, 5))
+        Expense.objects.create(user=self.user, category=self.food, amount=Decimal('45.50'), date=date(2025, 1, 31))
+        # Outside the window and in another category: ignored.
+        Expense.objects.create(user=self.user, category=self.food, amount=Decimal('500.00'), date=date(2025, 2, 1))
+        Expense.objects.create(user=self.user, category=self.rent, amount=Decimal('900.00'), date=date(2025, 1, 1))
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [{
+            "budget_name": "Groceries",
+            "budget_amount": 100.0,
+            "total_expense": 125.5,
+            "exceeded_by": 25.5,
+            "category": "Food",
+        }])
+
+    def test_query_count_does_not_grow_with_budgets(self):
+        for i in range(10):
+            self.make_budget(self.food, '1.00', name=f"Budget {i}")
+        Expense.objects.create(user=self.user, category=self.food, amount=Decimal('5.00'), date=date(2025, 1, 5))
+
+        # Budgets joined with their spend counters, templates with their current period.
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.data), 10)
+
+    def test_async_view_matches_sync_view(self):
+        self.make_budget(self.food, '100.00', name="Groceries")
+        Expense.objects.create(user=self.user, category=self.food, amount=Decimal('125.50'), date=date(2025, 1, 5))
+
+        response = self.client.get(reverse('budget-warnings-async'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), self.client.get(self.url).json())
+        self.assertEqual(len(response.json()), 1)
+
+
+class BudgetSpendTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email="test@example.com", password="securePassword123")
+        self.client.force_authenticate(user=self.user)
+        self.food = Category.objects.create(user=self.user, name="Food", type="expense")
+        self.over = Budget.objects.create(
+            user=self.user, category=self.food, name="Over", amount=Decimal('50.00'),
+            start_date=date(2025, 1, 1), end_date=date(2025, 1, 31),
+        )
+        self.under = Budget.objects.create(
+            user=self.user, category=self.food, name="Under", amount=Decimal('50.00'),
+            start_date=date(2025, 2, 1), end_date=date(2025, 2, 28),
+        )
+        Expense.objects.create(user=self.user, category=self.food, amount=Decimal('75.00'), date=date(2025, 1, 10))
+        Expense.objects.create(user=self.user, category=self.food, amount=Decimal('20.00'), date=date(2025, 2, 10))
+
+    def test_list_reports_actual_spend(self):
+        # Budgets joined with their counters.
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('budget-list'))
+        rows = {row['name']: row for row in response.data}
+        self.assertEqual(rows['Over']['spent'], '75.00')
+        self.assertTrue(rows['Over']['exceeded'])
+        self.assertEqual(rows['Over']['exceeded_amount'], Decimal('25.00'))
+        self.assertEqual(rows['Under']['spent'], '20.00')
+        self.assertFalse(rows['Under']['exceeded'])
+
+    def test_exceeded_filter_runs_in_database(self):
+        response = self.client.get(reverse('budget-list'), {'exceeded': 'true', 'page_size': 10})
+        self.assertEqual([row['name'] for row in response.data['results']], ['Over'])
+
+    def test_exceeded_filter_with_recurring_expenses_runs_in_database(self):
+        # Jan 20 and 27 in "Over"; Feb 3 and 10 in "Under" and "Bulk".
+        self.client.post(reverse('expense-list'), {
+            'amount': '10.00', 'date': '2025-01-20', 'category': self.food.pk,
+            'is_recurring': True, 'recurrence_type': 'weekly', 'recurrence_count': 4,
+        })
+        # A budget created without signals has no counter; reads compute its
+        # spend without writing one.
+        bulk, = Budget.objects.bulk_create([Budget(
+            user=self.user, category=self.food, name="Bulk", amount=Decimal('10.00'),
+            start_date=date(2025, 2, 1), end_date=date(2025, 2, 28),
+        )])
+        rows = {row['name']: row for row in self.client.get(reverse('budget-list')).data}
+        self.assertEqual(rows['Bulk']['spent'], '40.00')
+        self.assertEqual(BudgetSpend.objects.count(), 2)
+        # Until then `exceeded` goes by its expense rows (20.00 > 10.00).
+        response = self.client.get(reverse('budget-list'), {'exceeded': 'true', 'before': 1})
+        self.assertEqual(sorted(row['name'] for row in response.data), ['Bulk', 'Over'])
+
+        build_missing_spend([bulk.pk])
+        self.assertEqual(BudgetSpend.objects.get(budget=bulk).spent, Decimal('40.00'))
+        response = self.client.get(reverse('budget-list'), {'exceeded': 'true'})
+        self.assertEqual(sorted(row['name'] for row in response.data), ['Bulk', 'Over'])
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('budget-list'), {'exceeded': 'false', 'nocache': 1})
+        self.assertEqual([row['name'] for row in response.data], ['Under'])
+
+    def test_model_without_annotation(self):
+        self.assertTrue(Budget.objects.get(pk=self.over.pk).is_exceeded())
+        self.assertEqual(self.under.exceeded_amount(), Decimal('0.00'))
+
+    def test_update_recomputes_spend(self):
+        response = self.client.patch(reverse('budget-detail', args=[self.under.pk]), {'start_date': '2025-01-01'})
+        self.assertEqual(response.data['spent'], '95.00')
+
+    def test_recurring_expenses_count_towards_spend(self):
+        self.client.post(reverse('expense-list'), {
+            'amount': '10.00', 'date': '2024-12-20', 'category': self.food.pk,
+            'is_recurring': True, 'recurrence_type': 'weekly', 'recurrence_count': 10,
+        })
+        # Occurrences on Jan 3, 10, 17, 24, 31 fall in the "Over" window.
+        rows = {row['name']: row for row in self.client.get(reverse('budget-list')).data}
+        self.assertEqual(rows['Over']['spent'], '125.00')
+        self.assertEqual(rows['Under']['spent'], '50.00')
+
+        response = self.client.get(reverse('budget-list'), {'exceeded': 'false'})
+        self.assertEqual([row['name'] for row in response.data], ['Under'])
+
+        warnings = self.client.get(reverse('budget-warnings')).data
+        self.assertEqual([(w['budget_name'], w['total_expense']) for w in warnings], [("Over", 125.0)])
+
+    def test_cached_list_invalidated_by_writes(self):
+        url = reverse('budget-list')
+        self.assertEqual(self.client.get(url)['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url)['X-Cache'], 'HIT')
+
+        Expense.objects.create(user=self.user, category=self.food, amount=Decimal('5.00'), date=date(2025, 2, 11))
+        rows = {row['name']: row for row in self.client.get(url).data}
+        self.assertEqual(rows['Under']['spent'], '25.00')
+
+        self.client.patch(reverse('budget-detail', args=[self.under.pk]), {'name': 'Renamed'})
+        self.assertIn('Renamed', [row['name'] for row in self.client.get(url).data])
+
+
+class BudgetSpendCounterTests(TestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        self.food = CategoryFactory(user=self.user, name="Food")
+        self.rent = CategoryFactory(user=self.user, name="Rent")
+        self.january = BudgetFactory(user=self.user, category=self.food, start_date=date(2025, 1, 1), end_date=date(2025, 1, 31))
+        self.quarter = BudgetFactory(user=self.user, category=self.food, start_date=date(2025, 1, 1), end_date=date(2025, 3, 31))
+
+    def counters(self):
+        return {
+            budget.pk: budget.current_spend()
+            for budget in load_spend(list(Budget.objects.filter(user=self.user).select_related('spend')))
+        }
+
+    def assertMatchesTables(self):
+        counters = self.counters()
+        for budget in Budget.objects.filter(user=self.user):
+            self.assertEqual(counters[budget.pk], budget.current_spend(), budget.name)
+
+    def test_expense_writes_move_between_windows_and_categories(self):
+        expense = ExpenseFactory(user=self.user, category=self.food, amount=Decimal('40.00'), date=date(2025, 1, 10))
+        self.assertEqual(self.counters()[self.january.pk], Decimal('40.00'))
+        self.assertEqual(self.counters()[self.quarter.pk], Decimal('40.00'))
+
+        expense.date = date(2025, 2, 10)
+        expense.save()
+        self.assertEqual(self.counters()[self.january.pk], Decimal('0.00'))
+        self.assertEqual(self.counters()[self.quarter.pk], Decimal('40.00'))
+
+        expense.category = self.rent
+        expense.save()
+        self.assertEqual(self.counters()[self.quarter.pk], Decimal('0.00'))
+
+        expense.category = self.food
+        expense.save()
+        expense.delete()
+        self.assertMatchesTables()
+        self.assertEqual(self.counters()[self.quarter.pk], Decimal('0.00'))
+
+    def test_recurring_and_bulk_writes(self):
+        base = ExpenseFactory(user=self.user, category=self.food, amount=Decimal('10.00'), date=date(2025, 1, 15))
+        rule = create_recurring_entries(Expense, base, 'monthly', 4)
+        # Jan 15 (the row), Feb 15 and Mar 15 in the quarter; Apr 15 outside it.
+        self.assertEqual(self.counters()[self.quarter.pk], Decimal('30.00'))
+        exclude_occurrence(rule, 2)
+        self.assertEqual(self.counters()[self.quarter.pk], Decimal('20.00'))
+
+        ExpenseFactory(user=self.user, category=self.food, amount=Decimal('1.00'), date=date(2025, 1, 2))
+        Income.objects.create(user=self.user, category=self.food, amount=Decimal('99.00'), date=date(2025, 1, 2))
+        self.assertMatchesTables()
+
+    def test_budget_edits_rebuild_the_counter(self):
+        ExpenseFactory(user=self.user, category=self.rent, amount=Decimal('70.00'), date=date(2025, 1, 10))
+        self.january.category = self.rent
+        self.january.save()
+        self.assertEqual(self.counters()[self.january.pk], Decimal('70.00'))
+
+    def test_missing_counters_are_computed_on_read(self):
+        ExpenseFactory(user=self.user, category=self.food, amount=Decimal('5.00'), date=date(2025, 1, 10))
+        BudgetSpend.objects.all().delete()
+        self.assertEqual(self.counters()[self.january.pk], Decimal('5.00'))
+        self.assertEqual(BudgetSpend.objects.count(), 0)
+
+        build_missing_spend([self.january.pk, self.quarter.pk])
+        self.assertEqual(BudgetSpend.objects.count(), 2)
+        self.assertMatchesTables()
+
+    def test_rebuild_command(self):
+        ExpenseFactory(user=self.user, category=self.food, amount=Decimal('5.00'), date=date(2025, 1, 10))
+        BudgetSpend.objects.filter(budget=self.january).update(spent=Decimal('123.00'))
+        out = StringIO()
+        call_command('rebuild_budget_spend', '--user', str(self.user.pk), stdout=out)
+        self.assertIn("Rebuilt the spend of 2 budget(s) and template(s) for 1 user(s).", out.getvalue())
+        self.assertEqual(BudgetSpend.objects.get(budget=self.january).spent, Decimal('5.00'))
+
+
+class BudgetTemplateTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = UserFactory()
+        self.client.force_authenticate(user=self.user)
+        self.food = CategoryFactory(user=self.user, name="Food")
+        self.today = timezone.localdate()
+        self.monthly = BudgetTemplateFactory(
+            user=self.user, category=self.food, name="Groceries", amount=Decimal('100.00'),
+            start_date=self.today.replace(day=1) - relativedelta(months=6),
+        )
+
+    def test_periods(self):
+        template = BudgetTemplate(period='monthly', start_date=date(2025, 1, 31))
+        self.assertEqual(template.period_for(date(2025, 2, 27)), (date(2025, 1, 31), date(2025, 2, 27)))
+        self.assertEqual(template.period_for(date(2025, 2, 28)), (date(2025, 2, 28), date(2025, 3, 30)))
+        self.assertIsNone(template.period_for(date(2025, 1, 30)))
+
+        template = BudgetTemplate(period='weekly', start_date=date(2025, 1, 6), end_date=date(2025, 1, 14))
+        self.assertEqual(template.period_for(date(2025, 1, 19)), (date(2025, 1, 13), date(2025, 1, 19)))
+        self.assertIsNone(template.period_for(date(2025, 1, 20)))
+
+        template = BudgetTemplate(period='yearly', start_date=date(2024, 4, 1))
+        self.assertEqual(template.period_for(date(2025, 3, 31)), (date(2024, 4, 1), date(2025, 3, 31)))
+
+    def test_period_spend_follows_expense_writes(self):
+        expense = ExpenseFactory(user=self.user, category=self.food, amount=Decimal('120.00'), date=self.today)
+        ExpenseFactory(user=self.user, category=self.food, amount=Decimal('30.00'), date=self.monthly.start_date)
+        current = self.monthly.current_period()
+        self.assertEqual(BudgetPeriodSpend.objects.get(template=self.monthly, period_start=current[0]).spent, Decimal('120.00'))
+
+        expense.date = self.monthly.start_date
+        expense.save()
+        spent = dict(BudgetPeriodSpend.objects.values_list('period_start', 'spent'))
+        self.assertEqual(spent, {current[0]: Decimal('0.00'), self.monthly.start_date: Decimal('150.00')})
+
+        built = set(BudgetPeriodSpend.objects.filter(spent__gt=0).values_list('period_start', 'spent'))
+        call_command('rebuild_budget_spend', stdout=StringIO())
+        self.assertEqual(set(BudgetPeriodSpend.objects.values_list('period_start', 'spent')), built)
+
+    def test_list_reports_current_period(self):
+        ExpenseFactory(user=self.user, category=self.food, amount=Decimal('120.00'), date=self.today)
+        ExpenseFactory(user=self.user, category=self.food, amount=Decimal('500.00'), date=self.monthly.start_date)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('budget-template-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        row = response.data[0]
+        self.assertEqual(row['current_period_start'], self.today.replace(day=1))
+        self.assertEqual(row['spent'], '120.00')
+        self.assertTrue(row['exceeded'])
+        self.assertEqual(row['exceeded_amount'], Decimal('20.00'))
+
+        warnings = self.client.get(reverse('budget-warnings')).data
+        self.assertEqual([(w['budget_name'], w['total_expense']) for w in warnings], [("Groceries", 120.0)])
+        self.assertEqual(self.client.get(reverse('budget-warnings-async')).json(), warnings)
+
+    def test_periods_action(self):
+        ExpenseFactory(user=self.user, category=self.food, amount=Decimal('40.00'), date=self.monthly.start_date)
+        response = self.client.get(reverse('budget-template-periods', args=[self.monthly.pk]), {'count': 12})
+        self.assertEqual(len(response.data), 7)
+        self.assertEqual(response.data[0]['start'], self.today.replace(day=1))
+        self.assertEqual(response.data[-1]['start'], self.monthly.start_date)
+        self.assertEqual(response.data[-1]['spent'], Decimal('40.00'))
+
+        response = self.client.get(reverse('budget-template-periods', args=[self.monthly.pk]), {'count': 0})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_create_and_update(self):
+        ExpenseFactory(user=self.user, category=self.food, amount=Decimal('15.00'), date=self.today)
+        response = self.client.post(reverse('budget-template-list'), {
+            'category': self.food.pk, 'name': "Weekly food", 'amount': '10.00',
+            'period': 'weekly', 'start_date': str(self.today - timedelta(days=3)),
+        })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['spent'], '15.00')
+        self.assertTrue(response.data['exceeded'])
+
+        response = self.client.patch(reverse('budget-template-detail', args=[response.data['id']]), {'amount': '20.00'})
+        self.assertFalse(response.data['exceeded'])
+
+        response = self.client.post(reverse('budget-template-list'), {
+            'category': self.food.pk, 'name': "Backwards", 'amount': '10.00', 'period': 'yearly',
+            'start_date': '2025-01-01', 'end_date': '2024-01-01',
+        })
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class QueryBudgetTests(QueryBudgetMixin, APITestCase):
+    """Query counts of the budget endpoints must not depend on how many budgets or expenses exist."""
+
+    def setUp(self):
+        self.user = UserFactory()
+        self.client.force_authenticate(user=self.user)
+        self.budget = BudgetFactory(user=self.user)
+        self.add_budgets(5)
+
+    def add_budgets(self, count):
+        for budget in BudgetFactory.create_batch(count, user=self.user, amount=Decimal('10.00')):
+            BudgetTemplateFactory(user=self.user, category=budget.category, period='weekly')
+            ExpenseFactory.create_batch(5, user=self.user, category=budget.category)
+            RecurrenceRuleFactory(user=self.user, category=budget.category)
+
+    def grow(self):
+        self.add_budgets(20)
+
+    def test_endpoints(self):
+        # Warnings: budgets with their counters, templates with their current period.
+        budgets = {'budget-list': 2, 'budget-warnings': 2, 'budget-warnings-async': 2, 'budget-template-list': 1}
+        for name, budget in budgets.items():
+            with self.subTest(name=name):
+                self.assertQueryBudget(budget, reverse(name), self.grow)
+        self.assertQueryBudget(2, reverse('budget-detail', args=[self.budget.pk]), self.grow)
+        template = BudgetTemplateFactory(user=self.user, category=self.budget.category)
+        self.assertQueryBudget(2, reverse('budget-template-periods', args=[template.pk]), self.grow)
+
+
+class BudgetNotifierTests(TestCase):
+    today = date(2025, 1, 20)
+
+    def setUp(self):
+        self.user = UserFactory(full_name="Alex")
+        self.food = CategoryFactory(user=self.user, name="Food")
+        self.groceries = BudgetFactory(
+            user=self.user, category=self.food, name="Groceries", amount=Decimal('100.00'),
+            start_date=date(2025, 1, 1), end_date=date(2025, 1, 31),
+        )
+
+    def run_notifier(self, **kwargs):
+        return BudgetNotifier(today=self.today, **kwargs).run()
+
+    def spend(self, amount, category=None, user=None):
+        return ExpenseFactory(user=user or self.user, category=category or self.food, amount=Decimal(amount), date=date(2025, 1, 10))
+
+    def test_alerts_once_per_crossing(self):
+        self.spend('60.00')
+        self.assertEqual(self.run_notifier(), 0)
+
+        self.spend('50.00')
+        self.assertEqual(self.run_notifier(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, [self.user.email])
+        self.assertIn("Groceries (Food): 110.00 of 100.00", mail.outbox[0].body)
+
+        self.spend('5.00')
+        self.assertEqual(self.run_notifier(), 0)
+        self.assertEqual(BudgetNotification.objects.get().spent, Decimal('110.00'))
+        self.assertIsNotNone(BudgetNotification.objects.get().sent_at)
+
+    def test_thresholds_and_opt_out(self):
+        self.spend('85.00')
+        other = UserFactory(notify_on_budget_exceed=False)
+        BudgetFactory(user=other, amount=Decimal('1.00'), start_date=date(2025, 1, 1), end_date=date(2025, 1, 31))
+        self.assertEqual(self.run_notifier(thresholds=[80, 100]), 1)
+        self.assertIn("(over 80%)", mail.outbox[0].body)
+
+        self.spend('20.00')
+        self.run_notifier(thresholds=[80, 100])
+        self.assertIn("(over 100%)", mail.outbox[1].body)
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_only_changed_budgets_are_evaluated(self):
+        self.run_notifier()
+        # Spend older than the watermark (minus the overlap) is not looked at again...
+        rent = BudgetFactory(user=self.user, amount=Decimal('10.00'), start_date=date(2025, 1, 1), end_date=date(2025, 1, 31))
+        self.spend('50.00', category=rent.category)
+        Expense.objects.filter(category=rent.category).update(updated_at=timezone.now() - timedelta(hours=1))
+        Budget.objects.filter(pk=rent.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(self.run_notifier(), 0)
+
+        # ...a new expense in the category brings the budget back in.
+        self.spend('1.00', category=rent.category)
+        self.assertEqual(self.run_notifier(), 1)
+
+    def test_budget_overspent_before_its_window_opens(self):
+        upcoming = BudgetFactory(
+            user=self.user, amount=Decimal('10.00'), start_date=date(2025, 2, 1), end_date=date(2025, 2, 28),
+        )
+        ExpenseFactory(user=self.user, category=upcoming.category, amount=Decimal('50.00'), date=date(2025, 2, 3))
+        self.assertEqual(self.run_notifier(), 0)
+
+        # Nothing is written once the window opens; the budget is still evaluated.
+        last_run = timezone.make_aware(datetime(2025, 1, 31, 12))
+        NotifierWatermark.objects.update(watermark=last_run)
+        Budget.objects.update(updated_at=last_run - timedelta(days=1))
+        Expense.objects.update(updated_at=last_run - timedelta(days=1))
+        self.assertEqual(BudgetNotifier(today=date(2025, 2, 1)).run(), 1)
+        self.assertIn(upcoming.name, mail.outbox[0].body)
+
+    def test_overlapping_runs_send_each_alert_once(self):
+        self.spend('150.00')
+        send_messages = locmem.EmailBackend.send_messages
+
+        def overlapping(backend, messages):
+            # A second run starts while the first one is still sending.
+            self.assertEqual(self.run_notifier(), 0)
+            return send_messages(backend, messages)
+
+        with mock.patch.object(locmem.EmailBackend, 'send_messages', autospec=True, side_effect=overlapping):
+            self.assertEqual(self.run_notifier(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_failed_send_is_retried(self):
+        self.spend('150.00')
+        with mock.patch.object(locmem.EmailBackend, 'send_messages', side_effect=OSError):
+            with self.assertRaises(OSError):
+                self.run_notifier()
+        self.assertIsNone(BudgetNotification.objects.get().sent_at)
+        self.assertEqual(self.run_notifier(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_queries_per_chunk_do_not_grow_with_budgets(self):
+        for index in range(6):
+            user = UserFactory()
+            for budget in BudgetFactory.create_batch(3, user=user, amount=Decimal('1.00'), start_date=date(2025, 1, 1), end_date=date(2025, 1, 31)):
+                self.spend('5.00', category=budget.category, user=user)
+
+        # Watermark, then per chunk of 5 users: ids, budgets, rules, existing
+        # alerts, insert, claim, claimed alerts; an empty chunk; the watermark write.
+        with self.assertNumQueries(1 + 2 * 7 + 1 + 1):
+            sent = self.run_notifier(chunk_size=5)
+        self.assertEqual(sent, 6)
+        self.assertEqual(BudgetNotification.objects.filter(sent_at__isnull=False).count(), 18)
@@ -1,11 +1,14 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import BudgetViewSet,BudgetWarningView
+from .views import BudgetViewSet,BudgetWarningView, AsyncBudgetWarningView, BudgetTemplateViewSet
 
 router = DefaultRouter()
+# Before the budgets: '' would otherwise take 'templates' for a budget id.
+router.register(r'templates', BudgetTemplateViewSet, basename='budget-template')
 router.register(r'', BudgetViewSet, basename='budget')
 
 urlpatterns = [
     path('warnings/',BudgetWarningView.as_view(),name='budget-warnings'),
+    path('async/warnings/', AsyncBudgetWarningView.as_view(), name='budget-warnings-async'),
     path('', include(router.urls)),
 ]
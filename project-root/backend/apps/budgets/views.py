@@ -1,30 +1,40 @@
 # apps/budgets/views.py
 
 from rest_framework import viewsets, permissions
-from .models import Budget
-from .serializers import BudgetSerializer
+from rest_framework.decorators import action
+from .models import Budget, BudgetTemplate
+from .serializers import BudgetSerializer, BudgetTemplateSerializer
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import OrderingFilter
 from rest_framework.response import Response
 # from django.db.models import Q
 from datetime import datetime
+from decimal import Decimal
+from django.utils import timezone
 from rest_framework.views import APIView
-from apps.transactions.models import Expense
-from .models import Budget
-from django.db.models import Sum
+from apps.transactions.utils import parse_int_param
+from .spend import load_spend
+from django.db.models import F, Q
+from finance_tracker.async_views import AsyncAPIView, run_concurrently
+from finance_tracker.caching import cache_per_user
+from finance_tracker.conditional import conditional_get
+from finance_tracker.pagination import CreatedKeysetPagination
 
 
 
 class BudgetViewSet(viewsets.ModelViewSet):
     serializer_class = BudgetSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CreatedKeysetPagination
 
     filter_backends = [DjangoFilterBackend, OrderingFilter]
     filterset_fields = ['category', 'start_date', 'end_date']
     ordering_fields = ['start_date', 'created_at']
 
     def get_queryset(self):
-        queryset = Budget.objects.filter(user=self.request.user)
+        # Spend comes from the counters, joined in the same query; serializer and
+        # `exceeded` filter read it.
+        queryset = Budget.objects.filter(user=self.request.user).with_counted_spend()
 
         # Custom filtering
         month = self.request.query_params.get('month')
@@ -35,38 +45,118 @@ class BudgetViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(start_date__month=month)
         if year:
             queryset = queryset.filter(start_date__year=year)
-        if exceeded == 'true':
-            queryset = [b for b in queryset if b.is_exceeded()]
+        if exceeded in ('true', 'false'):
+            # Budgets bulk-created without a counter (until rebuild_budget_spend)
+            # are filtered on their expense rows.
+            lookup = 'gt' if exceeded == 'true' else 'lte'
+            queryset = queryset.with_spent().filter(
+                Q(**{f'counted_spent__{lookup}': F('amount')}) |
+                Q(**{'counted_spent__isnull': True, f'spent__{lookup}': F('amount')})
+            )
 
         return queryset
 
+    @conditional_get
+    @cache_per_user
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @conditional_get
+    @cache_per_user
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
 
+class BudgetTemplateViewSet(viewsets.ModelViewSet):
+    """
+    Budgets repeating every week, month or year. Each reports its current
+    period and that period's spend; the whole list is one query.
+    """
+    serializer_class = BudgetTemplateSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CreatedKeysetPagination
+
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['category', 'period']
+
+    def get_queryset(self):
+        return BudgetTemplate.objects.filter(user=self.request.user).with_period_spend(timezone.localdate())
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+    @action(detail=True, methods=['get'])
+    def periods(self, request, pk=None):
+        """The last `count` periods (default 12) up to the current one, newest first, with their spend."""
+        template = self.get_object()
+        count = parse_int_param(request.query_params.get('count', 12), 'count', 1, 120)
+        last = template.period_index(timezone.localdate())
+        if template.end_date is not None:
+            last = min(last, template.period_index(template.end_date))
+        bounds = [template.period_bounds(index) for index in range(last, max(last - count, -1), -1)]
+
+        spent = dict(
+            template.period_spend
+            .filter(period_start__in=[start for start, _ in bounds])
+            .values_list('period_start', 'spent')
+        )
+        zero = Decimal('0.00')
+        return Response([
+            {
+                "start": start,
+                "end": end,
+                "spent": spent.get(start, zero),
+                "exceeded": spent.get(start, zero) > template.amount,
+                "exceeded_amount": max(spent.get(start, zero) - template.amount, zero),
+            }
+            for start, end in bounds
+        ])
+
+
+def warning_budgets(user):
+    """The user's budgets with their spend counters: one query once the counters are built."""
+    budgets = Budget.objects.filter(user=user).select_related('category', 'spend').order_by('id')
+    return load_spend(list(budgets))
+
+
+def warning_templates(user):
+    """The user's templates with the spend of their current period, in one query."""
+    templates = BudgetTemplate.objects.filter(user=user).with_period_spend(timezone.localdate())
+    return [template for template in templates.select_related('category').order_by('id') if template.current_period()]
+
+
+def budget_warnings(budgets):
+    """Budgets and templates (current period) over their amount."""
+    return [
+        {
+            "budget_name": budget.name,
+            "budget_amount": float(budget.amount),
+            "total_expense": float(budget.current_spend()),
+            "exceeded_by": float(budget.exceeded_amount()),
+            "category": budget.category.name
+        }
+        for budget in budgets
+        if budget.is_exceeded()
+    ]
+
+
 class BudgetWarningView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
+    @cache_per_user
     def get(self, request):
-        user = request.user
-        warnings = []
-
-        budgets = Budget.objects.filter(user=user)
-
-        for budget in budgets:
-            total_expense = Expense.objects.filter(
-                user=user,
-                category=budget.category,
-                date__range=[budget.start_date, budget.end_date]
-            ).aggregate(total=Sum('amount'))['total'] or 0
-
-            if total_expense > budget.amount:
-                warnings.append({
-                    "budget_name": budget.name,
-                    "budget_amount": float(budget.amount),
-                    "total_expense": float(total_expense),
-                    "exceeded_by": float(total_expense - budget.amount),
-                    "category": budget.category.name
-                })
-
-        return Response(warnings)
\ No newline at end of file
+        return Response(budget_warnings(warning_budgets(request.user) + warning_templates(request.user)))
+
+
+class AsyncBudgetWarningView(AsyncAPIView):
+    """BudgetWarningView for ASGI: budgets and templates are read concurrently."""
+
+    async def get(self, request):
+        budgets, templates = await run_concurrently(
+            lambda: warning_budgets(request.user),
+            lambda: warning_templates(request.user),
+        )
+        return budget_warnings(budgets + templates)
@@ -0,0 +1,14 @@
+# categories/factories.py
+
+import factory
+from apps.users.factories import UserFactory
+from .models import Category
+
+
+class CategoryFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Category
+
+    user = factory.SubFactory(UserFactory)
+    name = factory.Sequence(lambda n: f"Category {n}")
+    type = 'expense'
@@ -13,6 +13,7 @@ class Category(models.Model):
     type = models.CharField(max_length=10, choices=CATEGORY_TYPE_CHOICES)
     description = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ('user', 'name', 'type')  # Prevent duplicate names per user/type
@@ -0,0 +1,12 @@
+# categories/signals.py
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from finance_tracker.caching import bump_generation
+from .models import Category
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_cached_responses(sender, instance, **kwargs):
+    bump_generation(instance.user_id)
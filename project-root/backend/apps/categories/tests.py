@@ -1,3 +1,80 @@
-from django.test import TestCase
+from datetime import date
+from decimal import Decimal
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from apps.transactions.factories import ExpenseFactory, IncomeFactory, RecurrenceRuleFactory, create_history
+from apps.users.factories import UserFactory
+from finance_tracker.testing import QueryBudgetMixin
+from .factories import CategoryFactory
 
-# Create your tests here.
+
+class QueryBudgetTests(QueryBudgetMixin, APITestCase):
+    """Query counts of the category endpoints must not depend on how many categories exist."""
+
+    def setUp(self):
+        self.user = UserFactory()
+        self.client.force_authenticate(user=self.user)
+        self.category = CategoryFactory(user=self.user)
+        create_history(self.user, CategoryFactory.create_batch(5, user=self.user), 10)
+
+    def grow(self):
+        create_history(self.user, CategoryFactory.create_batch(20, user=self.user), 40)
+
+    def test_endpoints(self):
+        self.assertQueryBudget(1, reverse('category-list'), self.grow)
+        self.assertQueryBudget(1, reverse('category-detail', args=[self.category.pk]), self.grow)
+        # Categories with their totals, recurring entries.
+        self.assertQueryBudget(2, reverse('category-summary'), self.grow, {'start_date': '2024-01-01'})
+
+
+class CategorySummaryTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = UserFactory()
+        self.client.force_authenticate(user=self.user)
+        self.food = CategoryFactory(user=self.user, name="Food", type='expense')
+        self.salary = CategoryFactory(user=self.user, name="Salary", type='income')
+        self.url = reverse('category-summary')
+        ExpenseFactory(user=self.user, category=self.food, amount=Decimal('10.00'), date=date(2025, 1, 5))
+        ExpenseFactory(user=self.user, category=self.food, amount=Decimal('25.00'), date=date(2025, 1, 20))
+        ExpenseFactory(user=self.user, category=self.food, amount=Decimal('99.00'), date=date(2025, 3, 1))
+        IncomeFactory(user=self.user, category=self.salary, amount=Decimal('1000.00'), date=date(2025, 1, 31))
+        # Another user's rows are not counted.
+        ExpenseFactory(amount=Decimal('500.00'), date=date(2025, 1, 5))
+
+    def summary(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {row['name']: row for row in response.data}
+
+    def test_totals_within_window(self):
+        rows = self.summary(start_date='2025-01-01', end_date='2025-01-31')
+        self.assertEqual(rows['Food']['expense'], {"total": Decimal('35.00'), "count": 2, "average": Decimal('17.50')})
+        self.assertEqual(rows['Food']['income'], {"total": Decimal('0.00'), "count": 0, "average": None})
+        self.assertEqual(rows['Salary']['income']['total'], Decimal('1000.00'))
+
+        self.assertEqual(self.summary()['Food']['expense']['count'], 3)
+
+    def test_recurring_occurrences_count_as_rows(self):
+        RecurrenceRuleFactory(
+            user=self.user, category=self.food, amount=Decimal('5.00'),
+            start_date=date(2024, 12, 15), recurrence_type='monthly', recurrence_count=4,
+        )
+        # Jan 15 and Feb 15 fall in the window; the Dec 15 start is a row of its own.
+        rows = self.summary(start_date='2025-01-01', end_date='2025-02-28')
+        self.assertEqual(rows['Food']['expense']['total'], Decimal('45.00'))
+        self.assertEqual(rows['Food']['expense']['count'], 4)
+
+    def test_cached_summary_invalidated_by_writes(self):
+        params = {'start_date': '2025-01-01', 'end_date': '2025-01-31'}
+        self.assertEqual(self.client.get(self.url, params)['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get(self.url, params)['X-Cache'], 'HIT')
+
+        ExpenseFactory(user=self.user, category=self.food, amount=Decimal('5.00'), date=date(2025, 1, 10))
+        self.assertEqual(self.summary(**params)['Food']['expense']['count'], 3)
+
+    def test_invalid_window(self):
+        response = self.client.get(self.url, {'start_date': '2025-02-01', 'end_date': '2025-01-01'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -1,20 +1,110 @@
+from decimal import Decimal
+from django.db.models import Count, DecimalField, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
 from rest_framework import viewsets, permissions
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from apps.transactions.models import TRANSACTION_MODELS, RecurrenceRule
+from apps.transactions.utils import parse_date_param
 from .models import Category
 from .serializers import CategorySerializer
+from finance_tracker.caching import cache_per_user
+from finance_tracker.conditional import conditional_get
+from finance_tracker.pagination import CreatedKeysetPagination
 
 
 # Create your views here.
 # apps/categories/views.py
 
 
+def with_totals(categories, user, start, end):
+    """
+    Annotates `<kind>_total` and `<kind>_count` of the user's Income/Expense
+    rows dated within [start, end] (either end open when None), in one query.
+    Each is a correlated subquery over the (user, category, date) index:
+    aggregating across joins of both kinds would multiply the rows.
+    """
+    money = DecimalField(max_digits=14, decimal_places=2)
+    annotations = {}
+    for kind, model in TRANSACTION_MODELS.items():
+        rows = model.objects.filter(user=user, category=OuterRef('pk'))
+        if start:
+            rows = rows.filter(date__gte=start)
+        if end:
+            rows = rows.filter(date__lte=end)
+        grouped = rows.order_by().values('category')
+        annotations[f'{kind}_total'] = Coalesce(
+            Subquery(grouped.annotate(total=Sum('amount')).values('total'), output_field=money),
+            Value(Decimal('0')), output_field=money,
+        )
+        annotations[f'{kind}_count'] = Coalesce(
+            Subquery(grouped.annotate(count=Count('id')).values('count'), output_field=IntegerField()),
+            Value(0),
+        )
+    return categories.annotate(**annotations)
+
+
 class CategoryViewSet(viewsets.ModelViewSet):
     serializer_class = CategorySerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CreatedKeysetPagination
     queryset = Category.objects.all()
 
     def get_queryset(self):
         return Category.objects.filter(user=self.request.user).order_by('-created_at')
 
+    @conditional_get
+    @cache_per_user
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @conditional_get
+    @cache_per_user
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @action(detail=False, methods=['get'])
+    @conditional_get
+    @cache_per_user
+    def summary(self, request):
+        """
+        Every category with the total, count and average of its incomes and
+        expenses between the optional `start_date` and `end_date`. Occurrences
+        of recurring entries count as rows, as in the listings.
+        """
+        params = request.query_params
+        start = parse_date_param(params.get('start_date'), 'start_date')
+        end = parse_date_param(params.get('end_date'), 'end_date')
+        if start and end and start > end:
+            raise ValidationError({'start_date': "start_date must not be after end_date."})
+
+        categories = list(with_totals(self.get_queryset(), request.user, start, end))
+        totals = {
+            (kind, category.pk): [getattr(category, f'{kind}_total'), getattr(category, f'{kind}_count')]
+            for category in categories
+            for kind in TRANSACTION_MODELS
+        }
+        # Recurring occurrences are not rows; add them here.
+        for rule in RecurrenceRule.objects.filter(user=request.user, category__isnull=False):
+            occurrences = sum(1 for _ in rule.occurrences(start, end))
+            if occurrences and (rule.kind, rule.category_id) in totals:
+                totals[rule.kind, rule.category_id][0] += rule.amount * occurrences
+                totals[rule.kind, rule.category_id][1] += occurrences
+
+        rows = []
+        for category in categories:
+            row = {"id": category.pk, "name": category.name, "type": category.type}
+            for kind in TRANSACTION_MODELS:
+                total, count = totals[kind, category.pk]
+                row[kind] = {
+                    "total": total,
+                    "count": count,
+                    "average": (total / count).quantize(Decimal('0.01')) if count else None,
+                }
+            rows.append(row)
+        return Response(rows)
+
     def perform_create(self, serializer):
         print("DATA:", self.request.user)
         serializer.save(user=self.request.user)
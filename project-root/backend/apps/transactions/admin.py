@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import Income, Expense
+from .models import Income, Expense, RecurrenceRule, UserBalance
 
 admin.site.register(Income)
 admin.site.register(Expense)
+admin.site.register(RecurrenceRule)
+admin.site.register(UserBalance)
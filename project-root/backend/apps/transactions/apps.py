@@ -5,3 +5,8 @@ class TransactionsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.transactions'
     # label = 'transactions'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from finance_tracker.conditional import check_shared_cache
+        check_shared_cache()
@@ -0,0 +1,198 @@
+# transactions/batch.py
+
+from collections import defaultdict
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.exceptions import NotFound
+from apps.categories.models import Category
+from .models import Income, Expense, RecurrenceRule
+from .recurrence import exclude_occurrence, get_occurrence, materialize_occurrence
+from .serializers import IncomeSerializer, ExpenseSerializer
+from .signals import row_signals_muted, transactions_changed
+from .utils import create_recurring_entries
+
+MAX_BATCH_OPERATIONS = 1000
+
+KINDS = {
+    'income': (Income, IncomeSerializer),
+    'expense': (Expense, ExpenseSerializer),
+}
+
+
+class BatchOperationSerializer(serializers.Serializer):
+    op = serializers.ChoiceField(choices=['create', 'update', 'delete'])
+    kind = serializers.ChoiceField(choices=list(KINDS))
+    id = serializers.IntegerField(required=False)
+    data = serializers.DictField(required=False)
+
+    def validate(self, attrs):
+        if attrs['op'] in ('update', 'delete') and 'id' not in attrs:
+            raise serializers.ValidationError(f"id is required for {attrs['op']}.")
+        if attrs['op'] in ('create', 'update') and 'data' not in attrs:
+            raise serializers.ValidationError(f"data is required for {attrs['op']}.")
+        return attrs
+
+
+class BatchSerializer(serializers.Serializer):
+    operations = BatchOperationSerializer(many=True)
+
+    def validate_operations(self, operations):
+        if not operations:
+            raise serializers.ValidationError("At least one operation is required.")
+        if len(operations) > MAX_BATCH_OPERATIONS:
+            raise serializers.ValidationError(f"At most {MAX_BATCH_OPERATIONS} operations per batch.")
+        targets = [(op['kind'], op['id']) for op in operations if 'id' in op]
+        if len(targets) != len(set(targets)):
+            raise serializers.ValidationError("Each row may only be targeted once per batch.")
+        return operations
+
+
+class TransactionBatch:
+    """
+    Applies a validated list of create/update/delete operations for one user.
+
+    Every operation is validated before anything is written; if any fails the
+    batch is rejected as a whole. Writes then run in one atomic block: one
+    bulk_create, one bulk_update and one filtered delete per kind, with a
+    single aggregated transactions_changed per kind for the derived totals.
+    Negative ids address recurring occurrences, as on the detail endpoints:
+    updating one materializes it as a row, deleting one excludes it.
+    """
+
+    def __init__(self, user, operations, context):
+        self.user = user
+        self.operations = operations
+        self.context = context
+        self.errors = [{} for _ in operations]
+        self.results = [None] * len(operations)
+
+    def run(self):
+        by_kind = defaultdict(lambda: defaultdict(list))
+        for index, operation in enumerate(self.operations):
+            by_kind[operation['kind']][operation['op']].append(index)
+        self.context = dict(self.context, preloaded={Category: self.preload_categories()})
+
+        plans = {kind: self.validate_kind(kind, ops) for kind, ops in by_kind.items()}
+        if any(self.errors):
+            return False
+
+        with transaction.atomic(), row_signals_muted():
+            for kind, plan in plans.items():
+                self.apply(kind, plan)
+        return True
+
+    def preload_categories(self):
+        """The categories the operations refer to, in one query instead of one per row."""
+        ids = set()
+        for operation in self.operations:
+            try:
+                ids.add(int(operation.get('data', {}).get('category')))
+            except (TypeError, ValueError):
+                pass
+        return Category.objects.in_bulk(ids) if ids else {}
+
+    def validate_kind(self, kind, ops):
+        model, serializer_class = KINDS[kind]
+        plan = {'create': None, 'update': [], 'delete': []}
+
+        if ops['create']:
+            serializer = serializer_class(
+                data=[self.operations[i]['data'] for i in ops['create']], many=True, context=self.context,
+            )
+            if serializer.is_valid():
+                plan['create'] = (ops['create'], serializer.validated_data)
+            else:
+                for index, errors in zip(ops['create'], serializer.errors):
+                    self.errors[index] = errors
+
+        ids = [self.operations[i]['id'] for i in ops['update'] + ops['delete']]
+        row_ids = [pk for pk in ids if pk > 0]
+        instances = model.objects.filter(user=self.user, id__in=row_ids).in_bulk() if row_ids else {}
+        rule_ids = {RecurrenceRule.split_virtual_id(pk)[0] for pk in ids if pk < 0}
+        rules = RecurrenceRule.objects.filter(user=self.user, kind=kind).in_bulk(rule_ids) if rule_ids else {}
+
+        for index in ops['update'] + ops['delete']:
+            operation = self.operations[index]
+            instance = instances.get(operation['id'])
+            if operation['id'] < 0:
+                try:
+                    instance = get_occurrence(self.user, model, operation['id'], rules=rules)
+                except NotFound:
+                    instance = None
+            if instance is None:
+                self.errors[index] = {'id': [f"No {kind} with id {operation['id']}."]}
+            elif operation['op'] == 'delete':
+                plan['delete'].append((index, instance))
+            else:
+                serializer = serializer_class(instance, data=operation['data'], partial=True, context=self.context)
+                if serializer.is_valid():
+                    plan['update'].append((index, instance, serializer.validated_data))
+                else:
+                    self.errors[index] = serializer.errors
+        return plan
+
+    def apply(self, kind, plan):
+        model, serializer_class = KINDS[kind]
+        added, removed = [], []
+
+        if plan['create']:
+            indexes, rows = plan['create']
+            created = model.objects.bulk_create([model(user=self.user, **row) for row in rows])
+            added += [instance.state() for instance in created]
+            for index, instance in zip(indexes, created):
+                if instance.is_recurring and instance.recurrence_type and instance.recurrence_count:
+                    create_recurring_entries(model, instance, instance.recurrence_type, instance.recurrence_count)
+                self.results[index] = self.result(index, 'created', instance, serializer_class)
+
+        for position, (index, instance, validated) in enumerate(plan['update']):
+            if instance.pk < 0:
+                # exclude_occurrence signals the occurrence leaving the series; the
+                # row replacing it is created with row signals muted, so count it here.
+                row = materialize_occurrence(instance)
+                added.append(row.state())
+                plan['update'][position] = (index, row, validated)
+
+        if plan['update']:
+            fields = set()
+            for index, instance, validated in plan['update']:
+                removed.append(instance.state())
+                for field, value in validated.items():
+                    setattr(instance, field, value)
+                fields.update(validated)
+                added.append(instance.state())
+            instances = [instance for _, instance, _ in plan['update']]
+            if fields:
+                # bulk_update skips auto_now; the budget notifier's watermark reads it.
+                now = timezone.now()
+                for instance in instances:
+                    instance.updated_at = now
+                model.objects.bulk_update(instances, sorted(fields | {'updated_at'}))
+            for index, instance, _ in plan['update']:
+                instance._loaded_state = instance.state()
+                self.results[index] = self.result(index, 'updated', instance, serializer_class)
+
+        if plan['delete']:
+            ids = [instance.pk for _, instance in plan['delete'] if instance.pk > 0]
+            model.objects.filter(user=self.user, id__in=ids).delete()
+            for index, instance in plan['delete']:
+                if instance.pk < 0:
+                    # Signals its own change.
+                    exclude_occurrence(instance.recurrence_rule, instance.occurrence_index)
+                else:
+                    removed.append(instance.state())
+                self.results[index] = {'index': index, 'kind': kind, 'op': 'delete', 'id': instance.pk, 'status': 'deleted'}
+
+        if added or removed:
+            transactions_changed.send(sender=model, added=added, removed=removed)
+
+    def result(self, index, outcome, instance, serializer_class):
+        operation = self.operations[index]
+        return {
+            'index': index,
+            'kind': operation['kind'],
+            'op': operation['op'],
+            'id': instance.pk,
+            'status': outcome,
+            'data': serializer_class(instance, context=self.context).data,
+        }
@@ -0,0 +1,59 @@
+# transactions/exports.py
+
+import csv
+import heapq
+from django.http import StreamingHttpResponse
+from django.utils.encoding import smart_str
+from apps.categories.models import Category
+
+EXPORT_HEADER = ['date', 'type', 'amount', 'category', 'description', 'is_recurring']
+EXPORT_FIELDS = ('date', 'amount', 'category__name', 'description', 'is_recurring')
+CHUNK_SIZE = 2000
+
+
+class Echo:
+    """File-like object whose write() hands the formatted line back to the caller."""
+    def write(self, value):
+        return value
+
+
+def export_rows(queryset, kind):
+    """
+    Yields CSV rows for an Income/Expense queryset, newest first, read through a
+    server-side cursor so memory stays flat regardless of history length.
+    """
+    rows = queryset.order_by('-date', '-id').values_list(*EXPORT_FIELDS).iterator(chunk_size=CHUNK_SIZE)
+    for date, amount, category, description, is_recurring in rows:
+        yield [date.isoformat(), kind, amount, category or '', smart_str(description), is_recurring]
+
+
+def virtual_export_rows(entries):
+    """CSV rows for expanded recurring occurrences, newest first."""
+    names = dict(Category.objects.filter(id__in={e.category_id for e in entries if e.category_id}).values_list('id', 'name'))
+    for entry in sorted(entries, key=lambda e: (e.date, e.id), reverse=True):
+        yield [entry.date.isoformat(), entry.kind, entry.amount, names.get(entry.category_id, ''), smart_str(entry.description), True]
+
+
+def merged_export_rows(*row_streams):
+    """Merges per-kind row streams (each newest first) into one date-ordered stream."""
+    return heapq.merge(*row_streams, key=lambda row: row[0], reverse=True)
+
+
+def stream_csv(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_HEADER)
+
+    lines = []
+    for row in rows:
+        lines.append(writer.writerow(row))
+        if len(lines) >= 500:
+            yield ''.join(lines)
+            lines = []
+    if lines:
+        yield ''.join(lines)
+
+
+def csv_response(rows, filename):
+    response = StreamingHttpResponse(stream_csv(rows), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,46 @@
+# transactions/factories.py
+
+from datetime import date
+import factory
+from apps.users.factories import UserFactory
+from .models import Income, Expense, RecurrenceRule
+
+HISTORY_START = date(2024, 1, 1)
+HISTORY_END = date(2025, 12, 31)
+
+
+class TransactionFactory(factory.django.DjangoModelFactory):
+    user = factory.SubFactory(UserFactory)
+    amount = factory.Faker('pydecimal', left_digits=4, right_digits=2, positive=True)
+    date = factory.Faker('date_between', start_date=HISTORY_START, end_date=HISTORY_END)
+    description = factory.Faker('sentence', nb_words=4)
+
+
+class IncomeFactory(TransactionFactory):
+    class Meta:
+        model = Income
+
+
+class ExpenseFactory(TransactionFactory):
+    class Meta:
+        model = Expense
+
+
+class RecurrenceRuleFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = RecurrenceRule
+
+    user = factory.SubFactory(UserFactory)
+    kind = 'expense'
+    amount = factory.Faker('pydecimal', left_digits=3, right_digits=2, positive=True)
+    description = factory.Faker('sentence', nb_words=3)
+    start_date = factory.Faker('date_between', start_date=HISTORY_START, end_date=HISTORY_END)
+    recurrence_type = 'monthly'
+    recurrence_count = 12
+
+
+def create_history(user, categories, count):
+    """`count` incomes and `count` expenses spread over the history window and the categories."""
+    for kind_factory in (IncomeFactory, ExpenseFactory):
+        for index in range(count):
+            kind_factory(user=user, category=categories[index % len(categories)] if categories else None)
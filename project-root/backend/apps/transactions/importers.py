@@ -0,0 +1,226 @@
+# transactions/importers.py
+
+import csv
+import io
+import re
+from datetime import datetime
+from django.db import transaction
+from rest_framework import serializers
+from apps.categories.models import Category
+from .models import Income, Expense
+from .signals import transactions_changed
+
+IMPORT_FORMATS = ('csv', 'ofx', 'qif')
+VALIDATION_BATCH_SIZE = 1000
+INSERT_CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+
+QIF_DATE_FORMATS = ('%m/%d/%Y', '%m/%d/%y', "%m/%d'%y", "%m/%d'%Y", '%Y-%m-%d')
+OFX_TAG = re.compile(r'<(/?)([A-Z0-9.]+)>([^<]*)')
+
+
+class ImportRowSerializer(serializers.Serializer):
+    date = serializers.DateField(input_formats=['iso-8601'])
+    amount = serializers.DecimalField(max_digits=12, decimal_places=2)
+    kind = serializers.ChoiceField(choices=['income', 'expense'], required=False)
+    category = serializers.CharField(required=False, allow_blank=True, max_length=100)
+    description = serializers.CharField(required=False, allow_blank=True)
+
+    def validate(self, data):
+        # Without an explicit type, the sign decides: negative amounts are expenses.
+        if not data.get('kind'):
+            data['kind'] = 'expense' if data['amount'] < 0 else 'income'
+        data['amount'] = abs(data['amount'])
+        if data['amount'] == 0:
+            raise serializers.ValidationError("amount must not be zero.")
+        return data
+
+
+def detect_format(filename, requested=None):
+    fmt = (requested or filename.rsplit('.', 1)[-1]).lower()
+    if fmt not in IMPORT_FORMATS:
+        raise serializers.ValidationError({'format': f"format must be one of {', '.join(IMPORT_FORMATS)}."})
+    return fmt
+
+
+def parse_csv(lines):
+    """Rows of a CSV with a header; columns follow the export layout (`type` may be omitted)."""
+    reader = csv.DictReader(lines)
+    for record in reader:
+        row = {key.strip().lower(): (value or '').strip() for key, value in record.items() if key}
+        if 'type' in row and 'kind' not in row:
+            row['kind'] = row.pop('type')
+        if not row.get('kind'):
+            row.pop('kind', None)
+        row.pop('is_recurring', None)
+        yield reader.line_num, row
+
+
+def parse_ofx(lines):
+    """<STMTTRN> blocks of an OFX (SGML or XML) statement."""
+    current, start_line = None, 0
+    for line_no, line in enumerate(lines, start=1):
+        for closing, tag, value in OFX_TAG.findall(line):
+            value = value.strip()
+            if tag == 'STMTTRN' and not closing:
+                current, start_line = {}, line_no
+            elif tag == 'STMTTRN' and closing and current is not None:
+                yield start_line, {
+                    'date': _ofx_date(current.get('DTPOSTED', '')),
+                    'amount': current.get('TRNAMT', ''),
+                    'description': current.get('MEMO') or current.get('NAME', ''),
+                }
+                current = None
+            elif current is not None and not closing and value:
+                current[tag] = value
+
+
+def _ofx_date(value):
+    # 20250131, 20250131120000, 20250131120000.000[-5:EST]
+    try:
+        return datetime.strptime(value[:8], '%Y%m%d').date().isoformat()
+    except ValueError:
+        return value
+
+
+def parse_qif(lines):
+    """Records of a QIF bank register, separated by ^."""
+    current, start_line = {}, 1
+    for line_no, line in enumerate(lines, start=1):
+        line = line.rstrip('\r\n')
+        if not line or line.startswith('!'):
+            continue
+        code, value = line[0], line[1:].strip()
+        if code == '^':
+            if current:
+                yield start_line, current
+            current, start_line = {}, line_no + 1
+        elif code == 'D':
+            current['date'] = _qif_date(value)
+        elif code in ('T', 'U'):
+            current['amount'] = value.replace(',', '')
+        elif code == 'P':
+            current.setdefault('description', value)
+        elif code == 'M':
+            current['description'] = value
+        elif code == 'L' and not value.startswith('['):
+            current['category'] = value.split(':')[0]
+    if current:
+        yield start_line, current
+
+
+def _qif_date(value):
+    value = value.replace(' ', '')
+    for fmt in QIF_DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return value
+
+
+PARSERS = {'csv': parse_csv, 'ofx': parse_ofx, 'qif': parse_qif}
+
+
+class CategoryCache:
+    """Resolves (name, kind) to category ids with one query per import."""
+
+    def __init__(self, user, create_missing=False):
+        self.user = user
+        self.create_missing = create_missing
+        self.ids = {
+            (name.lower(), kind): pk
+            for pk, name, kind in Category.objects.filter(user=user).values_list('id', 'name', 'type')
+        }
+
+    def resolve(self, name, kind):
+        if not name:
+            return None
+        key = (name.lower(), kind)
+        if key not in self.ids:
+            if not self.create_missing:
+                raise serializers.ValidationError({'category': f"Unknown {kind} category '{name}'."})
+            self.ids[key] = Category.objects.create(user=self.user, name=name, type=kind).pk
+        return self.ids[key]
+
+
+class TransactionImporter:
+    """
+    Streams records from a statement, validates them in batches with
+    ImportRowSerializer and inserts the valid ones with chunked bulk_create
+    inside a single transaction. Invalid rows are skipped and reported.
+    """
+    models = {'income': Income, 'expense': Expense}
+
+    def __init__(self, user, kind=None, create_categories=False):
+        self.user = user
+        self.kind = kind
+        self.categories = CategoryCache(user, create_missing=create_categories)
+        self.pending = {'income': [], 'expense': []}
+        self.created = {'income': 0, 'expense': 0}
+        self.errors = []
+        self.error_count = 0
+
+    def run(self, lines, fmt):
+        with transaction.atomic():
+            batch = []
+            for line_no, row in PARSERS[fmt](lines):
+                if self.kind:
+                    row['kind'] = self.kind
+                batch.append((line_no, row))
+                if len(batch) >= VALIDATION_BATCH_SIZE:
+                    self.validate_batch(batch)
+                    batch = []
+            if batch:
+                self.validate_batch(batch)
+            for kind in self.pending:
+                self.flush(kind)
+        return self.result()
+
+    def validate_batch(self, batch):
+        # One validator instance for the batch; rows are checked individually so
+        # a bad line only drops itself (ListSerializer discards the whole batch).
+        validator = ImportRowSerializer()
+        for line_no, row in batch:
+            try:
+                data = validator.run_validation(row)
+                category_id = self.categories.resolve(data.get('category'), data['kind'])
+            except serializers.ValidationError as exc:
+                self.add_error(line_no, exc.detail)
+                continue
+            self.pending[data['kind']].append(self.models[data['kind']](
+                user=self.user,
+                category_id=category_id,
+                amount=data['amount'],
+                date=data['date'],
+                description=data.get('description', ''),
+            ))
+            if len(self.pending[data['kind']]) >= INSERT_CHUNK_SIZE:
+                self.flush(data['kind'])
+
+    def flush(self, kind):
+        entries = self.pending[kind]
+        if not entries:
+            return
+        model = self.models[kind]
+        model.objects.bulk_create(entries, batch_size=INSERT_CHUNK_SIZE)
+        transactions_changed.send(sender=model, added=[e.state() for e in entries], removed=[])
+        self.created[kind] += len(entries)
+        self.pending[kind] = []
+
+    def add_error(self, line_no, errors):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line_no, 'errors': errors})
+
+    def result(self):
+        return {
+            'created': self.created,
+            'error_count': self.error_count,
+            'errors': self.errors,
+        }
+
+
+def text_lines(binary_file):
+    """Decodes an uploaded/opened binary file lazily, line by line."""
+    return io.TextIOWrapper(binary_file, encoding='utf-8-sig', errors='replace', newline='')
@@ -0,0 +1,117 @@
+# transactions/ledger.py
+
+from collections import defaultdict
+from decimal import Decimal
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+from .models import Income, Expense, RecurrenceRule, UserBalance
+
+
+def apply_balance_changes(kind, added, removed):
+    """
+    Shifts the per-user totals by the difference between added and removed states.
+
+    Rows that have not been built yet are left alone; get_balance builds them
+    from the tables, which already contain these changes.
+    """
+    deltas = defaultdict(lambda: [Decimal('0'), 0])
+    for state in added:
+        deltas[state.user_id][0] += state.amount
+        deltas[state.user_id][1] += 1
+    for state in removed:
+        deltas[state.user_id][0] -= state.amount
+        deltas[state.user_id][1] -= 1
+
+    total_field, count_field = f'total_{kind}', f'{kind}_count'
+    for user_id, (amount, count) in deltas.items():
+        if not amount and not count:
+            continue
+        UserBalance.objects.filter(user_id=user_id).update(**{
+            total_field: F(total_field) + amount,
+            count_field: F(count_field) + count,
+            'updated_at': timezone.now(),
+        })
+
+
+def _totals_by_user(model, user_ids=None):
+    queryset = model.objects.all()
+    if user_ids is not None:
+        queryset = queryset.filter(user_id__in=user_ids)
+    rows = queryset.order_by().values('user_id').annotate(total=Sum('amount'), count=Count('id'))
+    return {row['user_id']: (row['total'] or Decimal('0'), row['count']) for row in rows}
+
+
+def rebuild_balances(user_ids):
+    """
+    Recomputes the balance rows of the given users from the Income/Expense tables.
+    Returns the rebuilt UserBalance objects keyed by user id.
+
+    The rows (created first if missing) are locked before the tables are read,
+    so the delta of a concurrent write is never lost: its balance update either
+    landed before the lock, and its row is in the totals read, or waits for the
+    lock and is applied on top of the rebuilt totals.
+    """
+    with transaction.atomic():
+        UserBalance.objects.bulk_create([UserBalance(user_id=user_id) for user_id in user_ids], ignore_conflicts=True)
+        list(UserBalance.objects.select_for_update().filter(user_id__in=user_ids).values_list('pk', flat=True))
+        return store_balances(
+            user_ids,
+            _totals_by_user(Income, user_ids),
+            _totals_by_user(Expense, user_ids),
+            RecurrenceRule.objects.filter(user_id__in=user_ids),
+        )
+
+
+def store_balances(user_ids, incomes, expenses, rules):
+    """
+    Writes the existing balance rows from per-user (total, count) maps of both
+    kinds plus the users' rules; see rebuild_balances for the locking.
+    """
+    # Occurrences of recurring rules count as rows.
+    for rule in rules:
+        totals = incomes if rule.kind == Income.kind else expenses
+        occurrences = sum(1 for _ in rule.occurrences())
+        total, count = totals.get(rule.user_id, (Decimal('0'), 0))
+        totals[rule.user_id] = (total + rule.amount * occurrences, count + occurrences)
+    now = timezone.now()
+
+    balances = {}
+    for user_id in user_ids:
+        total_income, income_count = incomes.get(user_id, (Decimal('0'), 0))
+        total_expense, expense_count = expenses.get(user_id, (Decimal('0'), 0))
+        balances[user_id] = UserBalance(
+            user_id=user_id,
+            total_income=total_income,
+            total_expense=total_expense,
+            income_count=income_count,
+            expense_count=expense_count,
+            updated_at=now,
+        )
+
+    UserBalance.objects.bulk_update(
+        balances.values(),
+        ['total_income', 'total_expense', 'income_count', 'expense_count', 'updated_at'],
+        batch_size=1000,
+    )
+    return balances
+
+
+def get_balance(user):
+    """Single primary-key lookup, building the row on first use."""
+    try:
+        return UserBalance.objects.get(user=user)
+    except UserBalance.DoesNotExist:
+        return rebuild_balances([user.pk])[user.pk]
+
+
+async def aget_balance(user):
+    """
+    get_balance for async views. The first build reads the tables inside the
+    locked transaction of rebuild_balances, on the request's connection.
+    """
+    summary = await UserBalance.objects.filter(user_id=user.pk).afirst()
+    if summary is None:
+        summary = (await sync_to_async(rebuild_balances)([user.pk]))[user.pk]
+    return summary
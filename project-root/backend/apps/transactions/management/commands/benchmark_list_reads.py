@@ -0,0 +1,69 @@
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from apps.transactions.fastpath import RowFormatter, fast_rows
+from apps.transactions.models import Expense
+from apps.transactions.serializers import ExpenseSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares rows/second of the serializer and the fast-path list readers on "
+        "synthetic expenses. Everything runs in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000)
+        parser.add_argument('--repeat', type=int, default=3, help="Best of N runs per reader.")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            user = get_user_model().objects.create_user(email='benchmark-list-reads@example.invalid')
+            self.create_rows(user, options['rows'])
+            queryset = Expense.objects.filter(user=user).order_by('-date', '-id')
+
+            fields = list(ExpenseSerializer.Meta.fields)
+            readers = {
+                'serializer': lambda: ExpenseSerializer(list(queryset.all()), many=True).data,
+                'fast_path': lambda: list(map(RowFormatter(fields), fast_rows(queryset, fields))),
+            }
+            results = {name: self.best_of(reader, options['repeat']) for name, reader in readers.items()}
+            transaction.set_rollback(True)
+
+        for name, seconds in results.items():
+            self.stdout.write(f"{name:>10}: {options['rows'] / seconds:12,.0f} rows/s ({seconds:.3f}s)")
+        self.stdout.write(self.style.SUCCESS(
+            f"fast path is {results['serializer'] / results['fast_path']:.1f}x the serializer throughput."
+        ))
+
+    def create_rows(self, user, count):
+        start = date(2020, 1, 1)
+        rows = (
+            Expense(
+                user=user,
+                amount=Decimal(random.randint(100, 100000)) / 100,
+                date=start + timedelta(days=random.randrange(2000)),
+                description=f"Synthetic expense {index}",
+            )
+            for index in range(count)
+        )
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == 5000:
+                Expense.objects.bulk_create(batch)
+                batch = []
+        Expense.objects.bulk_create(batch)
+
+    @staticmethod
+    def best_of(reader, repeat):
+        timings = []
+        for _ in range(max(repeat, 1)):
+            started = time.perf_counter()
+            reader()
+            timings.append(time.perf_counter() - started)
+        return min(timings)
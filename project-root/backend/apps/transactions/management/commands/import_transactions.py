@@ -0,0 +1,37 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.exceptions import ValidationError
+from apps.transactions.importers import TransactionImporter, detect_format, text_lines
+
+
+class Command(BaseCommand):
+    help = "Bulk imports a CSV, OFX or QIF statement into a user's incomes and expenses."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--user', required=True, help="Email of the owning user.")
+        parser.add_argument('--format', choices=['csv', 'ofx', 'qif'])
+        parser.add_argument('--kind', choices=['income', 'expense'])
+        parser.add_argument('--create-categories', action='store_true')
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(email=options['user'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"No user with email {options['user']}.")
+
+        try:
+            fmt = detect_format(options['path'], options['format'])
+        except ValidationError as exc:
+            raise CommandError(exc.detail['format'])
+
+        importer = TransactionImporter(user, kind=options['kind'], create_categories=options['create_categories'])
+        with open(options['path'], 'rb') as handle:
+            result = importer.run(text_lines(handle), fmt)
+
+        for error in result['errors']:
+            self.stderr.write(f"line {error['line']}: {error['errors']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result['created']['income']} income(s) and {result['created']['expense']} expense(s); "
+            f"{result['error_count']} row(s) rejected."
+        ))
@@ -0,0 +1,79 @@
+import json
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand, CommandError
+from finance_tracker.benchmarking import latency_summary
+
+# sync path -> async path, relative to /api/
+ENDPOINTS = {
+    'transactions/balance/': 'transactions/async/balance/',
+    'transactions/income/': 'transactions/async/income/',
+    'transactions/expense/': 'transactions/async/expense/',
+    'budgets/warnings/': 'budgets/async/warnings/',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-tests the sync endpoints of one deployment (WSGI) against their async "
+        "variants on another (ASGI) and reports latency percentiles and requests/second."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sync-url', default='http://127.0.0.1:8000', help="Base URL of the WSGI deployment.")
+        parser.add_argument('--async-url', default='http://127.0.0.1:8001', help="Base URL of the ASGI deployment.")
+        parser.add_argument('--token', required=True, help="JWT access token of the user to read as.")
+        parser.add_argument('--requests', type=int, default=500, help="Requests per endpoint and deployment.")
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--output', help="Also write the results as JSON to this file.")
+
+    def handle(self, *args, **options):
+        results = []
+        for sync_path, async_path in ENDPOINTS.items():
+            for mode, url in (
+                ('sync', f"{options['sync_url'].rstrip('/')}/api/{sync_path}"),
+                ('async', f"{options['async_url'].rstrip('/')}/api/{async_path}"),
+            ):
+                result = self.run(url, options)
+                results.append(dict(result, endpoint=sync_path, mode=mode))
+                self.stdout.write(
+                    f"{mode:>5} {sync_path:<24} {result['rps']:8.1f} req/s  "
+                    f"p50 {result['p50_ms']:7.1f}ms  p95 {result['p95_ms']:7.1f}ms  "
+                    f"p99 {result['p99_ms']:7.1f}ms  errors {result['errors']}"
+                )
+
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                json.dump(results, handle, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Measured {len(results)} endpoint/deployment pairs."))
+
+    def run(self, url, options):
+        headers = {'Authorization': f"Bearer {options['token']}"}
+
+        def fetch(_):
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=30) as response:
+                    response.read()
+                    ok = response.status == 200
+            except (urllib.error.URLError, OSError):
+                ok = False
+            return time.perf_counter() - started, ok
+
+        # One request up front so a wrong URL or token fails fast.
+        if not fetch(None)[1]:
+            raise CommandError(f"GET {url} did not return 200.")
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            samples = list(pool.map(fetch, range(options['requests'])))
+        elapsed = time.perf_counter() - started
+
+        return {
+            'requests': len(samples),
+            'errors': sum(1 for _, ok in samples if not ok),
+            'rps': len(samples) / elapsed,
+            **latency_summary([seconds for seconds, _ in samples]),
+        }
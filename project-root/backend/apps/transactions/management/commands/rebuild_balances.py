@@ -0,0 +1,25 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from apps.transactions.ledger import rebuild_balances
+
+
+class Command(BaseCommand):
+    help = "Recomputes the per-user balance summaries from the Income and Expense tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='user_ids',
+                            help="Only rebuild this user id (repeatable).")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        user_ids = options['user_ids']
+        if not user_ids:
+            user_ids = list(get_user_model().objects.order_by('pk').values_list('pk', flat=True))
+
+        batch_size = options['batch_size']
+        for start in range(0, len(user_ids), batch_size):
+            with transaction.atomic():
+                rebuild_balances(user_ids[start:start + batch_size])
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt balances for {len(user_ids)} user(s)."))
@@ -0,0 +1,214 @@
+import json
+import subprocess
+import time
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from apps.budgets.models import Budget, BudgetTemplate
+from apps.categories.models import Category
+from apps.transactions.models import Expense, Income
+from finance_tracker.benchmarking import latency_summary
+
+
+class Endpoint:
+    def __init__(self, name, path, params=None, method='get', data=None, staff=False, concurrent=False):
+        self.name = name
+        self.path = path
+        self.params = params or {}
+        self.method = method
+        # Writes get a fresh payload per request and are rolled back.
+        self.data = data
+        self.staff = staff
+        # Async views read on worker threads, whose queries are not captured.
+        self.concurrent = concurrent
+
+
+def endpoints(user):
+    """Every route of finance_tracker/urls.py that works with an authenticated user's data."""
+    category = Category.objects.filter(user=user, type='expense').first() or Category.objects.filter(user=user).first()
+    budget = Budget.objects.filter(user=user).first()
+    template = BudgetTemplate.objects.filter(user=user).first()
+    income = Income.objects.filter(user=user).first()
+    expense = Expense.objects.filter(user=user).first()
+    if not (category and budget and template and income and expense):
+        raise CommandError(f"{user.email} needs categories, budgets, budget templates, incomes and expenses: run seed_synthetic_data.")
+
+    def new_expense():
+        return {'amount': '12.50', 'date': '2025-06-01', 'category': category.pk, 'description': 'Benchmark'}
+
+    def statement():
+        lines = ["date,type,amount,category,description"]
+        lines += [f"2025-06-{day:02d},expense,{day}.00,{category.name},Benchmark" for day in range(1, 29)]
+        return {'file': SimpleUploadedFile('statement.csv', "\n".join(lines).encode())}
+
+    return [
+        Endpoint('user-profile', reverse('user-profile')),
+        Endpoint('login', reverse('login'), method='post', data=lambda: {'email': user.email, 'password': 'securePassword123'}),
+        Endpoint('category-list', reverse('category-list')),
+        Endpoint('category-detail', reverse('category-detail', args=[category.pk])),
+        Endpoint('category-summary', reverse('category-summary'), {'start_date': '2025-01-01', 'end_date': '2025-12-31'}),
+        Endpoint('budget-list', reverse('budget-list')),
+        Endpoint('budget-detail', reverse('budget-detail', args=[budget.pk])),
+        Endpoint('budget-template-list', reverse('budget-template-list')),
+        Endpoint('budget-template-periods', reverse('budget-template-periods', args=[template.pk]), {'count': 24}),
+        Endpoint('budget-warnings', reverse('budget-warnings')),
+        Endpoint('budget-warnings-async', reverse('budget-warnings-async'), concurrent=True),
+        Endpoint('income-list', reverse('income-list')),
+        Endpoint('income-list-page', reverse('income-list'), {'page_size': 50}),
+        Endpoint('income-detail', reverse('income-detail', args=[income.pk])),
+        Endpoint('income-export', reverse('income-export')),
+        Endpoint('expense-list', reverse('expense-list')),
+        Endpoint('expense-list-page', reverse('expense-list'), {'page_size': 50}),
+        Endpoint('expense-list-compact', reverse('expense-list'), {'compact': 'true', 'fields': 'id,amount,date'}),
+        Endpoint('expense-detail', reverse('expense-detail', args=[expense.pk])),
+        Endpoint('expense-export', reverse('expense-export')),
+        Endpoint('expense-create', reverse('expense-list'), method='post', data=new_expense),
+        Endpoint('balance', reverse('balance')),
+        Endpoint('balance-async', reverse('balance-async'), concurrent=True),
+        Endpoint('income-list-async', reverse('income-list-async'), concurrent=True),
+        Endpoint('expense-list-async', reverse('expense-list-async'), concurrent=True),
+        Endpoint('transactions-ledger', reverse('transactions-ledger')),
+        Endpoint('transactions-ledger-page', reverse('transactions-ledger'), {'page_size': 50}),
+        Endpoint('transactions-export', reverse('transactions-export')),
+        Endpoint('transactions-import', reverse('transactions-import'), method='post', data=statement),
+        Endpoint('transactions-batch', reverse('transactions-batch'), method='post', data=lambda: {
+            'operations': [{'op': 'create', 'kind': 'expense', 'data': new_expense()} for _ in range(50)],
+        }),
+        Endpoint('analytics-monthly', reverse('analytics-monthly'), {'year': 2025}),
+        Endpoint('analytics-categories', reverse('analytics-categories'), {'kind': 'expense'}),
+        Endpoint('analytics-trends', reverse('analytics-trends'), {'end': '2025-12', 'months': 12}),
+        Endpoint('analytics-timeseries', reverse('analytics-timeseries'), {'kind': 'expense', 'bucket': 'week', 'start_date': '2024-01-01', 'end_date': '2025-12-31'}),
+        Endpoint('export-csv', reverse('export-csv')),
+        Endpoint('cache-stats', reverse('cache-stats'), staff=True),
+        Endpoint('metrics', reverse('metrics'), staff=True),
+    ]
+
+
+def count_rows(response, body):
+    content_type = response.get('Content-Type', '')
+    if content_type.startswith('text/csv'):
+        return max(body.count(b'\n') - 1, 0)
+    if not content_type.startswith('application/json'):
+        return 1
+    data = json.loads(body)
+    if isinstance(data, dict) and isinstance(data.get('results'), list):
+        data = data['results']
+    if isinstance(data, dict) and data and all(isinstance(value, list) for value in data.values()):
+        # Compact layout: one list per field.
+        return len(next(iter(data.values())))
+    if isinstance(data, list):
+        return len(data)
+    return 1
+
+
+class Command(BaseCommand):
+    help = (
+        "Requests every API endpoint through the test client as one user and reports "
+        "p50/p95/p99 latency, queries per request and rows/second, also written as "
+        "JSON for comparison across commits. Writes are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help="Email of the user to read as (default: the first synthetic user).")
+        parser.add_argument('--iterations', type=int, default=30, help="Measured requests per endpoint.")
+        parser.add_argument('--warmup', type=int, default=2, help="Unmeasured requests per endpoint first.")
+        parser.add_argument('--warm-cache', action='store_true',
+                            help="Keep the response cache between requests (measured cold by default).")
+        parser.add_argument('--only', action='append', help="Only this endpoint name (repeatable).")
+        parser.add_argument('--output', default='benchmark-results.json')
+
+    def handle(self, *args, **options):
+        users = get_user_model().objects.order_by('pk')
+        user = users.filter(email=options['user']).first() if options['user'] else \
+            users.filter(email__startswith='synthetic-').first()
+        if user is None:
+            raise CommandError("No such user; create one with seed_synthetic_data.")
+
+        selected = [endpoint for endpoint in endpoints(user) if not options['only'] or endpoint.name in options['only']]
+        results = []
+        for endpoint in selected:
+            result = self.measure(endpoint, user, options)
+            results.append(result)
+            queries = '  -' if result['queries'] is None else f"{result['queries']:3d}"
+            self.stdout.write(
+                f"{endpoint.name:<26} p50 {result['p50_ms']:8.1f}ms  p95 {result['p95_ms']:8.1f}ms  "
+                f"p99 {result['p99_ms']:8.1f}ms  {queries} queries  {result['rows_per_second']:10,.0f} rows/s"
+            )
+
+        report = {
+            'commit': self.commit(),
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'database': connection.vendor,
+            'user': user.email,
+            'iterations': options['iterations'],
+            'warm_cache': options['warm_cache'],
+            'results': results,
+        }
+        with open(options['output'], 'w') as handle:
+            json.dump(report, handle, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {len(results)} endpoint result(s) to {options['output']}."))
+
+    def measure(self, endpoint, user, options):
+        client = APIClient(SERVER_NAME='localhost')
+        if endpoint.staff:
+            # Only the in-memory instance: nothing is saved.
+            user = get_user_model().objects.get(pk=user.pk)
+            user.is_staff = True
+        client.force_authenticate(user=user)
+
+        timings, queries, rows = [], [], 0
+        for iteration in range(options['warmup'] + options['iterations']):
+            if not options['warm_cache']:
+                cache.clear()
+            # Only writes run in a transaction (rolled back): inside one, the async
+            # views would have to issue their queries one after the other.
+            with transaction.atomic() if endpoint.method != 'get' else nullcontext():
+                with CaptureQueriesContext(connection) as captured:
+                    started = time.perf_counter()
+                    response = self.request(client, endpoint)
+                    body = b''.join(response.streaming_content) if response.streaming else response.content
+                    elapsed = time.perf_counter() - started
+                if endpoint.method != 'get':
+                    transaction.set_rollback(True)
+            if response.status_code >= 400:
+                raise CommandError(f"{endpoint.name}: HTTP {response.status_code} {body[:200]!r}")
+            if iteration >= options['warmup']:
+                timings.append(elapsed)
+                queries.append(len(captured))
+                rows += count_rows(response, body)
+
+        return {
+            'endpoint': endpoint.name,
+            'method': endpoint.method.upper(),
+            'path': endpoint.path,
+            'params': endpoint.params,
+            'requests': len(timings),
+            **latency_summary(timings),
+            'queries': None if endpoint.concurrent else max(queries),
+            'rows_per_request': rows / len(timings),
+            'rows_per_second': rows / sum(timings),
+        }
+
+    @staticmethod
+    def request(client, endpoint):
+        if endpoint.method == 'get':
+            return client.get(endpoint.path, endpoint.params)
+        data = endpoint.data()
+        fmt = 'multipart' if any(hasattr(value, 'read') for value in data.values()) else 'json'
+        return getattr(client, endpoint.method)(endpoint.path, data, format=fmt)
+
+    @staticmethod
+    def commit():
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
@@ -0,0 +1,113 @@
+import random
+import factory.random
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from apps.analytics.rollups import rebuild_rollups
+from apps.budgets.factories import BudgetFactory, BudgetTemplateFactory
+from apps.budgets.models import Budget, BudgetTemplate
+from apps.budgets.spend import rebuild_budget_spend
+from apps.categories.factories import CategoryFactory
+from apps.categories.models import Category
+from apps.transactions.factories import ExpenseFactory, IncomeFactory
+from apps.transactions.ledger import rebuild_balances
+from apps.transactions.models import Expense, Income
+from apps.transactions.utils import create_recurring_entries
+from apps.users.factories import UserFactory
+
+
+class Command(BaseCommand):
+    help = (
+        "Creates synthetic users with categories, budgets, budget templates, incomes, expenses and "
+        "recurring series. The same --seed always produces the same data; users of "
+        "an earlier run with that seed are replaced. Password: securePassword123."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=5)
+        parser.add_argument('--categories', type=int, default=12, help="Per user, half income and half expense.")
+        parser.add_argument('--budgets', type=int, default=8, help="Per user.")
+        parser.add_argument('--budget-templates', type=int, default=3, help="Recurring budgets per user.")
+        parser.add_argument('--incomes', type=int, default=500, help="Per user.")
+        parser.add_argument('--expenses', type=int, default=2000, help="Per user.")
+        parser.add_argument('--recurring', type=int, default=20, help="Recurring series per user.")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        seed = options['seed']
+        factory.random.reseed_random(seed)
+        self.rng = random.Random(seed)
+        self.batch_size = options['batch_size']
+
+        emails = [f"synthetic-{seed}-{index}@example.invalid" for index in range(options['users'])]
+        get_user_model().objects.filter(email__in=emails).delete()
+
+        user_ids = []
+        for email in emails:
+            with transaction.atomic():
+                user = UserFactory(email=email)
+                self.create_user_data(user, options)
+            user_ids.append(user.pk)
+
+        # Rows were bulk-created without signals: derive the totals in one go.
+        rebuild_balances(user_ids)
+        rebuild_rollups(user_ids)
+        rebuild_budget_spend(user_ids)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {len(emails)} user(s): {emails[0] if emails else '-'} .. {emails[-1] if emails else '-'}"
+        ))
+
+    def create_user_data(self, user, options):
+        categories = Category.objects.bulk_create([
+            CategoryFactory.build(user=user, type='income' if index % 2 == 0 else 'expense')
+            for index in range(options['categories'])
+        ])
+        by_type = {
+            kind: [category for category in categories if category.type == kind] or [None]
+            for kind in ('income', 'expense')
+        }
+
+        budget_categories = [category for category in by_type['expense'] if category is not None]
+        if budget_categories:
+            Budget.objects.bulk_create([
+                BudgetFactory.build(user=user, category=self.rng.choice(budget_categories))
+                for _ in range(options['budgets'])
+            ])
+            BudgetTemplate.objects.bulk_create([
+                BudgetTemplateFactory.build(
+                    user=user, category=self.rng.choice(budget_categories),
+                    period=self.rng.choice(['weekly', 'monthly', 'yearly']),
+                )
+                for _ in range(options['budget_templates'])
+            ])
+
+        for model, kind_factory, count in (
+            (Income, IncomeFactory, options['incomes']),
+            (Expense, ExpenseFactory, options['expenses']),
+        ):
+            rows = (
+                kind_factory.build(user=user, category=self.rng.choice(by_type[model.kind]))
+                for _ in range(count)
+            )
+            self.bulk_create(model, rows)
+
+        for _ in range(options['recurring']):
+            model, kind_factory = self.rng.choice([(Income, IncomeFactory), (Expense, ExpenseFactory)])
+            recurrence_type = self.rng.choice(['weekly', 'monthly'])
+            recurrence_count = self.rng.randint(2, 24)
+            base = kind_factory(
+                user=user, category=self.rng.choice(by_type[model.kind]),
+                is_recurring=True, recurrence_type=recurrence_type, recurrence_count=recurrence_count,
+            )
+            create_recurring_entries(model, base, recurrence_type, recurrence_count)
+
+    def bulk_create(self, model, rows):
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == self.batch_size:
+                model.objects.bulk_create(batch)
+                batch = []
+        model.objects.bulk_create(batch)
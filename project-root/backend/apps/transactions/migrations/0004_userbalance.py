@@ -0,0 +1,28 @@
+# Generated by Django 4.2.8 on 2026-10-18 10:11
+
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_user_otp_user_otp_created_at'),
+        ('transactions', '0003_transaction_user_date_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserBalance',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='balance', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('total_income', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=14)),
+                ('total_expense', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=14)),
+                ('income_count', models.BigIntegerField(default=0)),
+                ('expense_count', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -1,8 +1,22 @@
+from collections import namedtuple
+from datetime import timedelta
+from decimal import Decimal
+from dateutil.relativedelta import relativedelta
 from django.db import models
 from django.conf import settings
 from apps.categories.models import Category
 
 
+# The parts of a transaction that derived totals (balances, rollups) depend on.
+TransactionState = namedtuple('TransactionState', ['user_id', 'category_id', 'amount', 'date'])
+
+RECURRENCE_TYPE_CHOICES = [('weekly', 'Weekly'), ('monthly', 'Monthly')]
+
+# Virtual occurrences are exposed with id = -(rule_id * OCCURRENCE_ID_BASE + index),
+# which bounds recurrence_count.
+OCCURRENCE_ID_BASE = 10000
+
+
 class TransactionBase(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="%(class)s_entries")
     category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True)
@@ -10,21 +24,181 @@ class TransactionBase(models.Model):
     description = models.TextField(blank=True)
     date = models.DateField()
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     is_recurring = models.BooleanField(default=False)
-    recurrence_type = models.CharField(max_length=10, choices=[('weekly', 'Weekly'), ('monthly', 'Monthly')], null=True, blank=True)
+    recurrence_type = models.CharField(max_length=10, choices=RECURRENCE_TYPE_CHOICES, null=True, blank=True)
     recurrence_count = models.PositiveIntegerField(null=True, blank=True)
 
 
     class Meta:
         abstract = True
         ordering = ['-date']
+        indexes = [
+            # Listing: WHERE user_id = ? ORDER BY date DESC
+            models.Index(fields=['user', '-date'], name='%(class)s_user_date_idx'),
+            # Category / date range filters within a user's history
+            models.Index(fields=['user', 'category', 'date'], name='%(class)s_user_cat_date_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_state = cls._state_from(dict(zip(field_names, values)))
+        return instance
+
+    @staticmethod
+    def _state_from(values):
+        try:
+            return TransactionState(values['user_id'], values['category_id'], values['amount'], values['date'])
+        except KeyError:
+            # Deferred fields: the previous state is fetched on save instead.
+            return None
+
+    def state(self):
+        # to_python: callers may assign ISO strings / numbers before saving.
+        amount = self._meta.get_field('amount').to_python(self.amount)
+        date = self._meta.get_field('date').to_python(self.date)
+        return TransactionState(self.user_id, self.category_id, amount, date)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # post_save receivers have consumed the old state; the saved one is the new baseline.
+        self._loaded_state = self.state()
 
 
 class Income(TransactionBase):
+    kind = 'income'
+
     def __str__(self):
         return f"Income: {self.amount} on {self.date}"
 
 
 class Expense(TransactionBase):
+    kind = 'expense'
+
     def __str__(self):
         return f"Expense: {self.amount} on {self.date}"
+
+
+TRANSACTION_MODELS = {Income.kind: Income, Expense.kind: Expense}
+
+
+class RecurrenceRule(models.Model):
+    """
+    The repeats of a recurring Income/Expense. The entry the user created is a
+    normal row (occurrence 0); occurrences 1..recurrence_count-1 are expanded
+    on read for the requested window. Editing one materializes it as a row and
+    adds its index to `excluded`; deleting one only excludes it.
+    """
+    KIND_CHOICES = [
+        ('income', 'Income'),
+        ('expense', 'Expense'),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='recurrence_rules')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True)
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    description = models.TextField(blank=True)
+    start_date = models.DateField()
+    recurrence_type = models.CharField(max_length=10, choices=RECURRENCE_TYPE_CHOICES)
+    recurrence_count = models.PositiveIntegerField()
+    excluded = models.JSONField(default=list, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'kind'], name='recurrence_rule_user_kind_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.amount} {self.recurrence_type} x{self.recurrence_count} from {self.start_date}"
+
+    @property
+    def transaction_model(self):
+        return TRANSACTION_MODELS[self.kind]
+
+    def occurrence_date(self, index):
+        if self.recurrence_type == 'weekly':
+            return self.start_date + timedelta(weeks=index)
+        return self.start_date + relativedelta(months=index)
+
+    def _first_index_on_or_after(self, day):
+        if self.recurrence_type == 'weekly':
+            return -(-(day - self.start_date).days // 7)
+        index = (day.year - self.start_date.year) * 12 + day.month - self.start_date.month
+        return index if self.occurrence_date(index) >= day else index + 1
+
+    def _last_index_on_or_before(self, day):
+        if self.recurrence_type == 'weekly':
+            return (day - self.start_date).days // 7
+        index = (day.year - self.start_date.year) * 12 + day.month - self.start_date.month
+        return index if self.occurrence_date(index) <= day else index - 1
+
+    def occurrences(self, start=None, end=None):
+        """Yields (index, date) of the live occurrences within [start, end]."""
+        first, last = 1, self.recurrence_count - 1
+        if start is not None:
+            first = max(first, self._first_index_on_or_after(start))
+        if end is not None:
+            last = min(last, self._last_index_on_or_before(end))
+        excluded = set(self.excluded)
+        for index in range(first, last + 1):
+            if index not in excluded:
+                yield index, self.occurrence_date(index)
+
+    def total_between(self, start=None, end=None):
+        return self.amount * sum(1 for _ in self.occurrences(start, end))
+
+    def occurrence_state(self, index):
+        return TransactionState(self.user_id, self.category_id, self.amount, self.occurrence_date(index))
+
+    def states(self, start=None, end=None):
+        return [TransactionState(self.user_id, self.category_id, self.amount, day) for _, day in self.occurrences(start, end)]
+
+    def virtual_id(self, index):
+        return -(self.pk * OCCURRENCE_ID_BASE + index)
+
+    @staticmethod
+    def split_virtual_id(virtual_id):
+        """(rule id, occurrence index) of a negative occurrence id."""
+        return divmod(-virtual_id, OCCURRENCE_ID_BASE)
+
+    def virtual_entry(self, index, day=None):
+        """An unsaved Income/Expense standing in for occurrence `index`."""
+        entry = self.transaction_model(
+            id=self.virtual_id(index),
+            user_id=self.user_id,
+            category_id=self.category_id,
+            amount=self.amount,
+            description=self.description,
+            date=day or self.occurrence_date(index),
+            created_at=self.created_at,
+            is_recurring=True,
+            recurrence_type=self.recurrence_type,
+            recurrence_count=self.recurrence_count,
+        )
+        entry.recurrence_rule, entry.occurrence_index = self, index
+        return entry
+
+
+class UserBalance(models.Model):
+    """
+    Running totals per user, kept in step with Income/Expense writes by
+    apps.transactions.signals. A missing row means "not built yet": it is
+    computed from scratch on first read (see ledger.get_balance).
+    """
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name='balance')
+    total_income = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0'))
+    total_expense = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0'))
+    income_count = models.BigIntegerField(default=0)
+    expense_count = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def balance(self):
+        return self.total_income - self.total_expense
+
+    def __str__(self):
+        return f"Balance for {self.user_id}: {self.balance}"
@@ -0,0 +1,71 @@
+# transactions/recurrence.py
+
+from django.db import transaction
+from rest_framework.exceptions import NotFound
+from .models import RecurrenceRule
+from .signals import transactions_changed
+
+
+def rules_for(user, kind, filters=None):
+    """The user's rules of one kind, narrowed by the listing category filter."""
+    rules = RecurrenceRule.objects.filter(user=user, kind=kind)
+    if filters and filters['category']:
+        rules = rules.filter(category_id=filters['category'])
+    return rules
+
+
+def virtual_entries(rules, filters):
+    """Unsaved Income/Expense instances for every live occurrence matching the filters."""
+    entries = []
+    for rule in rules:
+        for index, day in rule.occurrences(filters['start'], filters['end']):
+            if filters['month'] and day.month != filters['month']:
+                continue
+            entries.append(rule.virtual_entry(index, day))
+    return entries
+
+
+def get_occurrence(user, model, virtual_id, rules=None):
+    """
+    Resolves a negative occurrence id of `model` owned by `user`, or raises
+    NotFound. `rules` (id -> RecurrenceRule) saves the query when already loaded.
+    """
+    rule_id, index = RecurrenceRule.split_virtual_id(virtual_id)
+    if rules is None:
+        rule = RecurrenceRule.objects.filter(pk=rule_id, user=user, kind=model.kind).first()
+    else:
+        rule = rules.get(rule_id)
+        if rule is not None and (rule.user_id != user.pk or rule.kind != model.kind):
+            rule = None
+    if rule is None or not 0 < index < rule.recurrence_count or index in rule.excluded:
+        raise NotFound()
+    return rule.virtual_entry(index)
+
+
+def exclude_occurrence(rule, index):
+    """Drops one occurrence from the series (deleted, or replaced by a real row)."""
+    with transaction.atomic():
+        rule = RecurrenceRule.objects.select_for_update().get(pk=rule.pk)
+        if index in rule.excluded:
+            return rule
+        rule.excluded = sorted(rule.excluded + [index])
+        rule.save(update_fields=['excluded', 'updated_at'])
+        transactions_changed.send(sender=rule.transaction_model, added=[], removed=[rule.occurrence_state(index)])
+    return rule
+
+
+def materialize_occurrence(entry):
+    """Turns a virtual entry into a stored row so it can be edited on its own."""
+    rule, index = entry.recurrence_rule, entry.occurrence_index
+    with transaction.atomic():
+        exclude_occurrence(rule, index)
+        return rule.transaction_model.objects.create(
+            user_id=rule.user_id,
+            category_id=rule.category_id,
+            amount=rule.amount,
+            description=rule.description,
+            date=entry.date,
+            is_recurring=True,
+            recurrence_type=rule.recurrence_type,
+            recurrence_count=rule.recurrence_count,
+        )
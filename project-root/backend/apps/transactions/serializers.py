@@ -1,14 +1,48 @@
 from rest_framework import serializers
-from .models import Income, Expense
+from .models import Income, Expense, OCCURRENCE_ID_BASE
 from .utils import create_recurring_entries
 
 
+def to_columns(rows, fields):
+    """Compact layout: one array of values per field instead of one dict per row."""
+    return {field: [row[field] for row in rows] for field in fields}
+
+
+class PreloadedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Looks the pk up in context['preloaded'][model] (pk -> instance) when the
+    caller loaded the related rows up front, e.g. for a whole batch; one
+    query per row otherwise.
+    """
+    def to_internal_value(self, data):
+        preloaded = self.context.get('preloaded', {}).get(self.queryset.model)
+        if preloaded is None or isinstance(data, bool):
+            return super().to_internal_value(data)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            return super().to_internal_value(data)
+        if pk not in preloaded:
+            self.fail('does_not_exist', pk_value=data)
+        return preloaded[pk]
+
+
 class TransactionBaseSerializer(serializers.ModelSerializer):
+    serializer_related_field = PreloadedPrimaryKeyRelatedField
+
     class Meta:
         fields = ['id', 'amount', 'category', 'description', 'date', 'created_at',
                   'is_recurring', 'recurrence_type', 'recurrence_count']
         read_only_fields = ['id', 'created_at']
 
+    def __init__(self, *args, **kwargs):
+        # Optional `fields`: only these fields are serialized (sparse fieldsets).
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
     def validate(self, data):
         is_recurring = data.get('is_recurring', False)
         recurrence_type = data.get('recurrence_type')
@@ -23,6 +57,8 @@ class TransactionBaseSerializer(serializers.ModelSerializer):
                 raise serializers.ValidationError("recurrence_type must be 'weekly' or 'monthly'.")
             if recurrence_count <= 0:
                 raise serializers.ValidationError("recurrence_count must be a positive integer.")
+            if recurrence_count >= OCCURRENCE_ID_BASE:
+                raise serializers.ValidationError(f"recurrence_count must be less than {OCCURRENCE_ID_BASE}.")
         else:
             if recurrence_type is not None or recurrence_count is not None:
                 raise serializers.ValidationError("recurrence_type and recurrence_count must be null when is_recurring is False.")
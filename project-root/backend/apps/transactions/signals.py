@@ -0,0 +1,94 @@
+# transactions/signals.py
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import Signal, receiver
+from finance_tracker.caching import bump_generation
+from .models import Income, Expense, RecurrenceRule
+from .ledger import apply_balance_changes
+
+# Sent with sender=<Income|Expense>, added=[TransactionState], removed=[TransactionState]
+# whenever rows are written. Single saves/deletes are translated below; bulk
+# paths (bulk_create, queryset updates) must send it themselves.
+transactions_changed = Signal()
+
+_row_signals_muted = ContextVar('transactions_row_signals_muted', default=False)
+
+
+@contextmanager
+def row_signals_muted():
+    """
+    Skips the per-row translation below, for bulk paths that delete or save
+    many rows and send one aggregated transactions_changed themselves.
+    """
+    token = _row_signals_muted.set(True)
+    try:
+        yield
+    finally:
+        _row_signals_muted.reset(token)
+
+
+@receiver(pre_save, sender=Income)
+@receiver(pre_save, sender=Expense)
+def capture_previous_state(sender, instance, **kwargs):
+    if instance._state.adding or getattr(instance, '_loaded_state', None) is not None:
+        return
+    values = sender.objects.filter(pk=instance.pk).values('user_id', 'category_id', 'amount', 'date').first()
+    instance._loaded_state = sender._state_from(values) if values else None
+
+
+@receiver(post_save, sender=Income)
+@receiver(post_save, sender=Expense)
+def transaction_saved(sender, instance, created, **kwargs):
+    if _row_signals_muted.get():
+        return
+    previous = None if created else getattr(instance, '_loaded_state', None)
+    current = instance.state()
+    if previous == current:
+        return
+    transactions_changed.send(
+        sender=sender,
+        added=[current],
+        removed=[previous] if previous else [],
+    )
+
+
+def deleted_with_user(origin):
+    """True when a delete cascades from a user (instance or queryset) being removed."""
+    model = getattr(origin, 'model', type(origin))
+    return model._meta.label == settings.AUTH_USER_MODEL if hasattr(model, '_meta') else False
+
+
+@receiver(post_delete, sender=Income)
+@receiver(post_delete, sender=Expense)
+def transaction_deleted(sender, instance, **kwargs):
+    if _row_signals_muted.get() or deleted_with_user(kwargs.get('origin')):
+        # Every derived row of that user is being cascaded away as well.
+        return
+    previous = getattr(instance, '_loaded_state', None) or instance.state()
+    transactions_changed.send(sender=sender, added=[], removed=[previous])
+
+
+@receiver(transactions_changed)
+def update_balances(sender, added, removed, **kwargs):
+    apply_balance_changes(sender.kind, added, removed)
+
+
+@receiver(transactions_changed)
+def invalidate_cached_responses(sender, added, removed, **kwargs):
+    for user_id in {state.user_id for state in (*added, *removed)}:
+        bump_generation(user_id)
+
+
+@receiver(post_save, sender=Income)
+@receiver(post_save, sender=Expense)
+@receiver(post_save, sender=RecurrenceRule)
+@receiver(post_delete, sender=Income)
+@receiver(post_delete, sender=Expense)
+@receiver(post_delete, sender=RecurrenceRule)
+def invalidate_on_row_write(sender, instance, **kwargs):
+    # Edits that leave the totals alone (e.g. the description) still change
+    # the listings and their ETags.
+    bump_generation(instance.user_id)
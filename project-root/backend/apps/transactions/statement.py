@@ -0,0 +1,184 @@
+# transactions/statement.py
+
+from bisect import bisect_right
+from decimal import Decimal
+from itertools import accumulate
+from django.db import connection
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import NotFound
+from .models import Income, Expense
+from .recurrence import rules_for, virtual_entries
+
+# kind -> (model, sign in the balance, entry_key offset). entry_key = id * 2 + offset
+# is unique across both tables and orders the rows sharing a date.
+STATEMENT_KINDS = {
+    'income': (Income, 1, 0),
+    'expense': (Expense, -1, 1),
+}
+CENTS = Decimal('0.01')
+
+
+def qn(name):
+    return connection.ops.quote_name(name)
+
+
+def _to_decimal(value):
+    # SQLite hands back floats for numeric columns and sums.
+    if value is None or isinstance(value, Decimal):
+        return value
+    return Decimal(str(value)).quantize(CENTS)
+
+
+def _seek(key, lookup):
+    try:
+        day = parse_date(key[0])
+    except ValueError:
+        day = None
+    if day is None:
+        raise NotFound('Invalid cursor')
+    day = connection.ops.adapt_datefield_value(day)
+    condition = f"({qn('date')} {lookup} %s OR ({qn('date')} = %s AND {qn('entry_key')} {lookup} %s))"
+    return condition, [day, day, key[1]]
+
+
+class Statement:
+    """
+    A user's incomes and expenses as one date-ordered stream, read with a
+    single UNION ALL query whose window function carries the running balance.
+
+    The balance runs over the user's whole history up to each row (narrowed
+    by the category filter only), so a date-filtered page still shows real
+    balances. Recurring occurrences are not rows: they are merged in Python,
+    their amounts folded into the balances through prefix sums.
+    """
+    def __init__(self, user, filters):
+        self.user = user
+        self.filters = filters
+
+        history = dict(filters, start=None, month=None)
+        occurrences = []
+        for kind in STATEMENT_KINDS:
+            occurrences += [self.virtual_row(entry) for entry in virtual_entries(rules_for(user, kind, filters), history)]
+        occurrences.sort(key=self.sort_key)
+        self.occurrence_keys = [self.sort_key(row) for row in occurrences]
+        self.occurrence_sums = list(accumulate(row['signed_amount'] for row in occurrences))
+        self.occurrences = [row for row in occurrences if self.visible(row)]
+
+    @staticmethod
+    def sort_key(row):
+        return row['date'].isoformat(), row['entry_key']
+
+    def visible(self, row):
+        if self.filters['start'] and row['date'] < self.filters['start']:
+            return False
+        return not self.filters['month'] or row['date'].month == self.filters['month']
+
+    @staticmethod
+    def virtual_row(entry):
+        _, sign, offset = STATEMENT_KINDS[entry.kind]
+        return {
+            'id': entry.id, 'kind': entry.kind, 'entry_key': entry.id * 2 + offset,
+            'date': entry.date, 'amount': entry.amount, 'signed_amount': sign * entry.amount,
+            'category_id': entry.category_id, 'description': entry.description,
+            'is_recurring': True, 'running': None,
+        }
+
+    def _union_sql(self):
+        parts, params = [], []
+        for kind, (model, sign, offset) in STATEMENT_KINDS.items():
+            where = [f"{qn('user_id')} = %s"]
+            params.append(self.user.pk)
+            if self.filters['category']:
+                where.append(f"{qn('category_id')} = %s")
+                params.append(self.filters['category'])
+            if self.filters['end']:
+                where.append(f"{qn('date')} <= %s")
+                params.append(connection.ops.adapt_datefield_value(self.filters['end']))
+            parts.append(
+                f"SELECT {qn('id')}, '{kind}' AS {qn('kind')}, {qn('id')} * 2 + {offset} AS {qn('entry_key')}, "
+                f"{qn('date')}, {qn('amount')}, {sign} * {qn('amount')} AS {qn('signed_amount')}, "
+                f"{qn('category_id')}, {qn('description')}, {qn('is_recurring')} "
+                f"FROM {qn(model._meta.db_table)} WHERE {' AND '.join(where)}"
+            )
+        return ' UNION ALL '.join(parts), params
+
+    def _execute(self, sql, params):
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, values)) for values in cursor.fetchall()]
+
+    def fetch(self, cursor=None, scan_descending=True, limit=None):
+        """
+        Stored rows past the cursor in scan order, each with the window's
+        `running` balance (the `fetch` contract of KeysetPagination.paginate_rows);
+        everything when limit is None.
+        """
+        union_sql, params = self._union_sql()
+        conditions = []
+        if self.filters['start']:
+            conditions.append(f"{qn('date')} >= %s")
+            params.append(connection.ops.adapt_datefield_value(self.filters['start']))
+        if self.filters['month']:
+            month_sql, month_params = connection.ops.date_extract_sql('month', qn('date'), ())
+            conditions.append(f"{month_sql} = %s")
+            params += list(month_params) + [self.filters['month']]
+        if cursor:
+            condition, seek_params = _seek((cursor['v'], cursor['id']), '<' if scan_descending else '>')
+            conditions.append(condition)
+            params += seek_params
+
+        direction = 'DESC' if scan_descending else 'ASC'
+        sql = (
+            f"SELECT * FROM (SELECT entries.*, SUM({qn('signed_amount')}) OVER ("
+            f"ORDER BY {qn('date')}, {qn('entry_key')} ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW"
+            f") AS {qn('running')} FROM ({union_sql}) AS entries) AS statement"
+        )
+        if conditions:
+            sql += f" WHERE {' AND '.join(conditions)}"
+        sql += f" ORDER BY {qn('date')} {direction}, {qn('entry_key')} {direction}"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+
+        rows = self._execute(sql, params)
+        for row in rows:
+            if isinstance(row['date'], str):
+                row['date'] = parse_date(row['date'])
+            for field in ('amount', 'signed_amount', 'running'):
+                row[field] = _to_decimal(row[field])
+            row['is_recurring'] = bool(row['is_recurring'])
+        return rows
+
+    def _stored_totals_before(self, keys):
+        """Sum of stored rows strictly before each key, in one aggregate query."""
+        if not keys:
+            return {}
+        union_sql, params = self._union_sql()
+        columns, case_params = [], []
+        for index, key in enumerate(keys):
+            condition, seek_params = _seek(key, '<')
+            columns.append(f"SUM(CASE WHEN {condition} THEN {qn('signed_amount')} ELSE 0 END) AS {qn(f'b{index}')}")
+            case_params += seek_params
+        row = self._execute(f"SELECT {', '.join(columns)} FROM ({union_sql}) AS entries", case_params + params)[0]
+        return {key: _to_decimal(row[f'b{index}']) or Decimal('0') for index, key in enumerate(keys)}
+
+    def entries(self, rows):
+        """Output dicts in the given order, each with the running balance after it."""
+        stored_before = self._stored_totals_before([self.sort_key(row) for row in rows if row['running'] is None])
+        entries = []
+        for row in rows:
+            key = self.sort_key(row)
+            stored = row['running'] if row['running'] is not None else stored_before[key]
+            index = bisect_right(self.occurrence_keys, key)
+            balance = stored + (self.occurrence_sums[index - 1] if index else Decimal('0'))
+            entries.append({
+                'id': row['id'],
+                'kind': row['kind'],
+                'date': row['date'].isoformat(),
+                'amount': f"{row['amount'].quantize(CENTS):f}",
+                'category': row['category_id'],
+                'description': row['description'],
+                'is_recurring': row['is_recurring'],
+                'balance': f"{balance.quantize(CENTS):f}",
+            })
+        return entries
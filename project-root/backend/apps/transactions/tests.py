@@ -1,3 +1,640 @@
-from django.test import TestCase
+import base64
+import csv
+import io
+import json
+from unittest import mock, skipUnless
+from datetime import date
+from decimal import Decimal
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from apps.users.models import User
+from apps.categories.models import Category
+from .models import Income, Expense, RecurrenceRule, UserBalance
+from .ledger import get_balance, rebuild_balances
+from .views import IncomeViewSet
+from .factories import IncomeFactory, RecurrenceRuleFactory, create_history
+from apps.categories.factories import CategoryFactory
+from apps.users.factories import UserFactory
+from finance_tracker.testing import QueryBudgetMixin
 
-# Create your tests here.
+
+class TransactionFilterTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="test@example.com", password="securePassword123")
+        self.client.force_authenticate(user=self.user)
+        self.salary = Category.objects.create(user=self.user, name="Salary", type="income")
+
+        for day in [date(2024, 12, 31), date(2025, 1, 1), date(2025, 1, 31), date(2025, 2, 1), date(2026, 1, 15)]:
+            Income.objects.create(user=self.user, category=self.salary, amount=Decimal('10.00'), date=day)
+
+        self.income_url = reverse('income-list')
+
+    def test_year_and_month_filter_uses_month_bounds(self):
+        response = self.client.get(self.income_url, {'year': 2025, 'month': 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['date'] for row in response.data], ['2025-01-31', '2025-01-01'])
+
+    def test_last_month_of_year_9999(self):
+        for url in (self.income_url, reverse('expense-list'), reverse('transactions-ledger'), reverse('expense-export')):
+            with self.subTest(url=url):
+                response = self.client.get(url, {'year': 9999, 'month': 12})
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_year_filter(self):
+        response = self.client.get(self.income_url, {'year': 2025})
+        self.assertEqual(len(response.data), 3)
+
+    def test_month_filter_without_year_spans_years(self):
+        response = self.client.get(self.income_url, {'month': 1})
+        self.assertEqual(len(response.data), 3)
+
+    def test_invalid_month_is_rejected(self):
+        response = self.client.get(self.income_url, {'month': 13})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_other_users_rows_are_hidden(self):
+        other = User.objects.create_user(email="other@example.com", password="securePassword123")
+        Expense.objects.create(user=other, amount=Decimal('5.00'), date=date(2025, 1, 1))
+        response = self.client.get(reverse('expense-list'))
+        self.assertEqual(response.data, [])
+
+    def test_fast_list_matches_serializer(self):
+        Income.objects.filter(date=date(2025, 1, 1)).update(description='Bonus "Q1"', is_recurring=True)
+        self.client.post(self.income_url, {
+            'amount': '7.5', 'date': '2025-03-01', 'category': self.salary.pk,
+            'is_recurring': True, 'recurrence_type': 'monthly', 'recurrence_count': 3,
+        })
+        fast = self.client.get(self.income_url).data
+        with mock.patch.object(IncomeViewSet, 'fast_list', False):
+            self.assertEqual(self.client.get(self.income_url).data, fast)
+            self.assertEqual(self.client.get(self.income_url, {'page_size': 4}).data['results'], fast[:4])
+        self.assertEqual(len(fast), 8)
+
+
+class TransactionPaginationTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="test@example.com", password="securePassword123")
+        self.client.force_authenticate(user=self.user)
+        # Two rows per day so pages have to break ties on id.
+        for day in range(1, 11):
+            for _ in range(2):
+                Expense.objects.create(user=self.user, amount=Decimal('1.00'), date=date(2025, 1, day))
+        self.url = reverse('expense-list')
+
+    def test_unpaginated_without_params(self):
+        response = self.client.get(self.url)
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 20)
+
+    def test_walks_forward_and_back_without_gaps(self):
+        expected = list(Expense.objects.order_by('-date', '-id').values_list('id', flat=True))
+
+        seen, pages = [], []
+        response = self.client.get(self.url, {'page_size': 3})
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages.append(response.data)
+            seen += [row['id'] for row in response.data['results']]
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+        self.assertEqual(seen, expected)
+        self.assertIsNone(pages[0]['previous'])
+
+        previous = self.client.get(pages[-1]['previous'])
+        self.assertEqual(previous.data['results'], pages[-2]['results'])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_tampered_cursor(self):
+        def cursor(payload):
+            return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+        tampered = [
+            {'v': 'garbage', 'id': 1},
+            {'v': '2025-13-40', 'id': 1},
+            {'v': '2025-01-01', 'id': 2 ** 70},
+            ['2025-01-01', 1],
+        ]
+        for url in (self.url, reverse('income-list'), reverse('budget-list'), reverse('category-list'), reverse('transactions-ledger')):
+            for payload in tampered:
+                with self.subTest(url=url, payload=payload):
+                    response = self.client.get(url, {'cursor': cursor(payload)})
+                    self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        # A date is not a valid created_at key, and the other way round.
+        self.assertEqual(self.client.get(self.url, {'cursor': cursor({'v': '2025-01-01T00:00:00+00:00', 'id': 1})}).status_code, 404)
+        self.assertEqual(self.client.get(reverse('budget-list'), {'cursor': cursor({'v': '2025-01-01T00:00:00+00:00', 'id': 1})}).status_code, 200)
+
+    def test_no_etag_unless_enabled(self):
+        self.assertNotIn('ETag', self.client.get(self.url))
+
+    @override_settings(CONDITIONAL_GET=True)
+    def test_conditional_get(self):
+        etag = self.client.get(self.url)['ETag']
+        # The ETag comes from the cached per-user generation: no query at all.
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+        self.assertNotEqual(self.client.get(self.url, {'page_size': 3})['ETag'], etag)
+
+        expense = Expense.objects.first()
+        self.client.patch(reverse('expense-detail', args=[expense.pk]), {'description': 'edited'})
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        etag = response['ETag']
+        expense.delete()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_sparse_fields(self):
+        response = self.client.get(self.url, {'fields': 'date,amount'})
+        self.assertEqual(response.data[0], {'amount': '1.00', 'date': '2025-01-10'})
+
+        response = self.client.get(self.url, {'fields': 'date,secret'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_compact_columns(self):
+        response = self.client.get(self.url, {'fields': 'id,date', 'compact': 'true', 'page_size': 3})
+        expected = list(Expense.objects.order_by('-date', '-id').values_list('id', flat=True)[:3])
+        self.assertEqual(response.data['results'], {
+            'id': expected, 'date': ['2025-01-10', '2025-01-10', '2025-01-09'],
+        })
+
+
+class BalanceLedgerTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email="test@example.com", password="securePassword123")
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('balance')
+
+    def assertLedgerMatchesTables(self):
+        ledger = UserBalance.objects.get(user=self.user)
+        rebuilt = rebuild_balances([self.user.pk])[self.user.pk]
+        self.assertEqual(
+            (ledger.total_income, ledger.total_expense, ledger.income_count, ledger.expense_count),
+            (rebuilt.total_income, rebuilt.total_expense, rebuilt.income_count, rebuilt.expense_count),
+        )
+
+    @skipUnless(connection.features.has_select_for_update, "needs row locks")
+    def test_rebuild_locks_rows_before_reading_the_tables(self):
+        Income.objects.create(user=self.user, amount=Decimal('100.00'), date=date(2025, 1, 1))
+        with CaptureQueriesContext(connection) as queries:
+            rebuild_balances([self.user.pk])
+        sql = [query['sql'] for query in queries]
+        lock = next(index for index, query in enumerate(sql) if 'FOR UPDATE' in query)
+        read = next(index for index, query in enumerate(sql) if Income._meta.db_table in query and 'SUM' in query)
+        self.assertLess(lock, read)
+
+    def test_balance_built_from_existing_rows(self):
+        Income.objects.create(user=self.user, amount=Decimal('100.00'), date=date(2025, 1, 1))
+        Expense.objects.create(user=self.user, amount=Decimal('30.50'), date=date(2025, 1, 2))
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['balance'], Decimal('69.50'))
+        self.assertEqual(response.data['expense_count'], 1)
+
+    def test_ledger_follows_create_update_delete(self):
+        self.client.get(self.url)  # materialize the row
+
+        response = self.client.post(reverse('income-list'), {'amount': '50.00', 'date': '2025-01-01'})
+        income_id = response.data['id']
+        self.client.post(reverse('expense-list'), {'amount': '20.00', 'date': '2025-01-01'})
+        self.client.patch(reverse('income-detail', args=[income_id]), {'amount': '80.00'})
+        self.assertLedgerMatchesTables()
+
+        self.client.delete(reverse('income-detail', args=[income_id]))
+        self.assertLedgerMatchesTables()
+        self.assertEqual(self.client.get(self.url).data['balance'], Decimal('-20.00'))
+
+    def test_ledger_includes_recurring_entries(self):
+        self.client.get(self.url)
+        self.client.post(reverse('expense-list'), {
+            'amount': '10.00', 'date': '2025-01-01',
+            'is_recurring': True, 'recurrence_type': 'monthly', 'recurrence_count': 6,
+        })
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['total_expense'], Decimal('60.00'))
+        self.assertEqual(response.data['expense_count'], 6)
+        self.assertLedgerMatchesTables()
+
+    def test_balance_cached_until_a_write(self):
+        self.assertEqual(self.client.get(self.url)['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+        self.client.post(reverse('income-list'), {'amount': '15.00', 'date': '2025-01-01'})
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['balance'], Decimal('15.00'))
+
+        self.assertEqual(self.client.get(reverse('cache-stats')).status_code, status.HTTP_403_FORBIDDEN)
+        self.user.is_staff = True
+        stats = self.client.get(reverse('cache-stats')).data
+        self.assertEqual((stats['hits'], stats['misses']), (1, 2))
+
+
+class TransactionExportTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="test@example.com", password="securePassword123")
+        self.client.force_authenticate(user=self.user)
+        food = Category.objects.create(user=self.user, name="Food", type="expense")
+        Income.objects.create(user=self.user, amount=Decimal('100.00'), date=date(2025, 1, 2), description="Salary")
+        Expense.objects.create(user=self.user, category=food, amount=Decimal('12.50'), date=date(2025, 1, 3), description='Lunch, "big"')
+        Expense.objects.create(user=self.user, amount=Decimal('3.00'), date=date(2025, 1, 1))
+        Expense.objects.create(user=self.user, amount=Decimal('9.00'), date=date(2025, 3, 1))
+
+    def read_csv(self, response):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+
+    def test_expense_export_honours_filters(self):
+        rows = self.read_csv(self.client.get(reverse('expense-export'), {'year': 2025, 'month': 1}))
+        self.assertEqual(rows, [
+            ['date', 'type', 'amount', 'category', 'description', 'is_recurring'],
+            ['2025-01-03', 'expense', '12.50', 'Food', 'Lunch, "big"', 'False'],
+            ['2025-01-01', 'expense', '3.00', '', '', 'False'],
+        ])
+
+    def test_combined_export_is_date_ordered(self):
+        response = self.client.get(reverse('export-csv'), {'start_date': '2025-01-01', 'end_date': '2025-01-31'})
+        rows = self.read_csv(response)
+        self.assertEqual([(row[0], row[1]) for row in rows[1:]], [
+            ('2025-01-03', 'expense'), ('2025-01-02', 'income'), ('2025-01-01', 'expense'),
+        ])
+        self.assertIn('transactions.csv', response['Content-Disposition'])
+
+    def test_invalid_date_param(self):
+        response = self.client.get(reverse('transactions-export'), {'start_date': '01/01/2025'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TransactionImportTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="test@example.com", password="securePassword123")
+        self.client.force_authenticate(user=self.user)
+        Category.objects.create(user=self.user, name="Food", type="expense")
+        self.url = reverse('transactions-import')
+
+    def upload(self, name, content, **extra):
+        return self.client.post(self.url, {'file': SimpleUploadedFile(name, content.encode()), **extra}, format='multipart')
+
+    def test_csv_import_reports_row_errors(self):
+        content = (
+            "date,type,amount,category,description\n"
+            "2025-01-01,income,1000.00,,Salary\n"
+            "2025-01-02,expense,12.50,food,Lunch\n"
+            "not-a-date,expense,1.00,,\n"
+            "2025-01-03,expense,5.00,Travel,Bus\n"
+        )
+        response = self.upload('statement.csv', content)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['created'], {'income': 1, 'expense': 1})
+        self.assertEqual([error['line'] for error in response.data['errors']], [4, 5])
+        self.assertEqual(Expense.objects.get().category.name, "Food")
+        self.assertEqual(get_balance(self.user).balance, Decimal('987.50'))
+
+    def test_csv_import_can_create_categories(self):
+        response = self.upload('statement.csv', "date,amount,category\n2025-01-03,-5.00,Travel\n", create_categories='true')
+        self.assertEqual(response.data['created'], {'income': 0, 'expense': 1})
+        self.assertTrue(Category.objects.filter(user=self.user, name="Travel", type="expense").exists())
+
+    def test_ofx_import(self):
+        content = (
+            "OFXHEADER:100\n<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>\n"
+            "<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20250105120000<TRNAMT>-42.10<NAME>Grocer</STMTTRN>\n"
+            "<STMTTRN>\n<TRNTYPE>CREDIT\n<DTPOSTED>20250110\n<TRNAMT>500.00\n<MEMO>Refund\n</STMTTRN>\n"
+            "</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>\n"
+        )
+        response = self.upload('bank.ofx', content)
+        self.assertEqual(response.data['created'], {'income': 1, 'expense': 1})
+        self.assertEqual(Expense.objects.get().description, "Grocer")
+        self.assertEqual(Income.objects.get().date, date(2025, 1, 10))
+
+    def test_qif_import(self):
+        content = "!Type:Bank\nD01/31/2025\nT-20.00\nPCafe\nLFood\n^\nD02/01'25\nT100.00\nPGift\n^\n"
+        response = self.upload('bank.qif', content)
+        self.assertEqual(response.data['created'], {'income': 1, 'expense': 1})
+        self.assertEqual(Expense.objects.get().category.name, "Food")
+
+    def test_unknown_format(self):
+        response = self.upload('bank.xlsx', "x")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TransactionBatchTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="test@example.com", password="securePassword123")
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('transactions-batch')
+        self.income = Income.objects.create(user=self.user, amount=Decimal('100.00'), date=date(2025, 1, 1))
+        self.expense = Expense.objects.create(user=self.user, amount=Decimal('20.00'), date=date(2025, 1, 2))
+        get_balance(self.user)
+
+    def test_mixed_operations_apply_together(self):
+        response = self.client.post(self.url, {'operations': [
+            {'op': 'create', 'kind': 'expense', 'data': {'amount': '5.00', 'date': '2025-01-03'}},
+            {'op': 'create', 'kind': 'expense', 'data': {'amount': '7.00', 'date': '2025-01-04'}},
+            {'op': 'update', 'kind': 'income', 'id': self.income.id, 'data': {'amount': '150.00'}},
+            {'op': 'delete', 'kind': 'expense', 'id': self.expense.id},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([r['status'] for r in response.data['results']], ['created', 'created', 'updated', 'deleted'])
+        self.assertEqual(response.data['results'][2]['data']['amount'], '150.00')
+
+        self.assertEqual(Expense.objects.count(), 2)
+        self.assertEqual(UserBalance.objects.get(user=self.user).balance, Decimal('138.00'))
+        self.assertEqual(rebuild_balances([self.user.pk])[self.user.pk].balance, Decimal('138.00'))
+
+    def test_invalid_item_rejects_whole_batch(self):
+        other = User.objects.create_user(email="other@example.com", password="securePassword123")
+        foreign = Expense.objects.create(user=other, amount=Decimal('1.00'), date=date(2025, 1, 1))
+        response = self.client.post(self.url, {'operations': [
+            {'op': 'create', 'kind': 'income', 'data': {'amount': '5.00', 'date': '2025-01-03'}},
+            {'op': 'create', 'kind': 'income', 'data': {'amount': 'abc', 'date': '2025-01-03'}},
+            {'op': 'delete', 'kind': 'expense', 'id': foreign.id},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['errors'][0], {})
+        self.assertIn('amount', response.data['errors'][1])
+        self.assertIn('id', response.data['errors'][2])
+        self.assertEqual(Income.objects.count(), 1)
+        self.assertTrue(Expense.objects.filter(pk=foreign.pk).exists())
+
+    def test_row_targeted_twice(self):
+        response = self.client.post(self.url, {'operations': [
+            {'op': 'update', 'kind': 'income', 'id': self.income.id, 'data': {'amount': '1.00'}},
+            {'op': 'delete', 'kind': 'income', 'id': self.income.id},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class RecurrenceRuleTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="test@example.com", password="securePassword123")
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('income-list')
+        response = self.client.post(self.url, {
+            'amount': '100.00', 'date': '2025-01-31',
+            'is_recurring': True, 'recurrence_type': 'monthly', 'recurrence_count': 12,
+        })
+        self.base_id = response.data['id']
+        self.rule = RecurrenceRule.objects.get()
+
+    def test_series_is_one_row_and_one_rule(self):
+        self.assertEqual(Income.objects.count(), 1)
+        self.assertEqual(self.rule.recurrence_count, 12)
+        self.assertEqual(get_balance(self.user).total_income, Decimal('1200.00'))
+
+    def test_listing_expands_requested_window(self):
+        response = self.client.get(self.url, {'year': 2025, 'month': 2})
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]['date'], '2025-02-28')
+        self.assertEqual(response.data[0]['id'], self.rule.virtual_id(1))
+
+        response = self.client.get(self.url, {'year': 2025})
+        self.assertEqual([row['date'][5:7] for row in response.data], [f'{m:02d}' for m in range(12, 0, -1)])
+
+    def test_pagination_merges_occurrences(self):
+        Income.objects.create(user=self.user, amount=Decimal('5.00'), date=date(2025, 3, 15))
+        seen = []
+        response = self.client.get(self.url, {'page_size': 5})
+        while True:
+            seen += [row['date'] for row in response.data['results']]
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+        self.assertEqual(len(seen), 13)
+        self.assertEqual(seen, sorted(seen, reverse=True))
+
+    def test_editing_an_occurrence_materializes_it(self):
+        virtual_id = self.rule.virtual_id(2)
+        response = self.client.patch(reverse('income-detail', args=[virtual_id]), {'amount': '150.00'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertGreater(response.data['id'], 0)
+        self.assertEqual(response.data['date'], '2025-03-31')
+
+        self.rule.refresh_from_db()
+        self.assertEqual(self.rule.excluded, [2])
+        self.assertEqual(len(self.client.get(self.url).data), 12)
+        self.assertEqual(get_balance(self.user).total_income, Decimal('1250.00'))
+        self.assertEqual(rebuild_balances([self.user.pk])[self.user.pk].total_income, Decimal('1250.00'))
+
+    def test_deleting_an_occurrence_excludes_it(self):
+        get_balance(self.user)
+        response = self.client.delete(reverse('income-detail', args=[self.rule.virtual_id(3)]))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(len(self.client.get(self.url).data), 11)
+        self.assertEqual(get_balance(self.user).total_income, Decimal('1100.00'))
+        response = self.client.get(reverse('income-detail', args=[self.rule.virtual_id(3)]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_batch_updates_and_deletes_occurrences(self):
+        get_balance(self.user)
+        response = self.client.post(reverse('transactions-batch'), {'operations': [
+            {'op': 'update', 'kind': 'income', 'id': self.rule.virtual_id(2), 'data': {'amount': '150.00'}},
+            {'op': 'delete', 'kind': 'income', 'id': self.rule.virtual_id(3)},
+            {'op': 'delete', 'kind': 'income', 'id': self.rule.virtual_id(12)},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['errors'][:2], [{}, {}])
+        self.assertIn('id', response.data['errors'][2])
+
+        response = self.client.post(reverse('transactions-batch'), {'operations': [
+            {'op': 'update', 'kind': 'income', 'id': self.rule.virtual_id(2), 'data': {'amount': '150.00'}},
+            {'op': 'delete', 'kind': 'income', 'id': self.rule.virtual_id(3)},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        updated = response.data['results'][0]
+        self.assertGreater(updated['id'], 0)
+        self.assertEqual((updated['data']['amount'], updated['data']['date']), ('150.00', '2025-03-31'))
+
+        self.rule.refresh_from_db()
+        self.assertEqual(self.rule.excluded, [2, 3])
+        self.assertEqual(len(self.client.get(self.url).data), 11)
+        self.assertEqual(get_balance(self.user).total_income, Decimal('1150.00'))
+        self.assertEqual(rebuild_balances([self.user.pk])[self.user.pk].total_income, Decimal('1150.00'))
+
+    def test_occurrences_of_other_users_are_hidden(self):
+        other = User.objects.create_user(email="other@example.com", password="securePassword123")
+        self.client.force_authenticate(user=other)
+        response = self.client.get(reverse('income-detail', args=[self.rule.virtual_id(1)]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class LedgerTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="test@example.com", password="securePassword123")
+        self.client.force_authenticate(user=self.user)
+        self.food = Category.objects.create(user=self.user, name="Food", type="expense")
+        Income.objects.create(user=self.user, amount=Decimal('100.00'), date=date(2025, 1, 1))
+        Expense.objects.create(user=self.user, category=self.food, amount=Decimal('30.00'), date=date(2025, 1, 2))
+        Expense.objects.create(user=self.user, amount=Decimal('20.00'), date=date(2025, 1, 10))
+        Income.objects.create(user=self.user, amount=Decimal('50.00'), date=date(2025, 2, 5))
+        self.url = reverse('transactions-ledger')
+
+    def test_both_kinds_with_running_balance(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(row['date'], row['kind'], row['amount'], row['balance']) for row in response.data],
+            [
+                ('2025-02-05', 'income', '50.00', '100.00'),
+                ('2025-01-10', 'expense', '20.00', '50.00'),
+                ('2025-01-02', 'expense', '30.00', '70.00'),
+                ('2025-01-01', 'income', '100.00', '100.00'),
+            ],
+        )
+
+    def test_filters_keep_real_balances(self):
+        response = self.client.get(self.url, {'start_date': '2025-01-05'})
+        self.assertEqual([row['balance'] for row in response.data], ['100.00', '50.00'])
+
+        response = self.client.get(self.url, {'category': self.food.pk})
+        self.assertEqual([row['balance'] for row in response.data], ['-30.00'])
+
+    def test_recurring_occurrences_and_pagination(self):
+        self.client.post(reverse('expense-list'), {
+            'amount': '5.00', 'date': '2024-12-15',
+            'is_recurring': True, 'recurrence_type': 'monthly', 'recurrence_count': 3,
+        })
+        full = self.client.get(self.url).data
+        self.assertEqual(
+            [(row['date'], row['balance']) for row in full],
+            [
+                ('2025-02-15', '85.00'),
+                ('2025-02-05', '90.00'),
+                ('2025-01-15', '40.00'),
+                ('2025-01-10', '45.00'),
+                ('2025-01-02', '65.00'),
+                ('2025-01-01', '95.00'),
+                ('2024-12-15', '-5.00'),
+            ],
+        )
+
+        pages, response = [], self.client.get(self.url, {'page_size': 2})
+        while True:
+            pages.append(response.data)
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+        self.assertEqual([row for page in pages for row in page['results']], full)
+
+        previous = self.client.get(pages[-1]['previous']).data
+        self.assertEqual(previous['results'], pages[-2]['results'])
+
+
+class AsyncViewTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="test@example.com", password="securePassword123")
+        self.client.force_authenticate(user=self.user)
+        self.food = Category.objects.create(user=self.user, name="Food", type="expense")
+        Income.objects.create(user=self.user, amount=Decimal('100.00'), date=date(2025, 1, 1))
+        Expense.objects.create(user=self.user, category=self.food, amount=Decimal('30.00'), date=date(2025, 1, 2))
+        Expense.objects.create(user=self.user, amount=Decimal('20.00'), date=date(2025, 2, 10))
+        self.client.post(reverse('expense-list'), {
+            'amount': '5.00', 'date': '2025-01-15',
+            'is_recurring': True, 'recurrence_type': 'monthly', 'recurrence_count': 2,
+        })
+
+    def test_balance_matches_sync_view(self):
+        UserBalance.objects.filter(user=self.user).delete()
+        response = self.client.get(reverse('balance-async'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), self.client.get(reverse('balance')).json())
+        self.assertEqual(response.json()['expense_count'], 4)
+
+    def test_lists_match_sync_views(self):
+        for kind in ('income', 'expense'):
+            for params in ({}, {'month': 1}, {'fields': 'id,amount', 'compact': 'true'}):
+                response = self.client.get(reverse(f'{kind}-list-async'), params)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(response.json(), self.client.get(reverse(f'{kind}-list'), params).json())
+
+    def test_pagination_matches_sync_view(self):
+        response = self.client.get(reverse('expense-list-async'), {'page_size': 2})
+        expected = self.client.get(reverse('expense-list'), {'page_size': 2}).json()
+        self.assertEqual(response.json()['results'], expected['results'])
+        self.assertEqual(len(response.json()['results']), 2)
+        self.assertIsNotNone(response.json()['next'])
+
+    def test_errors_render_like_drf(self):
+        response = self.client.get(reverse('expense-list-async'), {'month': 13})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.force_authenticate(user=None)
+        response = self.client.get(reverse('balance-async'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn('detail', response.json())
+
+
+class QueryBudgetTests(QueryBudgetMixin, APITestCase):
+    """Query counts of the transaction endpoints must not depend on how many rows the user has."""
+
+    def setUp(self):
+        self.user = UserFactory()
+        self.client.force_authenticate(user=self.user)
+        self.categories = CategoryFactory.create_batch(4, user=self.user)
+        create_history(self.user, self.categories, 25)
+        RecurrenceRuleFactory.create_batch(2, user=self.user)
+        self.income = IncomeFactory(user=self.user, category=self.categories[0])
+
+    def grow(self):
+        more = CategoryFactory.create_batch(2, user=self.user)
+        create_history(self.user, self.categories + more, 50)
+        RecurrenceRuleFactory.create_batch(2, user=self.user, kind='income')
+        RecurrenceRuleFactory.create_batch(2, user=self.user)
+
+    def test_lists(self):
+        # Rows, recurrence rules.
+        budgets = {'income-list': 2, 'expense-list': 2, 'income-list-async': 2, 'expense-list-async': 2}
+        for name, budget in budgets.items():
+            for params in ({}, {'page_size': 20}, {'fields': 'id,amount,date', 'compact': 'true'}):
+                with self.subTest(name=name, params=params):
+                    self.assertQueryBudget(budget, reverse(name), self.grow, params)
+
+    def test_detail(self):
+        self.assertQueryBudget(1, reverse('income-detail', args=[self.income.pk]), self.grow)
+
+    def test_balance(self):
+        self.assertQueryBudget(1, reverse('balance'), self.grow)
+        self.assertQueryBudget(1, reverse('balance-async'), self.grow)
+
+    def test_ledger(self):
+        self.assertQueryBudget(4, reverse('transactions-ledger'), self.grow)
+        self.assertQueryBudget(4, reverse('transactions-ledger'), self.grow, {'page_size': 20})
+
+    def test_exports(self):
+        budgets = {'income-export': 2, 'expense-export': 2, 'transactions-export': 4, 'export-csv': 4}
+        for name, budget in budgets.items():
+            with self.subTest(name=name):
+                self.assertQueryBudget(budget, reverse(name), self.grow)
+
+    def test_writes(self):
+        def batch(count):
+            return {'operations': [
+                {'op': 'create', 'kind': 'expense', 'data': {'amount': '5.00', 'date': '2025-01-03', 'category': self.categories[0].pk}}
+                for _ in range(count)
+            ]}
+
+        url = reverse('transactions-batch')
+        # Warm-up: the first write also builds the balance row.
+        self.count_queries('post', url, batch(1))
+        self.assertEqual(self.count_queries('post', url, batch(5)), 8)
+        self.assertEqual(self.count_queries('post', url, batch(50)), 8)
+
+        create = {'amount': '5.00', 'date': '2025-01-03', 'category': self.categories[0].pk}
+        self.assertLessEqual(self.count_queries('post', reverse('expense-list'), create, expected_status=201), 6)
@@ -1,6 +1,9 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import IncomeViewSet, ExpenseViewSet , BalanceView
+from .views import (
+    IncomeViewSet, ExpenseViewSet , BalanceView, TransactionExportView, TransactionImportView, TransactionBatchView, LedgerView,
+    AsyncBalanceView, AsyncIncomeListView, AsyncExpenseListView,
+)
 
 router = DefaultRouter()
 router.register(r'income', IncomeViewSet, basename='income')
@@ -8,5 +11,13 @@ router.register(r'expense', ExpenseViewSet, basename='expense')
 
 urlpatterns = [
     path('', include(router.urls)),
-    path('balance/',BalanceView.as_view(),name='balance')
+    path('balance/',BalanceView.as_view(),name='balance'),
+    # Async variants of the read-heavy endpoints, for ASGI deployments
+    path('async/balance/', AsyncBalanceView.as_view(), name='balance-async'),
+    path('async/income/', AsyncIncomeListView.as_view(), name='income-list-async'),
+    path('async/expense/', AsyncExpenseListView.as_view(), name='expense-list-async'),
+    path('ledger/', LedgerView.as_view(), name='transactions-ledger'),
+    path('export/', TransactionExportView.as_view(), name='transactions-export'),
+    path('import/', TransactionImportView.as_view(), name='transactions-import'),
+    path('batch/', TransactionBatchView.as_view(), name='transactions-batch'),
 ]
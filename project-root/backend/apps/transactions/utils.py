@@ -1,49 +1,126 @@
 # transactions/utils.py
 
-from datetime import timedelta
-from dateutil.relativedelta import relativedelta
-from django.utils import timezone
+import calendar
+from datetime import date
+from django.utils.dateparse import parse_date
 from django.db import transaction
+from rest_framework.exceptions import ValidationError
+from .models import RecurrenceRule
+from .signals import transactions_changed
+
 
-# atomic transactions 
-# bulk create
 def create_recurring_entries(model_class, base_instance, recurrence_type, count):
     """
-    Creates recurring instances of a model based on the given recurrence type and count.
+    Records the repeats of a recurring entry as a single RecurrenceRule.
+
+    Occurrences 1..count-1 are not written as rows; they are expanded on read
+    (see apps.transactions.recurrence) and materialized only when edited.
 
     Args:
         model_class: The model class (Expense or Income).
         base_instance: The original instance to base the recurrence on.
         recurrence_type: 'weekly' or 'monthly'.
-        count: How many additional entries to create.
+        count: Total number of entries, including the base instance.
     """
-    base_date = base_instance.date
-    entries = []
-
-    for i in range(1, count):
-        if recurrence_type == 'weekly':
-            next_date = base_date + timedelta(weeks=i)
-        elif recurrence_type == 'monthly':
-            next_date = base_date + relativedelta(months=i)
-        else:
-            continue  # Invalid type; skip
-
-        entry = model_class(
+    if recurrence_type not in ('weekly', 'monthly') or count <= 1:
+        return None
+
+    with transaction.atomic():
+        rule = RecurrenceRule.objects.create(
             user=base_instance.user,
-            amount=base_instance.amount,
+            kind=model_class.kind,
             category=base_instance.category,
-            date=next_date,
+            amount=base_instance.amount,
             description=base_instance.description,
-            is_recurring=True,
+            start_date=base_instance.date,
             recurrence_type=recurrence_type,
-            recurrence_count=count
+            recurrence_count=count,
         )
+        # Balances and rollups count the occurrences as if they were rows.
+        transactions_changed.send(sender=model_class, added=rule.states(), removed=[])
+    return rule
 
-        entries.append(entry)
 
-    
-    with transaction.atomic():
-        model_class.objects.bulk_create(entries)
+def parse_int_param(value, name, low, high):
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise ValidationError({name: f"{name} must be an integer."})
+    if not low <= number <= high:
+        raise ValidationError({name: f"{name} must be between {low} and {high}."})
+    return number
+
+
+def parse_date_param(value, name):
+    if not value:
+        return None
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValidationError({name: f"{name} must be a date formatted as YYYY-MM-DD."})
+    return parsed
+
+
+def parse_fields_param(value, allowed):
+    """Comma separated `fields=` list, validated against the serializer fields; None if absent."""
+    if not value:
+        return None
+    fields = list(dict.fromkeys(name.strip() for name in value.split(',') if name.strip()))
+    unknown = [name for name in fields if name not in allowed]
+    if unknown or not fields:
+        raise ValidationError({'fields': f"fields must be a comma separated subset of: {', '.join(allowed)}."})
+    return fields
+
+
+def parse_transaction_filters(params):
+    """
+    Reads the category/date/start_date/end_date/month/year query params into
+    {'category', 'start', 'end', 'month'}.
+
+    Date, month and year are folded into one inclusive [start, end] range so the
+    (user, date) indexes can be used, instead of date__month/date__year which
+    wrap the column in EXTRACT(). Only a month without a year stays a
+    per-row check, since it spans every year.
+    """
+    filters = {'category': None, 'start': None, 'end': None, 'month': None}
+
+    if params.get('category'):
+        filters['category'] = parse_int_param(params['category'], 'category', 1, 2 ** 63 - 1)
+
+    bounds = [
+        (parse_date_param(params.get('date'), 'date'),) * 2,
+        (parse_date_param(params.get('start_date'), 'start_date'), parse_date_param(params.get('end_date'), 'end_date')),
+    ]
+
+    month = parse_int_param(params['month'], 'month', 1, 12) if params.get('month') else None
+    year = parse_int_param(params['year'], 'year', 1, 9999) if params.get('year') else None
+    if year and month:
+        bounds.append((date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])))
+    elif year:
+        bounds.append((date(year, 1, 1), date(year, 12, 31)))
+    elif month:
+        filters['month'] = month
+
+    starts = [low for low, _ in bounds if low]
+    ends = [high for _, high in bounds if high]
+    filters['start'] = max(starts) if starts else None
+    filters['end'] = min(ends) if ends else None
+    return filters
+
+
+def filter_transactions(queryset, params):
+    """Applies the listing query params (see parse_transaction_filters) to an Income or Expense queryset."""
+    filters = parse_transaction_filters(params)
 
+    if filters['category']:
+        queryset = queryset.filter(category_id=filters['category'])
+    if filters['start']:
+        queryset = queryset.filter(date__gte=filters['start'])
+    if filters['end']:
+        queryset = queryset.filter(date__lte=filters['end'])
+    if filters['month']:
+        queryset = queryset.filter(date__month=filters['month'])
 
- 
\ No newline at end of file
+    return queryset
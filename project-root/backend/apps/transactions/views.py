@@ -1,91 +1,289 @@
 from rest_framework import viewsets, permissions
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from .models import Income, Expense
-from .serializers import IncomeSerializer, ExpenseSerializer
-from django.utils.dateparse import parse_date
-from datetime import datetime
+from .serializers import IncomeSerializer, ExpenseSerializer, to_columns
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Sum
-from decimal import Decimal
-from .utils import create_recurring_entries
-import csv
-from django.utils.encoding import smart_str
+from .utils import filter_transactions, parse_fields_param, parse_transaction_filters
+from .recurrence import rules_for, virtual_entries, get_occurrence, materialize_occurrence, exclude_occurrence
+from .ledger import aget_balance, get_balance
+from .fastpath import fast_rows, serialize_rows
+from .statement import Statement
+from .exports import csv_response, export_rows, merged_export_rows, virtual_export_rows
+from .importers import TransactionImporter, detect_format, text_lines
+from .batch import BatchSerializer, TransactionBatch
+from rest_framework import status
+from rest_framework.parsers import MultiPartParser, FormParser
+from asgiref.sync import sync_to_async
+from finance_tracker.async_views import AsyncAPIView, run_concurrently
+from finance_tracker.caching import cache_per_user
+from finance_tracker.conditional import conditional_get
+from finance_tracker.pagination import DateKeysetPagination, LedgerPagination
 
 
-class IncomeViewSet(viewsets.ModelViewSet):
-    serializer_class = IncomeSerializer
+class TransactionViewSet(viewsets.ModelViewSet):
+    """Shared behaviour of the Income and Expense endpoints; subclasses set `model`."""
+    model = None
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = DateKeysetPagination
+    # List reads fetch tuples and format them directly instead of through the serializer.
+    fast_list = True
 
     def get_queryset(self):
         user = self.request.user
-        queryset = Income.objects.filter(user=user).order_by('-date')
+        queryset = self.model.objects.filter(user=user).order_by('-date')
+        return filter_transactions(queryset, self.request.query_params)
 
-        category = self.request.query_params.get('category')
-        date = self.request.query_params.get('date')
-        month = self.request.query_params.get('month')
-        year = self.request.query_params.get('year')
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
 
-        if category:
-            queryset = queryset.filter(category_id=category)
-        if date:
-            queryset = queryset.filter(date=date)
-        if month:
-            queryset = queryset.filter(date__month=month)
-        if year:
-            queryset = queryset.filter(date__year=year)
+    def requested_fields(self):
+        """The `fields=` subset for reads; writes always use the full serializer."""
+        if self.request.method != 'GET':
+            return None
+        return parse_fields_param(self.request.query_params.get('fields'), self.serializer_class.Meta.fields)
 
-        return queryset
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault('fields', self.requested_fields())
+        return super().get_serializer(*args, **kwargs)
+
+    def serialize_list(self, rows):
+        """
+        Rows are model instances (virtual occurrences, or every row when
+        fast_list is off) or fast_rows() tuples; both render identically.
+        """
+        serializer = self.get_serializer()
+        data = serialize_rows(rows, serializer)
+        if self.request.query_params.get('compact') in ('true', '1'):
+            return to_columns(data, list(serializer.fields))
+        return data
+
+    def virtual_entries(self):
+        """Recurring occurrences (unsaved instances) matching the listing filters."""
+        filters = parse_transaction_filters(self.request.query_params)
+        return virtual_entries(rules_for(self.request.user, self.model.kind, filters), filters)
+
+    @conditional_get
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        fields = list(self.get_serializer().fields)
+        if self.fast_list:
+            queryset = fast_rows(queryset, fields)
+        elif 'description' not in fields:
+            queryset = queryset.defer('description')
+        extra = self.virtual_entries()
+
+        page = self.paginator.paginate_queryset(queryset, request, view=self, extra=extra)
+        if page is not None:
+            return self.get_paginated_response(self.serialize_list(page))
+
+        rows = list(queryset)
+        if extra:
+            rows = sorted(rows + extra, key=lambda entry: (entry.date, entry.id), reverse=True)
+        return Response(self.serialize_list(rows))
+
+    @conditional_get
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    def get_object(self):
+        lookup = self.kwargs.get(self.lookup_field)
+        if lookup is None or not lookup.startswith('-'):
+            return super().get_object()
+
+        # Negative ids address occurrences of a RecurrenceRule.
+        try:
+            virtual_id = int(lookup)
+        except ValueError:
+            raise NotFound()
+        entry = get_occurrence(self.request.user, self.model, virtual_id)
+        if self.action in ('update', 'partial_update'):
+            return materialize_occurrence(entry)
+        return entry
+
+    def perform_destroy(self, instance):
+        if instance.pk < 0:
+            exclude_occurrence(instance.recurrence_rule, instance.occurrence_index)
+        else:
+            instance.delete()
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        rows = merged_export_rows(
+            export_rows(self.get_queryset(), self.model.kind),
+            virtual_export_rows(self.virtual_entries()),
+        )
+        return csv_response(rows, f"{self.model.kind}.csv")
 
-    def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
-        
-        
 
-class ExpenseViewSet(viewsets.ModelViewSet):
+class IncomeViewSet(TransactionViewSet):
+    model = Income
+    serializer_class = IncomeSerializer
+
+
+class ExpenseViewSet(TransactionViewSet):
+    model = Expense
     serializer_class = ExpenseSerializer
-    permission_classes = [permissions.IsAuthenticated]
 
-    def get_queryset(self):
-        user = self.request.user
-        queryset = Expense.objects.filter(user=user).order_by('-date')
 
-        category = self.request.query_params.get('category')
-        date = self.request.query_params.get('date')
-        month = self.request.query_params.get('month')
-        year = self.request.query_params.get('year')
+class TransactionExportView(APIView):
+    """Income and expenses in one date-ordered CSV, honouring the listing filters."""
+    permission_classes = [IsAuthenticated]
 
-        if category:
-            queryset = queryset.filter(category_id=category)
-        if date:
-            queryset = queryset.filter(date=date)
-        if month:
-            queryset = queryset.filter(date__month=month)
-        if year:
-            queryset = queryset.filter(date__year=year)
+    def get(self, request):
+        filters = parse_transaction_filters(request.query_params)
+        streams = []
+        for model in (Income, Expense):
+            streams.append(export_rows(filter_transactions(model.objects.filter(user=request.user), request.query_params), model.kind))
+            streams.append(virtual_export_rows(virtual_entries(rules_for(request.user, model.kind, filters), filters)))
+        return csv_response(merged_export_rows(*streams), "transactions.csv")
 
-        return queryset
 
-    def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
-        
-       
+def balance_payload(summary):
+    return {
+        "total_income": summary.total_income,
+        "total_expense": summary.total_expense,
+        "balance": summary.balance,
+        "income_count": summary.income_count,
+        "expense_count": summary.expense_count,
+    }
 
 
 class BalanceView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @conditional_get
+    @cache_per_user
     def get(self, request):
-        user = request.user
-        total_income = Income.objects.filter(user=user).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-        total_expense = Expense.objects.filter(user=user).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-
-        balance = total_income - total_expense
-
-        return Response({
-            "total_income": total_income,
-            "total_expense": total_expense,
-            "balance": balance
-        })
-    
-     
\ No newline at end of file
+        return Response(balance_payload(get_balance(request.user)))
+
+
+class AsyncBalanceView(AsyncAPIView):
+    """BalanceView for ASGI."""
+
+    async def get(self, request):
+        return balance_payload(await aget_balance(request.user))
+
+
+class AsyncTransactionListView(AsyncAPIView):
+    """
+    The income/expense list action for ASGI, with the same filters, fields=,
+    compact= and pagination. Unpaginated, the stored rows and the recurring
+    occurrences are read concurrently.
+    """
+    model = None
+    serializer_class = None
+
+    async def get(self, request):
+        params = request.query_params
+        filters = parse_transaction_filters(params)
+        serializer = self.serializer_class(
+            fields=parse_fields_param(params.get('fields'), self.serializer_class.Meta.fields),
+            context={'request': request},
+        )
+        rows = fast_rows(
+            filter_transactions(self.model.objects.filter(user=request.user).order_by('-date'), params),
+            list(serializer.fields),
+        )
+
+        def occurrences():
+            return virtual_entries(rules_for(request.user, self.model.kind, filters), filters)
+
+        paginator = DateKeysetPagination()
+        if paginator.is_requested(request):
+            page = await sync_to_async(lambda: paginator.paginate_queryset(rows, request, extra=occurrences()))()
+            return paginator.get_paginated_response(self.render(request, page, serializer)).data
+
+        stored, extra = await run_concurrently(lambda: list(rows), occurrences)
+        if extra:
+            stored = sorted(stored + extra, key=lambda entry: (entry.date, entry.id), reverse=True)
+        return self.render(request, stored, serializer)
+
+    @staticmethod
+    def render(request, rows, serializer):
+        data = serialize_rows(rows, serializer)
+        if request.query_params.get('compact') in ('true', '1'):
+            return to_columns(data, list(serializer.fields))
+        return data
+
+
+class AsyncIncomeListView(AsyncTransactionListView):
+    model = Income
+    serializer_class = IncomeSerializer
+
+
+class AsyncExpenseListView(AsyncTransactionListView):
+    model = Expense
+    serializer_class = ExpenseSerializer
+
+
+class LedgerView(APIView):
+    """
+    Incomes and expenses as one stream, newest first, each with the running
+    balance after it. Takes the income/expense listing filters and the same
+    opt-in cursor/page_size pagination.
+    """
+    permission_classes = [IsAuthenticated]
+    pagination_class = LedgerPagination
+
+    @conditional_get
+    def get(self, request):
+        statement = Statement(request.user, parse_transaction_filters(request.query_params))
+
+        paginator = self.pagination_class()
+        page = paginator.paginate_rows(statement.fetch, request, extra=statement.occurrences)
+        if page is not None:
+            return paginator.get_paginated_response(statement.entries(page))
+
+        rows = sorted(statement.fetch() + statement.occurrences, key=statement.sort_key, reverse=True)
+        return Response(statement.entries(rows))
+
+
+class TransactionImportView(APIView):
+    """
+    Bulk import of a CSV, OFX or QIF statement uploaded as `file`.
+    Optional: `format` (else taken from the file extension), `kind` to force
+    income/expense, `create_categories=true` to create unknown categories.
+    """
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser, FormParser]
+
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({"detail": "file is required."}, status=status.HTTP_400_BAD_REQUEST)
+
+        fmt = detect_format(upload.name, request.data.get('format'))
+        kind = request.data.get('kind') or None
+        if kind not in (None, 'income', 'expense'):
+            return Response({"kind": "kind must be 'income' or 'expense'."}, status=status.HTTP_400_BAD_REQUEST)
+
+        importer = TransactionImporter(
+            request.user,
+            kind=kind,
+            create_categories=str(request.data.get('create_categories', '')).lower() == 'true',
+        )
+        result = importer.run(text_lines(upload.file), fmt)
+        return Response(result, status=status.HTTP_200_OK)
+
+
+class TransactionBatchView(APIView):
+    """
+    Applies a list of income/expense operations in one request, e.g.
+    {"operations": [{"op": "create", "kind": "expense", "data": {...}},
+                    {"op": "update", "kind": "income", "id": 4, "data": {...}},
+                    {"op": "delete", "kind": "expense", "id": 9}]}
+    All operations succeed together or none are applied.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        envelope = BatchSerializer(data=request.data)
+        envelope.is_valid(raise_exception=True)
+
+        batch = TransactionBatch(request.user, envelope.validated_data['operations'], {'request': request})
+        if not batch.run():
+            return Response({"errors": batch.errors}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"results": batch.results}, status=status.HTTP_200_OK)
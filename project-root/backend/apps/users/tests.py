@@ -5,6 +5,10 @@ from rest_framework import status
 from apps.users.models import User
 from django.utils import timezone
 from rest_framework_simplejwt.tokens import RefreshToken
+from apps.categories.factories import CategoryFactory
+from apps.transactions.factories import create_history
+from apps.users.factories import UserFactory
+from finance_tracker.testing import QueryBudgetMixin
 
 # Create your tests here.
 
@@ -163,3 +167,13 @@ class UserTests(APITestCase):
             "new_password": ""
         })
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class QueryBudgetTests(QueryBudgetMixin, APITestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        self.client.force_authenticate(user=self.user)
+
+    def test_profile(self):
+        grow = lambda: create_history(self.user, CategoryFactory.create_batch(3, user=self.user), 20)
+        self.assertQueryBudget(0, reverse('user-profile'), grow)
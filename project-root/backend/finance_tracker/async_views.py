@@ -0,0 +1,81 @@
+"""
+Async counterparts of read-only API views, for deployments under an ASGI
+server (e.g. ``gunicorn finance_tracker.asgi:application -k uvicorn.workers.UvicornWorker``).
+
+A slow database round trip then suspends the request instead of blocking a
+worker, and independent queries of one request can run at the same time.
+"""
+
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections, connection
+from django.http import HttpResponseNotAllowed, JsonResponse
+from django.views import View
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+
+def _on_own_connection(function):
+    def call():
+        # Worker threads keep their own connections; treat each call like a request.
+        close_old_connections()
+        try:
+            return function()
+        finally:
+            close_old_connections()
+    return call
+
+
+async def run_concurrently(*functions):
+    """
+    Runs independent read-only ORM calls at the same time, each on a worker
+    thread with its own database connection, and returns their results in order.
+
+    Inside an open transaction (ATOMIC_REQUESTS, tests) the calls run one after
+    the other on the request's connection, the only one that sees its writes.
+    """
+    if await sync_to_async(lambda: connection.in_atomic_block)():
+        return [await sync_to_async(function)() for function in functions]
+    return await asyncio.gather(*(
+        sync_to_async(_on_own_connection(function), thread_sensitive=False)() for function in functions
+    ))
+
+
+class AsyncAPIView(View):
+    """
+    Minimal async APIView: DRF authentication (force_authenticate included),
+    authenticated users only, DRF exceptions rendered as DRF would. Handlers
+    are `async def get(self, request)` taking a DRF Request and returning data.
+    """
+    # CORS preflight is answered by the middleware.
+    http_method_names = ['get', 'head']
+
+    async def dispatch(self, request, *args, **kwargs):
+        method = request.method.lower()
+        handler = getattr(self, method, None) if method in self.http_method_names else None
+        if handler is None:
+            return HttpResponseNotAllowed(self._allowed_methods())
+
+        request = Request(request, authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES])
+        try:
+            user = await sync_to_async(lambda: request.user)()
+            if not user or not user.is_authenticated:
+                raise exceptions.NotAuthenticated()
+            data = await handler(request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            return self.error_response(request, exc)
+        return JsonResponse(data, encoder=JSONEncoder, safe=False)
+
+    async def head(self, request, *args, **kwargs):
+        return await self.get(request, *args, **kwargs)
+
+    @staticmethod
+    def error_response(request, exc):
+        detail = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+        response = JsonResponse(detail, encoder=JSONEncoder, safe=False, status=exc.status_code)
+        if isinstance(exc, exceptions.NotAuthenticated) and request.authenticators:
+            response['WWW-Authenticate'] = request.authenticators[0].authenticate_header(request)
+        return response
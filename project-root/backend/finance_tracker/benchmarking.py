@@ -0,0 +1,20 @@
+"""
+Helpers shared by the benchmark and load-test management commands.
+"""
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile of already sorted values."""
+    index = min(len(values) - 1, max(0, round(percent / 100 * len(values)) - 1))
+    return values[index]
+
+
+def latency_summary(seconds):
+    """p50/p95/p99 and mean of a list of durations, in milliseconds."""
+    latencies = sorted(value * 1000 for value in seconds)
+    return {
+        'p50_ms': percentile(latencies, 50),
+        'p95_ms': percentile(latencies, 95),
+        'p99_ms': percentile(latencies, 99),
+        'mean_ms': sum(latencies) / len(latencies),
+    }
@@ -0,0 +1,124 @@
+"""
+Per-user response cache for the read endpoints.
+
+Every cached response is stored under a key that embeds the user's current
+generation number. Writes that affect a user bump the generation, which makes
+all of that user's entries unreachable at once (they then age out via the
+timeout), so invalidation is O(1) regardless of how many entries exist.
+"""
+
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+HITS_KEY = 'response-cache:hits'
+MISSES_KEY = 'response-cache:misses'
+
+
+def get_cache():
+    return caches[getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')]
+
+
+def _generation_key(user_id):
+    return f'response-cache:generation:{user_id}'
+
+
+def get_generation(user_id):
+    cache = get_cache()
+    key = _generation_key(user_id)
+    generation = cache.get(key)
+    if generation is None:
+        # Seeded from the clock: if the counter is ever evicted, a restart at a
+        # small number could otherwise collide with entries still cached.
+        cache.add(key, time.time_ns(), timeout=None)
+        generation = cache.get(key)
+    return generation
+
+
+def _bump(user_id):
+    cache = get_cache()
+    try:
+        cache.incr(_generation_key(user_id))
+    except ValueError:
+        cache.set(_generation_key(user_id), time.time_ns(), timeout=None)
+
+
+def bump_generation(user_id):
+    """
+    Invalidates every cached response of the user. Bumped immediately and
+    again on commit, so a read racing the open transaction cannot re-cache
+    pre-commit data under the new generation.
+    """
+    _bump(user_id)
+    transaction.on_commit(lambda: _bump(user_id))
+
+
+def _count(key):
+    cache = get_cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+
+
+def response_cache_key(request, view_name):
+    user_id = request.user.pk
+    url = hashlib.md5(request.build_absolute_uri().encode('utf-8')).hexdigest()
+    renderer = getattr(request, 'accepted_renderer', None)
+    fmt = getattr(renderer, 'format', '')
+    return f'response-cache:{user_id}:{get_generation(user_id)}:{view_name}:{fmt}:{url}'
+
+
+def cache_per_user(handler):
+    """
+    Caches the data of successful GET responses of a view handler per user and
+    full URL, until the user's generation is bumped or the timeout expires.
+    """
+    @wraps(handler)
+    def wrapper(self, request, *args, **kwargs):
+        if request.method != 'GET' or not request.user.is_authenticated:
+            return handler(self, request, *args, **kwargs)
+
+        cache = get_cache()
+        key = response_cache_key(request, f'{type(self).__name__}.{handler.__name__}')
+        data = cache.get(key)
+        if data is not None:
+            _count(HITS_KEY)
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+
+        _count(MISSES_KEY)
+        response = handler(self, request, *args, **kwargs)
+        if response.status_code == 200 and isinstance(response, Response):
+            cache.set(key, response.data, timeout=getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300))
+        response['X-Cache'] = 'MISS'
+        return response
+    return wrapper
+
+
+def cache_stats():
+    cache = get_cache()
+    hits = cache.get(HITS_KEY) or 0
+    misses = cache.get(MISSES_KEY) or 0
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / total, 4) if total else None,
+    }
+
+
+class CacheStatsView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(cache_stats())
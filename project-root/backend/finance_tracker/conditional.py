@@ -0,0 +1,79 @@
+"""
+Conditional GET (ETag / If-None-Match) for the list and summary endpoints.
+
+The ETag is derived from the user's response-cache generation (see
+finance_tracker.caching), which every write affecting the user bumps. Reading
+it is a cache lookup, so unchanged data is answered with 304 without touching
+the database.
+
+A generation bumped in one process is invisible to the others when the cache
+is process-local, and they would keep answering 304 for stale data. ETags are
+therefore opt-in (CONDITIONAL_GET=true) and refused at startup unless the
+response cache is shared by every worker (see check_shared_cache).
+"""
+
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.cache import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from .caching import get_generation
+
+# Backends whose entries live inside one process (the dummy cache keeps none).
+PROCESS_LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def check_shared_cache():
+    """Raises ImproperlyConfigured when CONDITIONAL_GET is on but the response cache is process-local."""
+    if not getattr(settings, 'CONDITIONAL_GET', False):
+        return
+    alias = getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')
+    backend = settings.CACHES[alias]['BACKEND']
+    if backend in PROCESS_LOCAL_BACKENDS:
+        raise ImproperlyConfigured(
+            f"CONDITIONAL_GET needs a cache shared by every process; the '{alias}' cache uses {backend}. "
+            "Set CACHE_BACKEND (e.g. to the Redis or Memcached backend) or turn CONDITIONAL_GET off."
+        )
+
+
+def compute_etag(request):
+    renderer = getattr(request, 'accepted_renderer', None)
+    source = repr((
+        request.build_absolute_uri(),
+        getattr(renderer, 'format', ''),
+        get_generation(request.user.pk),
+    ))
+    return quote_etag(hashlib.sha1(source.encode('utf-8')).hexdigest())
+
+
+def conditional_get(handler):
+    """
+    Adds an ETag to successful GET responses of a view handler and answers a
+    matching If-None-Match with 304.
+    """
+    @wraps(handler)
+    def wrapper(self, request, *args, **kwargs):
+        if (
+            not getattr(settings, 'CONDITIONAL_GET', False)
+            or request.method not in ('GET', 'HEAD')
+            or not request.user.is_authenticated
+        ):
+            return handler(self, request, *args, **kwargs)
+
+        etag = compute_etag(request)
+        matches = parse_etags(request.headers.get('If-None-Match', ''))
+        if etag in matches or '*' in matches:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+        response = handler(self, request, *args, **kwargs)
+        if response.status_code == 200:
+            response['ETag'] = etag
+        return response
+    return wrapper
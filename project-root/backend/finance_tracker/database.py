@@ -0,0 +1,52 @@
+"""
+The default database, configured from the environment.
+
+DB_CONN_MAX_AGE        seconds a worker thread keeps its connection open between
+                       requests (default 60, 0 closes it after every request)
+DB_CONN_HEALTH_CHECKS  check reused connections before handing them out (default true)
+DB_POOL_SIZE           keep up to N idle connections per process in a pool
+                       (default 0, no pool); replaces DB_CONN_MAX_AGE
+DB_TRANSACTION_POOLER  true when connecting through PgBouncer in transaction mode,
+                       e.g. the Supabase pooler on port 6543 (default false)
+
+Under ASGI every request may run on another thread; use DB_CONN_MAX_AGE=0
+there, or the pool, which is shared by all threads of a process.
+"""
+
+from django.core.exceptions import ImproperlyConfigured
+
+POSTGRESQL = 'django.db.backends.postgresql'
+POOLED_POSTGRESQL = 'finance_tracker.pooled_postgresql'
+
+
+def env_flag(env, name, default=False):
+    value = env.get(name)
+    if not value:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def database_settings(env):
+    database = {
+        'ENGINE': env.get('DB_ENGINE') or POSTGRESQL,
+        'NAME': env.get('DB_NAME') or 'postgres',
+        'USER': env.get('DB_USER') or 'postgres.tdtixeaqfqpfxbivzjcw',
+        'PASSWORD': env.get('DB_PASSWORD') or 'uday2acc',
+        'HOST': env.get('DB_HOST') or 'aws-0-ap-south-1.pooler.supabase.com',
+        'PORT': env.get('DB_PORT') or '5432',
+        'CONN_MAX_AGE': int(env.get('DB_CONN_MAX_AGE') or 60),
+        'CONN_HEALTH_CHECKS': env_flag(env, 'DB_CONN_HEALTH_CHECKS', default=True),
+    }
+
+    pool_size = int(env.get('DB_POOL_SIZE') or 0)
+    if pool_size:
+        if database['ENGINE'] != POSTGRESQL:
+            raise ImproperlyConfigured("DB_POOL_SIZE needs the PostgreSQL backend.")
+        database.update(ENGINE=POOLED_POSTGRESQL, CONN_MAX_AGE=0, POOL={'size': pool_size})
+
+    if env_flag(env, 'DB_TRANSACTION_POOLER'):
+        # Each transaction may run on a different server connection, so a named
+        # (server-side) cursor would not outlive the transaction that opened it.
+        # psycopg2 never uses server-side prepared statements: nothing else to turn off.
+        database['DISABLE_SERVER_SIDE_CURSORS'] = True
+    return database
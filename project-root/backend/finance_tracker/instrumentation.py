@@ -0,0 +1,212 @@
+"""
+Opt-in per-request instrumentation (REQUEST_METRICS=true).
+
+For every request the middleware records the number of SQL queries and the
+time spent in them (through connection.execute_wrapper), the time spent
+serializing, the total time and the response size. They are sent back in a
+Server-Timing header, logged as one JSON line on the `finance_tracker.requests`
+logger and aggregated into per-route histograms, which staff can scrape in
+the Prometheus text format at /api/metrics/.
+
+The histograms live in process memory: each worker reports its own requests.
+Queries issued on other threads (run_concurrently in the async views) are
+not counted.
+"""
+
+import contextvars
+import json
+import logging
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import HttpResponse
+from rest_framework import permissions, serializers
+from rest_framework.views import APIView
+
+logger = logging.getLogger('finance_tracker.requests')
+
+_current = contextvars.ContextVar('request_metrics', default=None)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+# name -> (help, buckets, RequestMetrics attribute)
+HISTOGRAMS = {
+    'http_request_duration_seconds': ("Time to produce the response.", DURATION_BUCKETS, 'total'),
+    'http_request_db_queries': ("SQL queries per request.", QUERY_BUCKETS, 'queries'),
+    'http_request_db_duration_seconds': ("Time spent in SQL queries.", DURATION_BUCKETS, 'db_time'),
+    'http_request_serialize_duration_seconds': ("Time spent serializing.", DURATION_BUCKETS, 'serialize_time'),
+    'http_response_size_bytes': ("Response body size.", SIZE_BUCKETS, 'size'),
+}
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.total = 0.0
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.size = 0
+        self.serializing = False
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper hook
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - started
+
+
+@contextmanager
+def timed_serialization():
+    """Adds the block's time to the current request's serialization time (outermost block only)."""
+    metrics = _current.get()
+    if metrics is None or metrics.serializing:
+        yield
+        return
+    metrics.serializing = True
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.serializing = False
+        metrics.serialize_time += time.perf_counter() - started
+
+
+def _install_serializer_timing():
+    for serializer_class in (serializers.Serializer, serializers.ListSerializer):
+        data = serializer_class.__dict__['data']
+        if getattr(data.fget, 'timed', False):
+            continue
+
+        def fget(self, _fget=data.fget):
+            with timed_serialization():
+                return _fget(self)
+        fget.timed = True
+        serializer_class.data = property(fget)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0
+
+    def observe(self, value):
+        # Bucket counts are cumulative, as Prometheus expects.
+        self.count += 1
+        self.sum += value
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        # (histogram name, route, method, status) -> Histogram
+        self.histograms = {}
+
+    def observe(self, route, method, status, metrics):
+        with self.lock:
+            for name, (_, buckets, attribute) in HISTOGRAMS.items():
+                key = (name, route, method, status)
+                if key not in self.histograms:
+                    self.histograms[key] = Histogram(buckets)
+                self.histograms[key].observe(getattr(metrics, attribute))
+
+    def render(self):
+        """The histograms in the Prometheus text exposition format."""
+        with self.lock:
+            items = sorted(self.histograms.items())
+            lines = []
+            for name, (help_text, _, _) in HISTOGRAMS.items():
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+                for (histogram_name, route, method, status), histogram in items:
+                    if histogram_name != name:
+                        continue
+                    labels = f'route="{_escape(route)}",method="{method}",status="{status}"'
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+                    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                    lines.append(f'{name}_sum{{{labels}}} {histogram.sum}')
+                    lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+registry = MetricsRegistry()
+
+
+def route_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    return match.view_name or match.route
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_METRICS', False):
+            raise MiddlewareNotUsed
+        _install_serializer_timing()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+
+        metrics.total = time.perf_counter() - metrics.started
+        if not response.streaming:
+            metrics.size = len(response.content)
+        route = route_name(request)
+        registry.observe(route, request.method, response.status_code, metrics)
+
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={metrics.db_time * 1000:.1f};desc="{metrics.queries} queries"',
+            f'serialize;dur={metrics.serialize_time * 1000:.1f}',
+            f'total;dur={metrics.total * 1000:.1f}',
+        ])
+        user = getattr(request, 'user', None)
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'route': route,
+            'status': response.status_code,
+            'user_id': user.pk if user is not None and user.is_authenticated else None,
+            'duration_ms': round(metrics.total * 1000, 1),
+            'db_queries': metrics.queries,
+            'db_ms': round(metrics.db_time * 1000, 1),
+            'serialize_ms': round(metrics.serialize_time * 1000, 1),
+            'response_bytes': metrics.size,
+        }))
+        return response
+
+
+class MetricsView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,207 @@
+"""
+Keyset (cursor) pagination shared by the list endpoints.
+
+Pages are cut with a ``(key, id)`` seek predicate instead of OFFSET, so the
+hundredth page costs the same index range scan as the first one.
+"""
+
+import base64
+import json
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Orders by ``ordering`` (a key field plus ``id`` as tie breaker) and encodes
+    the boundary row of each page into an opaque cursor.
+
+    Pagination is opt-in: requests without ``cursor`` or ``page_size`` keep
+    receiving the plain list the frontend expects.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = 50
+    max_page_size = 500
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+    # Validates the key value of a cursor: None or ValueError rejects it.
+    parse_key = staticmethod(parse_datetime)
+
+    def paginate_queryset(self, queryset, request, view=None, extra=None):
+        """
+        `extra` is an optional list of unsaved rows (e.g. expanded recurring
+        occurrences) merged into the page by the same (key, id) order.
+        """
+        def fetch(cursor, scan_descending, limit):
+            order = [f"{'-' if scan_descending else ''}{field.lstrip('-')}" for field in self.ordering]
+            rows = queryset.order_by(*order)
+            if cursor:
+                lookup = 'lt' if scan_descending else 'gt'
+                rows = rows.filter(
+                    Q(**{f'{self.key_field}__{lookup}': cursor['v']}) |
+                    Q(**{self.key_field: cursor['v'], f'{self.id_field}__{lookup}': cursor['id']})
+                )
+            return list(rows[:limit])
+
+        return self.paginate_rows(fetch, request, extra)
+
+    def paginate_rows(self, fetch, request, extra=None):
+        """
+        Pages any row source: `fetch(cursor, scan_descending, limit)` returns up
+        to `limit` rows past the cursor, in scan order.
+        """
+        if not self.is_requested(request):
+            return None
+        params = request.query_params
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.size = self.get_page_size(request)
+        descending = self.ordering[0].startswith('-')
+
+        cursor = self.decode_cursor(params.get(self.cursor_query_param))
+        reverse = bool(cursor and cursor['r'])
+        # Walking backwards flips the scan direction; rows are re-reversed below.
+        scan_descending = descending != reverse
+
+        rows = fetch(cursor, scan_descending, self.size + 1)
+        if extra:
+            boundary = (cursor['v'], cursor['id']) if cursor else None
+            candidates = [
+                item for item in extra
+                if boundary is None or (self.sort_key(item) < boundary if scan_descending else self.sort_key(item) > boundary)
+            ]
+            rows = sorted(rows + candidates, key=self.sort_key, reverse=scan_descending)[:self.size + 1]
+        has_more = len(rows) > self.size
+        rows = rows[:self.size]
+
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+
+        self.page = rows
+        return rows
+
+    def is_requested(self, request):
+        params = request.query_params
+        return self.cursor_query_param in params or self.page_size_query_param in params
+
+    @property
+    def key_field(self):
+        return self.ordering[0].lstrip('-')
+
+    @property
+    def id_field(self):
+        return self.ordering[1].lstrip('-')
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def position(self, item):
+        if isinstance(item, dict):
+            return item[self.key_field], item[self.id_field]
+        return getattr(item, self.key_field), getattr(item, self.id_field)
+
+    def sort_key(self, item):
+        value, pk = self.position(item)
+        return value.isoformat(), pk
+
+    def encode_cursor(self, item, reverse):
+        value, pk = self.position(item)
+        payload = json.dumps({'v': value.isoformat(), 'id': pk, 'r': int(reverse)}, separators=(',', ':'))
+        token = base64.urlsafe_b64encode(payload.encode('ascii')).decode('ascii')
+        url = replace_query_param(self.base_url, self.cursor_query_param, token)
+        return replace_query_param(url, self.page_size_query_param, self.size)
+
+    def decode_cursor(self, token):
+        if not token:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(token.encode('ascii')).decode('ascii'))
+            cursor['id'] = int(cursor['id'])
+            cursor['v'] = str(cursor['v'])
+            cursor['r'] = bool(cursor.get('r'))
+            if self.parse_key(cursor['v']) is None or abs(cursor['id']) >= 2 ** 63:
+                raise ValueError(cursor['v'])
+        except (TypeError, ValueError, KeyError, UnicodeError, AttributeError):
+            raise NotFound(self.invalid_cursor_message)
+        return cursor
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Opaque cursor returned in next/previous.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': f'Rows per page (max {self.max_page_size}).',
+                'schema': {'type': 'integer'},
+            },
+        ]
+
+
+class DateKeysetPagination(KeysetPagination):
+    """Transactions: newest date first, served by the (user, -date) index."""
+    ordering = ('-date', '-id')
+    parse_key = staticmethod(parse_date)
+
+
+class CreatedKeysetPagination(KeysetPagination):
+    """Categories and budgets: most recently created first."""
+    ordering = ('-created_at', '-id')
+
+
+class LedgerPagination(KeysetPagination):
+    """Combined income/expense ledger: newest first, ties broken on the entry key."""
+    ordering = ('-date', '-entry_key')
+    parse_key = staticmethod(parse_date)
@@ -0,0 +1,120 @@
+"""
+PostgreSQL backend keeping a small pool of open connections per process.
+
+Django 4.2 has no connection pooling (its `pool` option arrived in 5.1) and
+psycopg2's pools key checkouts by thread and close everything above their
+minimum. Here the connections Django closes go back to a per-process pool,
+and the next request that needs one takes it from there, so a worker serves
+its requests over a few warm TLS sessions. Configured by the POOL entry of
+the database settings (see finance_tracker/database.py):
+
+    'POOL': {'size': 4}
+
+`size` is the number of idle connections kept. Busier moments open extra
+connections, closed again after use. Use CONN_MAX_AGE = 0 with a pool: the
+pool, not the request thread, keeps the connections.
+"""
+
+import os
+import threading
+
+from django.db.backends.postgresql import base, creation
+from psycopg2 import extensions
+
+
+class ConnectionPool:
+    def __init__(self, size):
+        self.size = size
+        self.pid = os.getpid()
+        self.idle = []
+        self.lock = threading.Lock()
+
+    def checkout(self):
+        with self.lock:
+            return self.idle.pop() if self.idle else None
+
+    def checkin(self, connection):
+        """Keeps the connection if it is reusable and there is room, closes it otherwise."""
+        if connection.closed:
+            return
+        try:
+            status = connection.info.transaction_status
+            if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                raise base.Database.InterfaceError("server connection lost")
+            if status != extensions.TRANSACTION_STATUS_IDLE:
+                connection.rollback()
+        except base.Database.Error:
+            connection.close()
+            return
+        with self.lock:
+            if len(self.idle) < self.size:
+                self.idle.append(connection)
+                return
+        connection.close()
+
+    def close(self):
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for connection in idle:
+            connection.close()
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # Idle pooled connections would keep DROP DATABASE from running.
+        DatabaseWrapper.close_pools()
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    # server, database and user -> ConnectionPool of this process
+    pools = {}
+    pools_lock = threading.Lock()
+
+    @classmethod
+    def close_pools(cls):
+        with cls.pools_lock:
+            pools, cls.pools = cls.pools, {}
+        for pool in pools.values():
+            pool.close()
+
+    def get_pool(self):
+        key = tuple(self.settings_dict[name] for name in ('HOST', 'PORT', 'NAME', 'USER'))
+        with self.pools_lock:
+            pool = self.pools.get(key)
+            # Connections inherited from a parent process (e.g. a preloading
+            # gunicorn master) must not be shared between workers.
+            if pool is None or pool.pid != os.getpid():
+                pool = self.pools[key] = ConnectionPool(self.settings_dict.get('POOL', {}).get('size', 1))
+            return pool
+
+    def get_new_connection(self, conn_params):
+        pool = self.get_pool()
+        while (connection := pool.checkout()) is not None:
+            if connection.closed or (self.settings_dict['CONN_HEALTH_CHECKS'] and not self.ping(connection)):
+                connection.close()
+                continue
+            # What the parent sets while opening a connection.
+            self.isolation_level = base.IsolationLevel(
+                self.settings_dict['OPTIONS'].get('isolation_level', base.IsolationLevel.READ_COMMITTED)
+            )
+            return connection
+        return super().get_new_connection(conn_params)
+
+    @staticmethod
+    def ping(connection):
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            if not connection.autocommit:
+                connection.rollback()
+        except base.Database.Error:
+            return False
+        return True
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.get_pool().checkin(self.connection)
@@ -3,6 +3,7 @@ import os
 from dotenv import load_dotenv
 from datetime import timedelta
 from corsheaders.defaults import default_headers
+from finance_tracker.database import database_settings, env_flag
 
 # Base directory
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -53,6 +54,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # Query counts and timings per request; inactive unless REQUEST_METRICS is set
+    'finance_tracker.instrumentation.RequestMetricsMiddleware',
 ]
 
 ROOT_URLCONF = 'finance_tracker.urls'
@@ -77,15 +80,9 @@ TEMPLATES = [
 WSGI_APPLICATION = 'finance_tracker.wsgi.application'
 
 # Database
+# Connection reuse, pooling and PgBouncer settings: see finance_tracker/database.py
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.postgresql',
-        'NAME': 'postgres',
-        'USER': 'postgres.tdtixeaqfqpfxbivzjcw',
-        'PASSWORD': 'uday2acc',
-        'HOST': 'aws-0-ap-south-1.pooler.supabase.com',
-        'PORT': '5432',
-    }
+    'default': database_settings(os.environ),
 }
 
 # Custom user model
@@ -120,6 +117,55 @@ REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
 }
 
+# Cache settings
+# Local memory by default; point CACHE_BACKEND/CACHE_LOCATION at a shared
+# backend (e.g. django.core.cache.backends.redis.RedisCache) when running
+# several workers, otherwise each process keeps its own copy.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND') or 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': os.getenv('CACHE_LOCATION') or 'finance-tracker',
+    }
+}
+
+# Seconds a cached per-user response is kept (writes invalidate it earlier).
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT') or 300)
+
+# ETag / If-None-Match on the read endpoints (finance_tracker/conditional.py);
+# startup fails if it is on while the cache above is process-local.
+CONDITIONAL_GET = env_flag(os.environ, 'CONDITIONAL_GET')
+
+# Request instrumentation (finance_tracker/instrumentation.py)
+REQUEST_METRICS = env_flag(os.environ, 'REQUEST_METRICS')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'finance_tracker.requests': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
+# Email (budget alerts). The console backend prints messages instead of sending them.
+EMAIL_BACKEND = os.getenv('EMAIL_BACKEND') or 'django.core.mail.backends.console.EmailBackend'
+EMAIL_HOST = os.getenv('EMAIL_HOST') or 'localhost'
+EMAIL_PORT = int(os.getenv('EMAIL_PORT') or 25)
+EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER') or ''
+EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD') or ''
+EMAIL_USE_TLS = env_flag(os.environ, 'EMAIL_USE_TLS')
+DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL') or 'no-reply@finance-tracker.local'
+
+# Percent of a budget's amount past which its owner is emailed (apps/budgets/notifications.py).
+BUDGET_ALERT_THRESHOLDS = [int(value) for value in (os.getenv('BUDGET_ALERT_THRESHOLDS') or '100').split(',')]
+
+# Periodic jobs: `python manage.py crontab add` installs them.
+CRONJOBS = [
+    ('*/15 * * * *', 'apps.budgets.notifications.run_budget_notifier'),
+]
+
 # JWT settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=30),
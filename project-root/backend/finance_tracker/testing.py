@@ -0,0 +1,41 @@
+"""
+Test helpers shared by the apps' test suites.
+"""
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    """
+    For APITestCase classes: checks that an endpoint stays within a fixed
+    number of SQL queries, however many rows are behind it.
+    """
+
+    def count_queries(self, method, url, data=None, expected_status=200):
+        # Cold path: neither the response cache nor a conditional request may skip the work.
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            if method == 'get':
+                response = self.client.get(url, data)
+            else:
+                response = getattr(self.client, method)(url, data, format='json')
+            # Streamed exports run their queries while the body is consumed.
+            if response.streaming:
+                b''.join(response.streaming_content)
+        self.assertEqual(response.status_code, expected_status)
+        return len(queries)
+
+    def assertQueryBudget(self, budget, url, grow, params=None):
+        """
+        GETs `url` before and after `grow()` adds rows: both must use the same
+        number of queries, at most `budget`. A warm-up request first builds
+        whatever is built once per user (e.g. the balance row).
+        """
+        self.count_queries('get', url, params)
+        before = self.count_queries('get', url, params)
+        grow()
+        after = self.count_queries('get', url, params)
+        self.assertEqual(before, after, f"GET {url} {params or ''}: queries grew from {before} to {after} with more rows")
+        self.assertLessEqual(after, budget, f"GET {url} {params or ''}: {after} queries, budget {budget}")
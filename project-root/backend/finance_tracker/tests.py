@@ -0,0 +1,152 @@
+from unittest import mock, skipUnless
+from django.core.exceptions import ImproperlyConfigured
+import json
+from django.db import connection
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from psycopg2 import extensions
+from rest_framework import status
+from rest_framework.test import APITestCase
+from apps.users.models import User
+from .conditional import check_shared_cache
+from .database import POOLED_POSTGRESQL, database_settings
+from .instrumentation import registry
+from .pooled_postgresql.base import ConnectionPool, DatabaseWrapper
+
+
+class DatabaseSettingsTests(SimpleTestCase):
+    def test_persistent_connections_by_default(self):
+        database = database_settings({'DB_NAME': 'finance', 'DB_HOST': 'localhost'})
+        self.assertEqual(database['ENGINE'], 'django.db.backends.postgresql')
+        self.assertEqual((database['NAME'], database['HOST']), ('finance', 'localhost'))
+        self.assertEqual(database['CONN_MAX_AGE'], 60)
+        self.assertTrue(database['CONN_HEALTH_CHECKS'])
+        self.assertNotIn('POOL', database)
+        self.assertNotIn('DISABLE_SERVER_SIDE_CURSORS', database)
+
+    def test_environment_overrides(self):
+        database = database_settings({'DB_CONN_MAX_AGE': '0', 'DB_CONN_HEALTH_CHECKS': 'false'})
+        self.assertEqual(database['CONN_MAX_AGE'], 0)
+        self.assertFalse(database['CONN_HEALTH_CHECKS'])
+
+    def test_pool_mode(self):
+        database = database_settings({'DB_POOL_SIZE': '4', 'DB_CONN_MAX_AGE': '600'})
+        self.assertEqual(database['ENGINE'], POOLED_POSTGRESQL)
+        self.assertEqual(database['POOL'], {'size': 4})
+        self.assertEqual(database['CONN_MAX_AGE'], 0)
+
+        with self.assertRaises(ImproperlyConfigured):
+            database_settings({'DB_POOL_SIZE': '4', 'DB_ENGINE': 'django.db.backends.sqlite3'})
+
+    def test_transaction_pooler_mode(self):
+        database = database_settings({'DB_TRANSACTION_POOLER': '1', 'DB_PORT': '6543'})
+        self.assertTrue(database['DISABLE_SERVER_SIDE_CURSORS'])
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    def make_connection(self, status=extensions.TRANSACTION_STATUS_IDLE):
+        return mock.Mock(closed=False, info=mock.Mock(transaction_status=status))
+
+    def test_keeps_up_to_size_idle_connections(self):
+        pool = ConnectionPool(size=1)
+        first, second = self.make_connection(), self.make_connection()
+        pool.checkin(first)
+        pool.checkin(second)
+        second.close.assert_called_once()
+        self.assertIs(pool.checkout(), first)
+        self.assertIsNone(pool.checkout())
+
+    def test_resets_or_drops_connections_on_checkin(self):
+        pool = ConnectionPool(size=2)
+        in_transaction = self.make_connection(extensions.TRANSACTION_STATUS_INTRANS)
+        lost = self.make_connection(extensions.TRANSACTION_STATUS_UNKNOWN)
+        pool.checkin(in_transaction)
+        pool.checkin(lost)
+        in_transaction.rollback.assert_called_once()
+        lost.close.assert_called_once()
+        self.assertEqual(pool.idle, [in_transaction])
+
+
+@skipUnless(isinstance(connection, DatabaseWrapper), "needs PostgreSQL with DB_POOL_SIZE set")
+class PooledPostgresqlTests(TransactionTestCase):
+    def backend_pid(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_backend_pid()")
+            return cursor.fetchone()[0]
+
+    def test_closed_connections_are_reused(self):
+        pid = self.backend_pid()
+        connection.close()
+        self.assertEqual(self.backend_pid(), pid)
+
+    def test_unusable_connections_are_replaced(self):
+        pid = self.backend_pid()
+        raw = connection.connection
+        connection.close()
+        raw.close()
+        self.assertNotEqual(self.backend_pid(), pid)
+
+    def test_open_transaction_is_rolled_back(self):
+        connection.set_autocommit(False)
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        connection.close()
+        connection.set_autocommit(True)
+        self.assertEqual(connection.connection.info.transaction_status, extensions.TRANSACTION_STATUS_IDLE)
+
+
+class SharedCacheCheckTests(SimpleTestCase):
+    def caches(self, backend):
+        return {'default': {'BACKEND': backend, 'LOCATION': '127.0.0.1:11211'}}
+
+    def test_process_local_cache_is_refused(self):
+        for backend in ('django.core.cache.backends.locmem.LocMemCache', 'django.core.cache.backends.dummy.DummyCache'):
+            with self.subTest(backend=backend), override_settings(CONDITIONAL_GET=True, CACHES=self.caches(backend)):
+                with self.assertRaises(ImproperlyConfigured):
+                    check_shared_cache()
+
+    def test_shared_cache_or_disabled_is_accepted(self):
+        with override_settings(CONDITIONAL_GET=True, CACHES=self.caches('django.core.cache.backends.memcached.PyMemcacheCache')):
+            check_shared_cache()
+        with override_settings(CONDITIONAL_GET=False, CACHES=self.caches('django.core.cache.backends.locmem.LocMemCache')):
+            check_shared_cache()
+
+
+@override_settings(REQUEST_METRICS=True)
+class RequestMetricsTests(APITestCase):
+    def setUp(self):
+        registry.reset()
+        self.user = User.objects.create_user(email="test@example.com", password="securePassword123")
+        self.client.force_authenticate(user=self.user)
+
+    def test_server_timing_and_log_line(self):
+        with self.assertLogs('finance_tracker.requests', level='INFO') as logs:
+            response = self.client.get(reverse('income-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="\d+ queries", serialize;dur=[\d.]+, total;dur=[\d.]+$')
+
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual((record['route'], record['status'], record['user_id']), ('income-list', 200, self.user.pk))
+        self.assertGreater(record['db_queries'], 0)
+        self.assertEqual(record['response_bytes'], len(response.content))
+
+    def test_metrics_endpoint_is_staff_only(self):
+        with self.assertLogs('finance_tracker.requests', level='INFO'):
+            self.client.get(reverse('income-list'))
+            self.assertEqual(self.client.get(reverse('metrics')).status_code, status.HTTP_403_FORBIDDEN)
+
+            self.user.is_staff = True
+            self.user.save()
+            response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        body = response.content.decode()
+        self.assertIn('# TYPE http_request_db_queries histogram', body)
+        self.assertIn('http_request_duration_seconds_count{route="income-list",method="GET",status="200"} 1', body)
+        self.assertIn('http_request_duration_seconds_bucket{route="metrics",method="GET",status="403",le="+Inf"} 1', body)
+
+    @override_settings(REQUEST_METRICS=False)
+    def test_off_unless_enabled(self):
+        response = self.client.get(reverse('income-list'))
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(registry.histograms, {})
@@ -16,6 +16,9 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path,include
+from apps.transactions.views import TransactionExportView
+from finance_tracker.caching import CacheStatsView
+from finance_tracker.instrumentation import MetricsView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -23,4 +26,11 @@ urlpatterns = [
     path('api/categories/',include('apps.categories.urls'),name='categories-root'),
     path('api/budgets/',include('apps.budgets.urls'),name='budgets-root'),
     path('api/transactions/', include('apps.transactions.urls')),
+    path('api/analytics/', include('apps.analytics.urls')),
+    # Combined CSV export, at the path the Angular client requests
+    path('api/export/csv/', TransactionExportView.as_view(), name='export-csv'),
+    # Response cache hit/miss counters (staff only)
+    path('api/cache/stats/', CacheStatsView.as_view(), name='cache-stats'),
+    # Per-route request histograms in the Prometheus text format (staff only)
+    path('api/metrics/', MetricsView.as_view(), name='metrics'),
 ]